@@ -0,0 +1,210 @@
+"""
+Startup and cold-path benchmarks for the Persona Engine.
+
+Every sample runs in a fresh interpreter so import and construction costs are
+measured cold. Results are medians over --repeats runs, in milliseconds.
+
+    python benchmarks/bench_startup.py                      # run, compare to baseline
+    python benchmarks/bench_startup.py --output out.json    # also write results
+    python benchmarks/bench_startup.py --update-baseline    # accept current numbers
+
+A metric regresses when it is slower than the baseline by more than
+--max-regression (relative) AND by more than --min-delta-ms (absolute); the
+baseline file may override either per metric under "thresholds". The exit
+status is 1 when any metric regresses.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+
+IMPORT_TARGETS = [
+    "src.app_integration",
+    "gecce_kernel.core.types",
+    "gecce_kernel.core.event_bus",
+    "gecce_kernel.core.registry",
+]
+
+STEADY_INPUTS = [
+    "Tell me a story about robots",
+    "Calculate the square root of 256",
+    "I feel lonely today",
+    "What a weird dream I had",
+]
+
+def synthetic_genome(n_loci, seed=0):
+    """Deterministic mixed range/categorical genome of n_loci loci."""
+    rng = random.Random(seed)
+    loci = []
+    for i in range(n_loci):
+        if rng.random() < 0.7:
+            lo = round(rng.uniform(0.0, 0.5), 2)
+            hi = round(rng.uniform(lo, 1.0), 2)
+            dist = {"type": "range", "values": {"min": lo, "max": hi, "default": round(rng.uniform(lo, hi), 2)}}
+        else:
+            k = rng.randint(1, 5)
+            dist = {"type": "categorical", "values": {f"c{j}": round(rng.uniform(0.05, 1.0), 2) for j in range(k)}}
+        loci.append({"id": f"locus_{i}", "category": "style", "distribution": dist, "variability": rng.random()})
+    return {"version": "1.0.0", "loci": loci}
+
+# --- Child side: one cold measurement per process ---
+
+def _child_import(module):
+    from src.utils.paths import ensure_kernel_path
+    if module.startswith("gecce_kernel"):
+        ensure_kernel_path()
+    import importlib
+    start = time.perf_counter()
+    importlib.import_module(module)
+    return {"import_ms": (time.perf_counter() - start) * 1000}
+
+def _child_service(genome_path, calls):
+    start = time.perf_counter()
+    from src.app_integration import PersonaService
+    imported = time.perf_counter()
+    service = PersonaService(genome_path=genome_path or None, session_dir="sessions")
+    constructed = time.perf_counter()
+    service.get_llm_payload("Tell me a story about robots", session_id="bench_first")
+    first = time.perf_counter()
+
+    latencies = []
+    for i in range(calls):
+        text = STEADY_INPUTS[i % len(STEADY_INPUTS)]
+        t0 = time.perf_counter()
+        service.get_llm_payload(text, session_id=f"bench_{i % 32}")
+        latencies.append((time.perf_counter() - t0) * 1000)
+    latencies.sort()
+    return {
+        "import_ms": (imported - start) * 1000,
+        "construct_ms": (constructed - imported) * 1000,
+        "first_call_ms": (first - constructed) * 1000,
+        "steady_p50_ms": latencies[len(latencies) // 2],
+        "steady_p95_ms": latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))],
+    }
+
+def _run_child(args, workdir):
+    env = dict(os.environ, PYTHONPATH=ROOT + os.pathsep + os.environ.get("PYTHONPATH", ""))
+    result = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), "--child"] + args,
+        cwd=workdir, env=env, capture_output=True, text=True, check=True
+    )
+    # Engine diagnostics go to stderr; the measurement is the last stdout line
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+# --- Parent side ---
+
+def run_suite(repeats, calls, synthetic_loci):
+    samples = {}
+
+    def add(name, value):
+        samples.setdefault(name, []).append(value)
+
+    with tempfile.TemporaryDirectory() as workdir:
+        synthetic_path = os.path.join(workdir, "synthetic_genome.json")
+        with open(synthetic_path, "w") as f:
+            json.dump(synthetic_genome(synthetic_loci), f)
+        genomes = {"sample": "", f"synthetic_{synthetic_loci}": synthetic_path}
+
+        for _ in range(repeats):
+            for module in IMPORT_TARGETS:
+                add(f"import.{module}", _run_child(["import", module], workdir)["import_ms"])
+            for label, path in genomes.items():
+                # Fresh working directory per run: no hibernated sessions or journals carry over
+                run_dir = tempfile.mkdtemp(dir=workdir)
+                measured = _run_child(["service", path, str(calls)], run_dir)
+                for metric, value in measured.items():
+                    add(f"{label}.{metric}", value)
+
+    return {name: round(statistics.median(values), 3) for name, values in samples.items()}
+
+def compare(results, baseline, max_regression, min_delta_ms):
+    """Returns (metric, baseline_ms, current_ms, limit_ms) for every regressed metric."""
+    overrides = baseline.get("thresholds", {})
+    regressions = []
+    for metric, reference in baseline.get("results", {}).items():
+        if metric not in results:
+            continue
+        limits = overrides.get(metric, {})
+        relative = limits.get("max_regression", max_regression)
+        absolute = limits.get("min_delta_ms", min_delta_ms)
+        limit = max(reference * (1 + relative), reference + absolute)
+        if results[metric] > limit:
+            regressions.append((metric, reference, results[metric], limit))
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description="Persona Engine startup/cold-path benchmarks")
+    parser.add_argument("--repeats", type=int, default=5, help="Cold runs per metric (median is reported)")
+    parser.add_argument("--calls", type=int, default=200, help="Steady-state calls per run")
+    parser.add_argument("--synthetic-loci", type=int, default=500, help="Size of the synthetic genome")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="Baseline JSON to compare against")
+    parser.add_argument("--output", help="Write results JSON to this path")
+    parser.add_argument("--max-regression", type=float, default=0.25,
+                        help="Allowed relative slowdown per metric (default: 0.25 = 25%%)")
+    parser.add_argument("--min-delta-ms", type=float, default=5.0,
+                        help="Slowdowns below this many ms are treated as noise")
+    parser.add_argument("--update-baseline", action="store_true", help="Store the results as the new baseline")
+    parser.add_argument("--child", nargs=argparse.REMAINDER, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child is not None:
+        kind, rest = args.child[0], args.child[1:]
+        measured = _child_import(rest[0]) if kind == "import" else _child_service(rest[0], int(rest[1]))
+        print(json.dumps(measured))
+        return
+
+    results = run_suite(args.repeats, args.calls, args.synthetic_loci)
+    report = {
+        "meta": {
+            "timestamp": time.time(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "repeats": args.repeats,
+            "calls": args.calls,
+        },
+        "results": results,
+    }
+
+    for metric, value in sorted(results.items()):
+        sys.stderr.write(f"{metric:<48} {value:>10.2f} ms\n")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+    if args.update_baseline:
+        previous = {}
+        if os.path.exists(args.baseline):
+            with open(args.baseline) as f:
+                previous = json.load(f)
+        # Hand-tuned per-metric thresholds survive a baseline refresh
+        report["thresholds"] = previous.get("thresholds", {})
+        with open(args.baseline, "w") as f:
+            json.dump(report, f, indent=2)
+        sys.stderr.write(f"Baseline written to {args.baseline}\n")
+        return
+
+    if not os.path.exists(args.baseline):
+        sys.stderr.write("No baseline found; run with --update-baseline to create one.\n")
+        return
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    regressions = compare(results, baseline, args.max_regression, args.min_delta_ms)
+    for metric, reference, current, limit in regressions:
+        sys.stderr.write(f"REGRESSION {metric}: {reference:.2f} -> {current:.2f} ms (limit {limit:.2f} ms)\n")
+    if regressions:
+        sys.exit(1)
+    sys.stderr.write("No regressions against baseline.\n")
+
+if __name__ == "__main__":
+    main()
@@ -1,51 +1,338 @@
+import contextvars
 import json
 import os
 import sys
+import threading
+from collections import OrderedDict
 
 from src.utils.paths import resolve_resource
 
 from src.l0_orchestrator.engine import PersonaEngine
 from src.l1_core.fsm import PersonaFSM, PersonaState
 from src.l3_expression.projection import SeededSampler
+from src.l3_expression.projection_cache import ProjectionCache
 from src.l3_expression.prompt_augmenter import PromptAugmenter
 from src.l2_genome.archetypes import ArchetypeManager
-from src.l0_orchestrator.persistence import SnapshotManager
+from src.l2_genome.compiled import CompiledGenome
 from src.l3_expression.memory_bridge import MemorySalienceBridge
 from src.l4_memory.journal import PersonaReflectionJournal
+from src.l0_orchestrator.scene_classifier import ScenarioClassifier
+from src.l0_orchestrator.sessions import SessionPool, SessionState
+
+ARCHETYPE_PRESETS_PATH = "src/l2_genome/presets/standard_archetypes.json"
+RUNTIME_PARTS = ("classifier", "presets", "prompts")
 
 class PersonaService:
-    def __init__(self, genome_path=None, persona_id="pioneer_v2", use_kernel=False):
+    def __init__(self, genome_path=None, persona_id="pioneer_v2", use_kernel=False,
+                 max_sessions=None, max_session_bytes=None, session_dir=None, journal_path=None):
+        from src import config
+
         # 1. 初始化内核组件
         if genome_path is None:
             genome_path = resolve_resource("src/l2_genome/sample_genome.json")
             
         with open(genome_path, "r") as f:
-            self.genome = json.load(f)
+            self.base_genome = json.load(f)
+        self.base_compiled_genome = CompiledGenome(self.base_genome)
+        self.persona_id = persona_id
         
         if use_kernel:
             from src.kernel_integration import PersonaKernel
             self.kernel = PersonaKernel()
         else:
             self.kernel = None
-        self.fsm = PersonaFSM(persona_id=persona_id, initial_state=PersonaState.STABLE)
-        self.engine = PersonaEngine(self.fsm, self.genome)
+
+        # 2. Shared, immutable-per-cycle components
+        self.classifier = ScenarioClassifier(config.FACT_KEYWORDS, config.SUPPORT_KEYWORDS)
+        self.keywords_path = config.__file__  # source of the keyword tables on hot reload
         self.sampler = SeededSampler()
         self.augmenter = PromptAugmenter()
-        self.archetype_mgr = ArchetypeManager(self.genome)
-        self.persistence = SnapshotManager()
-        self.memory_bridge = MemorySalienceBridge(self.fsm)
-        self.journal = PersonaReflectionJournal()
-        
-        from src.l4_memory.short_term import ShortTermMemory
-        self.stm = ShortTermMemory(max_entries=10)
+        self.prompt_layout = config.PROMPT_LAYOUT  # "classic" or "prefix_stable"
+        self.prompt_token_budget = config.PROMPT_TOKEN_BUDGET  # None renders uncompacted
+        self.projection_cache = ProjectionCache(config.PROJECTION_CACHE_SIZE)
+        self.archetype_mgr = ArchetypeManager(self.base_genome, resolve_resource(ARCHETYPE_PRESETS_PATH))
+        # Stance genomes are overlay views on the base genome, shared by every session
+        # holding that stance. The recommended and named preset stances are built up front.
+        self._stance_genomes = OrderedDict()
+        self._stance_genomes_max = config.STANCE_OVERLAY_CACHE_SIZE
+        self._stance_lock = threading.Lock()
+        if config.STANCE_LATTICE_PATH:
+            self._attach_lattice(resolve_resource(config.STANCE_LATTICE_PATH))
+        self._stance_base, self._preset_stance_genomes = self._build_stance_tables(self.archetype_mgr)
+        self.watcher = None  # RuntimeWatcher, see watch_runtime()
+        self._persistence = None  # SnapshotManager, built on first snapshot
+        self.journal = PersonaReflectionJournal(journal_path)
         
         from src.l2_genome.habits import HabitGenerator
         self.habit_gen = HabitGenerator()
+
+        # 3. Per-session mutable state (FSM, affect, history, STM) in a bounded LRU pool
+        self.sessions = SessionPool(
+            factory=self._create_session,
+            restore=self._restore_session,
+            max_sessions=max_sessions or config.SESSION_POOL_MAX_SESSIONS,
+            max_bytes=max_session_bytes or config.SESSION_POOL_MAX_BYTES,
+            hibernate_dir=session_dir or config.SESSION_HIBERNATE_DIR
+        )
+        # The active session is context-local: each thread / asyncio task sees the
+        # session its own cycle bound; contexts that never bound one fall back to
+        # the most recently bound session.
+        self._active_session = contextvars.ContextVar(f"persona_active_session_{id(self)}", default=None)
+        self._fallback_session = None
+        self.bind_session(config.DEFAULT_SESSION_ID)
         
         # Sprint 2: Cognitive Pipeline
         from src.l0_orchestrator.pipeline import CognitiveDirector
         self.director = CognitiveDirector(self)
 
+        if config.HOT_RELOAD_ENABLED:
+            self.watch_runtime()
+
+    @property
+    def persistence(self):
+        # Snapshots are optional: skip the import and the snapshot directory until used
+        if self._persistence is None:
+            from src.l0_orchestrator.persistence import SnapshotManager
+            self._persistence = SnapshotManager()
+        return self._persistence
+
+    # --- Session management ---
+
+    def _create_session(self, session_id):
+        from src.l4_memory.short_term import ShortTermMemory
+
+        fsm = PersonaFSM(persona_id=self.persona_id, initial_state=PersonaState.STABLE)
+        engine = PersonaEngine(fsm, self.base_genome, classifier=self.classifier)
+        return SessionState(
+            session_id,
+            fsm=fsm,
+            engine=engine,
+            stm=ShortTermMemory(max_entries=10),
+            memory_bridge=MemorySalienceBridge(fsm),
+            compiled_genome=self.base_compiled_genome
+        )
+
+    def _restore_session(self, session, data):
+        session.fsm.from_dict(data["fsm_state"])
+        engine_state = data.get("engine", {})
+        session.engine.influence_level = engine_state.get("influence_level", 1.0)
+        session.engine.kill_switch_active = engine_state.get("kill_switch_active", False)
+        if "stance_window" in engine_state:
+            session.engine.stance_window.load(engine_state["stance_window"])
+        else:
+            # Sessions hibernated before the rolling window kept raw outputs
+            for text in engine_state.get("interaction_history", []):
+                session.engine.log_interaction(text)
+        session.stm.entries = data.get("stm_entries", [])
+
+        # Genomes are rebuilt from the stance rather than stored
+        if data.get("genome") is not None:
+            self._assign_genome(session, CompiledGenome(data["genome"]), custom=True)
+        elif data.get("stance") is not None:
+            rigor, warmth, chaos = data["stance"]
+            self._assign_genome(session, self.stance_genome(rigor, warmth, chaos))
+            session.stance = (rigor, warmth, chaos)
+
+    def _attach_lattice(self, path):
+        from src.l2_genome.lattice import StanceLattice
+        try:
+            self.archetype_mgr.lattice = StanceLattice.load(path, self.base_compiled_genome)
+        except (OSError, ValueError) as e:
+            # Exact mapping still works; the lattice is only an accelerator
+            sys.stderr.write(f"⚠️  Stance lattice not used: {e}\n")
+
+    @staticmethod
+    def _build_stance_genome(stance_base, rigor, warmth, chaos, exact=False):
+        archetype_mgr, base = stance_base
+        if archetype_mgr.lattice is not None and not exact:
+            return archetype_mgr.lattice.compiled(rigor, warmth, chaos)
+        return base.with_overlay(archetype_mgr.stance_overlay(rigor, warmth, chaos))
+
+    def _build_stance_tables(self, archetype_mgr):
+        """
+        Returns ((archetype_mgr, base CompiledGenome), {stance: view}) with the
+        overlays of the recommended stances and the manager's named presets.
+        """
+        from src import config
+        if archetype_mgr.base_genome is self.base_genome:
+            base = self.base_compiled_genome
+        else:
+            base = CompiledGenome(archetype_mgr.base_genome)
+        stance_base = (archetype_mgr, base)
+        presets = {}
+        for stance in list(config.STANCE_OVERLAY_PRESETS) + list(archetype_mgr.presets.values()):
+            key = (stance['rigor'], stance['warmth'], stance['chaos'])
+            if key not in presets:
+                presets[key] = self._build_stance_genome(stance_base, *key, exact=True)
+        return stance_base, presets
+
+    def stance_genome(self, rigor, warmth, chaos):
+        """
+        Returns the shared CompiledGenome view for a stance: the stance's overlay
+        on the base genome, built once. Callers must treat it as read-only.
+        """
+        key = (rigor, warmth, chaos)
+        with self._stance_lock:
+            if self._stance_base[0] is not self.archetype_mgr:
+                # The archetype manager was replaced (snapshot restore): overlays are relative to it
+                self._stance_base, self._preset_stance_genomes = self._build_stance_tables(self.archetype_mgr)
+                self._stance_genomes = OrderedDict()
+            cached = self._preset_stance_genomes.get(key)
+            if cached is not None:
+                return cached
+            stance_base, lru = self._stance_base, self._stance_genomes
+            cached = lru.get(key)
+            if cached is not None:
+                lru.move_to_end(key)
+                return cached
+        
+        built = self._build_stance_genome(stance_base, rigor, warmth, chaos)
+        with self._stance_lock:
+            # Another thread may have built the same stance meanwhile; keep the first.
+            # If the tables were swapped meanwhile, `lru` is simply discarded with them.
+            cached = lru.setdefault(key, built)
+            while len(lru) > self._stance_genomes_max:
+                lru.popitem(last=False)
+        return cached
+
+    def _session_stance_genome(self, session, rigor, warmth, chaos):
+        """
+        Genome view for `session` moving to a stance. With a lattice attached,
+        non-preset stances are interpolated into a view the session owns, in
+        place, so a slider sweep neither allocates nor churns the shared LRU.
+        Runs under the session's cycle lock (or with no cycle in flight).
+        """
+        lattice = self.archetype_mgr.lattice
+        if lattice is None or (rigor, warmth, chaos) in self._preset_stance_genomes:
+            return self.stance_genome(rigor, warmth, chaos)
+        session.stance_view = lattice.compiled(rigor, warmth, chaos, into=session.stance_view)
+        return session.stance_view
+
+    # --- Hot reload ---
+
+    def runtime_sources(self):
+        """
+        Files behind each hot-reloadable part of the runtime:
+        classifier (keyword tables in config.py), presets (archetype presets and
+        their stance overlays) and prompts (prompt manifold).
+        """
+        return {
+            "classifier": str(self.keywords_path),
+            "presets": str(self.archetype_mgr.config_path),
+            "prompts": str(self.augmenter.manifold_path),
+        }
+
+    def reload_runtime(self, parts=RUNTIME_PARTS):
+        """
+        Rebuilds the given runtime parts from disk and swaps them in.
+        Everything is built before anything is swapped, so a failing rebuild (bad
+        regex, malformed JSON) raises and leaves the running tables untouched.
+        Each swap is a single reference assignment: an in-flight cycle finishes on
+        whichever table it already read, later cycles see the new one.
+        """
+        from src import config
+        from src.l0_orchestrator.hot_reload import read_config_values
+
+        classifier = augmenter = archetype_mgr = None
+        if "classifier" in parts:
+            values = read_config_values(self.keywords_path, ("FACT_KEYWORDS", "SUPPORT_KEYWORDS"))
+            classifier = ScenarioClassifier(values["FACT_KEYWORDS"], values["SUPPORT_KEYWORDS"])
+        if "presets" in parts:
+            current = self.archetype_mgr
+            archetype_mgr = ArchetypeManager(current.base_genome, current.config_path)
+            archetype_mgr.lattice = current.lattice
+            stance_tables = self._build_stance_tables(archetype_mgr)
+        if "prompts" in parts:
+            augmenter = PromptAugmenter(self.augmenter.manifold_path)
+
+        if classifier is not None:
+            self.classifier = classifier
+            # New sessions pick the classifier up from the factory; live ones are repointed
+            for session in self.sessions.resident():
+                session.engine.classifier = classifier
+        if archetype_mgr is not None:
+            with self._stance_lock:
+                # Overlays depend only on the base genome; the LRU survives unless it changed
+                if stance_tables[0][1] is not self._stance_base[1]:
+                    self._stance_genomes = OrderedDict()
+                self.archetype_mgr = archetype_mgr
+                self._stance_base, self._preset_stance_genomes = stance_tables
+        if augmenter is not None:
+            # Augmenter first: a cycle that sees the new (empty) cache also sees the new prompts
+            self.augmenter = augmenter
+            self.projection_cache = ProjectionCache(config.PROJECTION_CACHE_SIZE)
+
+    def watch_runtime(self, interval=None):
+        """Starts (once) a background RuntimeWatcher that hot-reloads changed parts."""
+        if self.watcher is None:
+            from src.l0_orchestrator.hot_reload import RuntimeWatcher
+            self.watcher = RuntimeWatcher(self, interval=interval).start()
+        return self.watcher
+
+    def close(self):
+        """
+        Stops the hot-reload watcher and closes the journal: its last entries
+        are flushed, its flusher thread stops and its atexit hook is removed.
+        Sessions are left as they are (see SessionPool.hibernate_all).
+        """
+        if self.watcher is not None:
+            self.watcher.stop()
+            self.watcher = None
+        self.journal.close()
+
+    def _assign_genome(self, session, compiled_genome, custom=False):
+        # A genome swap is a pointer swap on the session; shared genomes are never edited
+        session.compiled_genome = compiled_genome
+        session.engine.bind_genome(compiled_genome)
+        session.custom_genome = custom
+        if custom:
+            session.stance = None
+
+    def bind_session(self, session_id, session=None):
+        """
+        Makes session_id the active session (for the current thread / task) and
+        returns its state. The fsm/engine/stm/genome accessors below resolve
+        against the active session. `session` is its state when the caller
+        already holds it (e.g. pinned for a cycle), sparing a pool lookup.
+        """
+        if session is None:
+            session = self.sessions.get(session_id)
+        self._active_session.set(session)
+        self._fallback_session = session
+        return session
+
+    @property
+    def session(self):
+        return self._active_session.get() or self._fallback_session
+
+    @property
+    def fsm(self):
+        return self.session.fsm
+
+    @property
+    def engine(self):
+        return self.session.engine
+
+    @property
+    def stm(self):
+        return self.session.stm
+
+    @property
+    def memory_bridge(self):
+        return self.session.memory_bridge
+
+    @property
+    def genome(self):
+        return self.session.genome
+
+    @genome.setter
+    def genome(self, genome):
+        self._assign_genome(self.session, CompiledGenome(genome), custom=True)
+
+    @property
+    def compiled_genome(self):
+        return self.session.compiled_genome
+
     def get_memory_filters(self):
         """
         Returns filters for downstream Vector DB retrieval.
@@ -60,36 +347,70 @@ class PersonaService:
             return self.persistence.load_snapshot(self, filepath)
         return self.persistence.load_latest_snapshot(self)
 
-    def set_stance(self, rigor=0.5, warmth=0.5, chaos=0.3, preset_name=None):
+    def set_stance(self, rigor=0.5, warmth=0.5, chaos=0.3, preset_name=None, session=None):
         """
         Set the persona's stance using RWC vectors or a preset name.
+        Applies to the given session state (defaults to the active session).
         """
+        session = session or self.session
         if preset_name:
             stance = self.archetype_mgr.get_preset_stance(preset_name)
             rigor, warmth, chaos = stance['rigor'], stance['warmth'], stance['chaos']
             sys.stderr.write(f"🎭 Loading Preset Stance: {preset_name}\n")
 
-        # A. Calculate Genome from Stance
-        self.genome = self.archetype_mgr.calculate_genome_from_stance(rigor, warmth, chaos)
-        self.engine.genome = self.genome 
+        # A. Stance overlay on the shared base genome (precomputed / cached per stance)
+        if session.stance != (rigor, warmth, chaos):
+            self._assign_genome(session, self._session_stance_genome(session, rigor, warmth, chaos))
+            session.stance = (rigor, warmth, chaos)
         
         # B. Sync Affective Baseline
         bl = self.archetype_mgr.get_affect_baseline(rigor, warmth, chaos)
-        self.fsm.affect.set_baseline(p=bl['p'], a=bl['a'], d=bl['d'])
+        session.fsm.affect.set_baseline(p=bl['p'], a=bl['a'], d=bl['d'])
             
         sys.stderr.write(f"🌊 Stance Adjusted -> Rigor: {rigor}, Warmth: {warmth}, Chaos: {chaos}\n")
 
-    def get_llm_payload(self, user_input, session_id="user_123", override_influence=None, manual_seed=None):
+    def get_llm_payload(self, user_input, session_id="user_123", override_influence=None, manual_seed=None,
+                        profile=None):
         """
         核心方法：将普通的用户请求，包装成带有“人格指令”的 LLM 请求包。
         Sprint 2: Now orchestrates via the CognitiveDirector.
+        profile names a pipeline profile (config.PIPELINE_PROFILES); None picks one from the scene.
         """
         # A. 执行 Pipeline Cycle
-        context = self.director.run_cycle(user_input, session_id=session_id, manual_seed=manual_seed)
+        context = self.director.run_cycle(user_input, session_id=session_id, manual_seed=manual_seed,
+                                          profile=profile)
         
         # B. 返回生成的 Artifact
         return context.artifact
 
+    def get_llm_payload_batch(self, user_inputs, session_id="user_123", manual_seed=None, profile=None):
+        """
+        Batch entry point: returns the artifacts that N sequential get_llm_payload
+        calls would return (trace ids aside), computed in shared passes.
+        session_id / manual_seed / profile may be a single value or one value per input.
+        """
+        n = len(user_inputs)
+        session_ids = [session_id] * n if isinstance(session_id, str) else list(session_id)
+        manual_seeds = list(manual_seed) if isinstance(manual_seed, (list, tuple)) else [manual_seed] * n
+        profiles = list(profile) if isinstance(profile, (list, tuple)) else [profile] * n
+        if len(session_ids) != n or len(manual_seeds) != n or len(profiles) != n:
+            raise ValueError("session_id, manual_seed and profile lists must match the number of inputs.")
+        
+        contexts = self.director.run_batch(list(user_inputs), session_ids, manual_seeds, profiles)
+        return [context.artifact for context in contexts]
+
+    async def get_llm_payload_async(self, user_input, session_id="user_123", override_influence=None, manual_seed=None,
+                                    profile=None):
+        """
+        Asyncio counterpart of get_llm_payload for event-loop based gateways.
+        """
+        context = await self.director.run_cycle_async(user_input, session_id=session_id, manual_seed=manual_seed,
+                                                      profile=profile)
+        return context.artifact
+
+    async def save_state_async(self, label="auto"):
+        return await self.persistence.save_snapshot_async(self, label)
+
 # --- 模拟业务调用 ---
 if __name__ == "__main__":
     service = PersonaService()
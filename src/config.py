@@ -42,3 +42,91 @@ GENOME_PATH = "src/l2_genome/sample_genome.json"
 # (Will be used more extensively in Sprint 3)
 PASSIVE_DECAY_RATE = 0.05
 LOCKED_DECAY_MULTIPLIER = 0.2
+
+# --- 6. Session Pool (L0) ---
+# Per-session state (FSM, affect, history, STM) is kept in a bounded LRU pool.
+# Evicted sessions hibernate to SESSION_HIBERNATE_DIR and rehydrate on demand.
+DEFAULT_SESSION_ID = "user_123"
+SESSION_POOL_MAX_SESSIONS = 10000
+SESSION_POOL_MAX_BYTES = 256 * 1024 * 1024
+SESSION_HIBERNATE_DIR = "sessions"
+# save_state() / load_state() snapshots.
+SNAPSHOT_DIR = "snapshots"
+
+# --- 7. Projection Cache (L3) ---
+# Rendered projections are reused while (genome, session, time bucket, influence,
+# quantized affect warp, intimacy) are unchanged. Warp factors are snapped to
+# multiples of PROJECTION_WARP_QUANTUM before sampling (0 disables quantization).
+PROJECTION_CACHE_SIZE = 4096
+PROJECTION_WARP_QUANTUM = 0.05
+
+# --- 8. Pipeline Profiles (L0) ---
+# Named step sequences for the CognitiveDirector (step names: see
+# pipeline.STEP_REGISTRY). Every profile starts with scenario analysis; when a
+# call does not request a profile, the analysed scene selects one below.
+PIPELINE_PROFILES = {
+    "full": ["scenario_analysis", "fsm_evaluation", "validation", "projection", "memory_refinement"],
+    # Stateless preview: no generated habits, nothing written to STM or the journal
+    "lite": ["scenario_analysis", "fsm_evaluation", "validation", "projection_lite"],
+    # STRICT_FACT: modal (precomputed) projection without habits
+    "fact_fastpath": ["scenario_analysis", "fsm_evaluation", "validation", "projection_precomputed", "memory_refinement"],
+}
+PIPELINE_DEFAULT_PROFILE = "full"
+PIPELINE_SCENE_PROFILES = {"STRICT_FACT": "fact_fastpath"}
+
+# --- 9. Persona Daemon ---
+# Unix socket shared by `persona_cli --serve` and `persona_cli --socket`
+DAEMON_SOCKET_PATH = "/tmp/persona_engine.sock"
+# On shutdown, open connections get this long to finish their current request
+DAEMON_DRAIN_TIMEOUT_S = 10
+
+# --- 10. Stance Overlays (L2) ---
+# Stances are applied as overlays on the shared base genome. The recommended
+# stances are precomputed at startup; any other stance is built on first use
+# and kept in a bounded LRU.
+STANCE_OVERLAY_PRESETS = (DEFAULT_STANCE, FACTUAL_STANCE, SUPPORTIVE_STANCE)
+STANCE_OVERLAY_CACHE_SIZE = 256
+# Optional precompiled stance lattice (python -m src.l2_genome.lattice --output ...).
+# When set, stances outside the presets are interpolated from it instead of
+# mapped exactly; the interpolation error is stored in the lattice file.
+STANCE_LATTICE_PATH = None
+STANCE_LATTICE_RESOLUTION = 9
+
+# --- 11. Hot Reload ---
+# A RuntimeWatcher polls the keyword tables (this file), the archetype presets
+# and the prompt manifold, and swaps rebuilt tables into the running service.
+HOT_RELOAD_ENABLED = False
+HOT_RELOAD_INTERVAL = 2.0  # seconds between mtime polls
+
+# --- 12. Prompt Layout (L3) ---
+# "classic": trait sections, then habits, then governance (original order).
+# "prefix_stable": most stable sections first (role, habits, policies, ...) so
+# provider-side prefix caches hit across turns; see l3_expression/prompt_layout.py.
+PROMPT_LAYOUT = "classic"
+# Estimated-token budget for the system prompt. When set, prompts render compact
+# and the lowest-priority sections are trimmed to fit (ROLE and governance never).
+PROMPT_TOKEN_BUDGET = None
+
+# --- 13. Reflection Journal (L4) ---
+# Journal entries are queued and group-committed by a background flusher: every
+# JOURNAL_FLUSH_EVERY entries, every JOURNAL_FLUSH_INTERVAL_MS, and on shutdown
+# (0 / None disables a trigger). JOURNAL_FSYNC: "never" (page cache only),
+# "flush" (fsync every flush) or "close" (fsync on shutdown only).
+JOURNAL_PATH = "logs/persona_journal.jsonl"
+JOURNAL_FLUSH_EVERY = 64
+JOURNAL_FLUSH_INTERVAL_MS = 200
+JOURNAL_FSYNC = "close"
+JOURNAL_MAX_PENDING = 10000
+# Segments next to JOURNAL_PATH rotate past either limit; every segment keeps a
+# sidecar index with the byte offset of every JOURNAL_INDEX_STRIDE-th entry.
+JOURNAL_SEGMENT_MAX_BYTES = 64 * 1024 * 1024
+JOURNAL_SEGMENT_MAX_AGE_S = 24 * 3600
+JOURNAL_INDEX_STRIDE = 256
+# Sealed segments are compressed in independently decodable blocks (one per
+# index stride): "zlib", "lzma" or "none".
+JOURNAL_COMPRESSION = "zlib"
+# Optional SQLite (WAL) index of timestamp / interaction / state / PAD, fed by the
+# journal's flusher and queried with journal.query(); e.g. "logs/persona_journal.sqlite".
+JOURNAL_SQLITE_PATH = None
+# Decoded entries kept in memory for get_recent_insights (per segment tail).
+JOURNAL_RECENT_CACHE = 256
@@ -1,14 +1,48 @@
-import sys
 import os
 import json
 import time
-from src.utils.paths import resolve_resource
-sys.path.append(str(resolve_resource("gecce_kernel_pkg")))
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional
+from src.utils.paths import ensure_kernel_path
+from src import config
+ensure_kernel_path()
 
 from gecce_kernel.core.event_bus import EventBus
 from gecce_kernel.core.registry import ModuleRegistry
 from gecce_kernel.core.types import Event, EventType
-from gecce_kernel.core.modules.base_module import BaseFeatureModule, ModuleContext, ModuleResult
+from gecce_kernel.core.logging_config import logger
+
+# Persona counterparts of gecce_kernel.core.modules.base_module. That module
+# types ModuleContext.data as a pandas DataFrame (market data), so importing it
+# costs a pandas import the persona runtime never uses.
+
+@dataclass
+class ModuleContext:
+    """
+    Execution context handed to persona modules.
+    data carries whatever the module consumes (text, projections, state dicts).
+    """
+    data: Any = None
+    window: int = 5
+    params: Dict[str, Any] = field(default_factory=dict)
+    shared_state: Dict[str, Any] = field(default_factory=dict)
+
+@dataclass
+class ModuleResult:
+    """
+    Standard module result; same fields as the gecce_kernel ModuleResult.
+    """
+    markers: list = field(default_factory=list)
+    drawings: Dict[str, list] = field(default_factory=lambda: {
+        'rectangles': [],
+        'lines': [],
+        'texts': []
+    })
+    metrics: Dict[str, Any] = field(default_factory=dict)
+    metadata: Dict[str, Any] = field(default_factory=dict)
+    success: bool = True
+    error_message: Optional[str] = None
 
 class PersonaKernel:
     """
@@ -43,8 +77,8 @@ class PersonaKernel:
         self.publish_event(EventType.SNAPSHOT_CREATED, "KernelManager", snapshot)
         
         # 也可以保存到本地文件
-        os.makedirs("snapshots", exist_ok=True)
-        filename = f"snapshots/snapshot_{label}_{int(snapshot['timestamp'])}.json"
+        os.makedirs(config.SNAPSHOT_DIR, exist_ok=True)
+        filename = os.path.join(config.SNAPSHOT_DIR, f"snapshot_{label}_{int(snapshot['timestamp'])}.json")
         with open(filename, "w") as f:
             json.dump(snapshot, f, indent=2)
             
@@ -66,14 +100,53 @@ class PersonaKernel:
         self.bus.stop()
 
 # 定义 Persona 基础模块类
-class PersonaBaseModule(BaseFeatureModule):
+class PersonaBaseModule(ABC):
     """
     所有内核化的人格模块都应继承此类。
+    Same interface as gecce_kernel's BaseFeatureModule (process/validate/setup/
+    teardown/execute/get_config) without its pandas dependency.
     """
     def __init__(self, bus: EventBus, **kwargs):
-        super().__init__(**kwargs)
+        self.config = kwargs
+        self.name = self.__class__.__name__
         self.bus = bus
 
+    @abstractmethod
+    def process(self, context: ModuleContext) -> ModuleResult:
+        raise NotImplementedError(f"{self.name}.process() must be implemented")
+
+    def validate(self, context: ModuleContext) -> bool:
+        """Input check before process(); persona modules accept any payload by default."""
+        return True
+
+    def setup(self) -> None:
+        pass
+
+    def teardown(self) -> None:
+        pass
+
+    def execute(self, context: ModuleContext) -> ModuleResult:
+        """
+        Validates, processes and stamps metadata, turning failures into an
+        unsuccessful ModuleResult.
+        """
+        try:
+            if not self.validate(context):
+                return ModuleResult(success=False, error_message=f"Input validation failed for {self.name}")
+            result = self.process(context)
+            result.metadata['module'] = self.name
+            result.metadata['window'] = context.window
+            return result
+        except Exception as e:
+            logger.error(f"❌ [{self.name}] execution failed: {e}")
+            return ModuleResult(success=False, error_message=str(e), metadata={'module': self.name})
+
+    def get_config(self, key: str, default: Any = None) -> Any:
+        return self.config.get(key, default)
+
+    def __repr__(self) -> str:
+        return f"<{self.name} config={self.config}>"
+
     def capture_state(self) -> dict:
         """
         返回模块的当前内部状态以便进行快照。
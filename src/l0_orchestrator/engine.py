@@ -1,12 +1,12 @@
-import re
 import sys
 
 import json
 from src.l1_core.fsm import PersonaFSM, PersonaState
-from src.l4_memory.metrics import StanceAnalyzer
+from src.l4_memory.metrics import StanceAnalyzer, RollingStanceWindow
+from src.l0_orchestrator.scene_classifier import ScenarioClassifier
 
 class PersonaEngine:
-    def __init__(self, core_fsm=None, genome_l2=None, snapshot=None):
+    def __init__(self, core_fsm=None, genome_l2=None, snapshot=None, classifier=None):
         if snapshot:
             with open(snapshot, 'r') as f:
                 data = json.load(f)
@@ -23,34 +23,41 @@ class PersonaEngine:
             raise ValueError("Must provide either (core_fsm, genome_l2) or a valid snapshot path.")
             
         self.fsm = core_fsm
+        self._compiled_genome = None
         self.genome = genome_l2
         self.influence_level = 1.0  # [0.0 - 1.0]
         self.kill_switch_active = False
+        from src import config
         self.metrics = StanceAnalyzer()
-        self.interaction_history = [] # Stores last N outputs
+        # Rolling marker/word statistics of the last N outputs (raw text is not kept)
+        self.stance_window = RollingStanceWindow(self.metrics, window=config.HISTORY_WINDOW_SIZE)
         self.baseline_stance = {"rigor": 0.9, "warmth": 0.2, "chaos": 0.1} # Default Enterprise Baseline
 
-        from src import config
         self.fact_keywords = config.FACT_KEYWORDS
         self.support_keywords = config.SUPPORT_KEYWORDS
+        # Keyword sets are compiled once; callers may share a prebuilt classifier.
+        self.classifier = classifier or ScenarioClassifier(self.fact_keywords, self.support_keywords)
+
+    @property
+    def genome(self):
+        if self._compiled_genome is not None:
+            return self._compiled_genome.genome
+        return self._genome
+
+    @genome.setter
+    def genome(self, genome):
+        self._genome, self._compiled_genome = genome, None
+
+    def bind_genome(self, compiled_genome):
+        """Uses compiled_genome's genome dict, materialized only when it is read."""
+        self._compiled_genome = compiled_genome
 
     def analyze_scenario(self, user_input):
         """
         Determines if the current scene requires strict fact-checking (degrade persona)
         or allows social expression (full persona).
         """
-        user_input = user_input.lower()
-        sys.stderr.write(f"DEBUG: Processing input: '{user_input}'\n")
-        
-        for kw in self.fact_keywords:
-            if re.search(kw, user_input):
-                return "STRICT_FACT"
-                
-        for kw in self.support_keywords:
-            if re.search(kw, user_input):
-                return "SOCIAL_SUPPORT"
-                
-        return "SOCIAL_CREATIVE"
+        return self.classifier.classify(user_input)
 
     def get_effective_constraints(self, user_input):
         """
@@ -102,18 +109,16 @@ class PersonaEngine:
     def log_interaction(self, system_output: str):
         """
         Records the system's output for drift analysis.
-        Keeps a rolling window of 20 turns.
+        Keeps a rolling window of HISTORY_WINDOW_SIZE turns (20 by default).
         """
-        self.interaction_history.append(system_output)
-        if len(self.interaction_history) > 20:
-            self.interaction_history.pop(0)
+        self.stance_window.append(system_output)
 
     def check_drift(self):
         """
         Phase 11 Gyroscope: Checks if observed stance deviates from baseline.
         Returns a correction instruction string or None.
         """
-        observed = self.metrics.analyze_history(self.interaction_history)
+        observed = self.stance_window.observed()
         drift = self.metrics.calculate_drift(self.baseline_stance, observed)
         
         correction = []
@@ -0,0 +1,86 @@
+"""
+Hot reload of the runtime tables (keywords, archetype presets, prompt manifold).
+A RuntimeWatcher polls the source files' mtimes and asks the PersonaService to
+rebuild and swap in only the parts whose files changed, so warm sessions and
+unaffected caches survive a tweak.
+"""
+import os
+import runpy
+import sys
+import threading
+
+def read_config_values(path, names):
+    """
+    Reads `names` from a fresh execution of the config file at `path`.
+    The imported config module itself is left untouched.
+    """
+    namespace = runpy.run_path(str(path))
+    return {name: namespace[name] for name in names}
+
+class RuntimeWatcher:
+    """
+    Polls the files behind service.runtime_sources() and calls
+    service.reload_runtime() with the parts that changed. Polling (mtime + size)
+    instead of inotify keeps it portable and dependency-free; the cost is one
+    stat() per file per interval.
+    A reload that fails (bad regex, malformed JSON) is reported and the old
+    tables keep serving; the file is retried after its next change.
+    """
+    def __init__(self, service, interval=None):
+        from src import config
+
+        self.service = service
+        self.interval = interval or config.HOT_RELOAD_INTERVAL
+        self.reloads = 0
+        self.last_error = None
+        self._stamps = self._scan()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _scan(self):
+        stamps = {}
+        for part, path in self.service.runtime_sources().items():
+            try:
+                stat = os.stat(path)
+                stamps[part] = (path, stat.st_mtime_ns, stat.st_size)
+            except OSError:
+                stamps[part] = (path, None, None)
+        return stamps
+
+    def poll(self):
+        """
+        Checks every source once. Returns the tuple of reloaded parts (empty when
+        nothing changed or the reload failed).
+        """
+        stamps = self._scan()
+        changed = tuple(part for part, stamp in stamps.items() if self._stamps.get(part) != stamp)
+        if not changed:
+            return ()
+        self._stamps = stamps
+        try:
+            self.service.reload_runtime(changed)
+        except Exception as e:
+            self.last_error = e
+            sys.stderr.write(f"⚠️  Hot reload of {', '.join(changed)} failed, keeping current tables: {e}\n")
+            return ()
+        self.reloads += 1
+        self.last_error = None
+        sys.stderr.write(f"♻️  Hot reloaded: {', '.join(changed)}\n")
+        return changed
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.poll()
+
+    def start(self):
+        """Starts the polling thread (daemon) and returns self."""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="persona-hot-reload", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
@@ -1,13 +1,10 @@
-import sys
-import os
 import re
 
-# Add path for gecce_kernel
-sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", "gecce_kernel_pkg")))
+from src.utils.paths import ensure_kernel_path
+ensure_kernel_path()
 
 from gecce_kernel.core.types import Event, EventType
-from gecce_kernel.core.modules.base_module import ModuleContext, ModuleResult
-from kernel_integration import PersonaBaseModule
+from kernel_integration import PersonaBaseModule, ModuleContext, ModuleResult
 
 class KernelOrchestrator(PersonaBaseModule):
     """
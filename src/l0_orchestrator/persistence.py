@@ -1,3 +1,4 @@
+import copy
 import json
 import os
 import time
@@ -6,14 +7,30 @@ class SnapshotManager:
     """
     Handles persisting and restoring the state of the Persona Engine.
     """
-    def __init__(self, snapshot_dir="snapshots"):
-        self.snapshot_dir = snapshot_dir
+    def __init__(self, snapshot_dir=None):
+        from src import config
+        self.snapshot_dir = snapshot_dir or config.SNAPSHOT_DIR
         os.makedirs(self.snapshot_dir, exist_ok=True)
 
     def save_snapshot(self, service, label="auto"):
         """
         Captures the current FSM state and Genome from a PersonaService instance.
         """
+        filepath, snapshot_data = self._capture(service, label)
+        return self._write(filepath, snapshot_data)
+
+    async def save_snapshot_async(self, service, label="auto"):
+        """
+        Awaitable save_snapshot: state is captured on the calling loop (so it is
+        consistent), only the file write is offloaded.
+        """
+        import asyncio
+        filepath, snapshot_data = self._capture(service, label)
+        # Detach from the live state so concurrent cycles cannot leak into the file
+        snapshot_data = copy.deepcopy(snapshot_data)
+        return await asyncio.to_thread(self._write, filepath, snapshot_data)
+
+    def _capture(self, service, label):
         timestamp = int(time.time())
         filename = f"snapshot_{label}_{timestamp}.json"
         filepath = os.path.join(self.snapshot_dir, filename)
@@ -25,7 +42,9 @@ class SnapshotManager:
             "fsm_state": service.fsm.to_dict(),
             "genome": service.genome
         }
+        return filepath, snapshot_data
 
+    def _write(self, filepath, snapshot_data):
         with open(filepath, "w", encoding="utf-8") as f:
             json.dump(snapshot_data, f, indent=2, ensure_ascii=False)
 
@@ -1,10 +1,24 @@
 from dataclasses import dataclass, field
+from functools import partial
 from typing import List, Dict, Any, Optional
+import os
 import uuid
 import time
-import sys
-from src.utils.paths import resolve_resource
-sys.path.append(str(resolve_resource("gecce_kernel_pkg")))
+from src.utils.paths import ensure_kernel_path
+from src.l3_expression.projection_cache import ProjectionCache, quantize_warp
+from src.l3_expression import prompt_layout
+
+def _kernel_event(event_type, source, data, metadata):
+    """
+    Builds a gecce_kernel Event. The kernel (and pydantic behind it) is only
+    imported here, i.e. when a bus is attached; steps name event types as
+    strings so that bus-less cycles never load it.
+    """
+    ensure_kernel_path()
+    from gecce_kernel.core.types import Event, EventType
+    if not isinstance(event_type, EventType):
+        event_type = EventType[event_type] if event_type in EventType.__members__ else EventType(event_type)
+    return Event(event_type=event_type, source=source, data=data, metadata=metadata)
 
 @dataclass
 class PipelineContext:
@@ -16,6 +30,8 @@ class PipelineContext:
     session_id: str = "default"
     user_input: str = ""
     manual_seed: Optional[int] = None
+    session: Any = None  # SessionState bound for this cycle
+    profile: Optional[str] = None  # Pipeline profile (None = pick from the scene)
     
     # Intermediate state
     scene: str = "UNKNOWN"
@@ -30,6 +46,46 @@ class PipelineContext:
     event_refs: List[str] = field(default_factory=list) # IDs of emitted events
     start_time: float = field(default_factory=time.time)
 
+class BatchEventBuffer:
+    """
+    Stands in for the EventBus (and the journal) while steps run over a batch.
+    Notifications and journal records are kept per cycle and, on flush(),
+    emitted cycle by cycle in input order: each cycle's Events (per-row data,
+    "trace_id" metadata) in step order, then the journal records in one group
+    commit. Subscribers and the journal therefore see what N sequential
+    run_cycle calls produce, however the batch was split into waves and
+    profile groups.
+    """
+    def __init__(self, bus=None, journal=None):
+        self.bus = bus
+        self.journal = journal
+        self._events = {}     # trace_id -> (context, [(source, event_type, data)])
+        self._records = {}    # trace_id -> (status, user_input)
+
+    def record(self, source, event_type, data, context):
+        if self.bus is not None:
+            self._events.setdefault(context.trace_id, (context, []))[1].append((source, event_type, data))
+
+    def record_journal(self, status, context):
+        self._records[context.trace_id] = (status, context.user_input)
+
+    def flush(self, contexts=None):
+        """
+        Emits everything recorded so far, cycle by cycle in `contexts` order
+        (default: the order cycles were first recorded in).
+        """
+        events, self._events = self._events, {}
+        records, self._records = self._records, {}
+        order = [context.trace_id for context in contexts] if contexts is not None else list(events)
+        for trace_id in order:
+            context, notifications = events.get(trace_id, (None, ()))
+            for source, event_type, data in notifications:
+                event = _kernel_event(event_type, source, data, {"trace_id": trace_id})
+                self.bus.publish(event)
+                context.event_refs.append(event.event_id)
+        if records and self.journal is not None:
+            self.journal.log_entries([records[trace_id] for trace_id in order if trace_id in records])
+
 class PipelineStep:
     """
     Abstract Base Class for Cognitive Pipeline Steps.
@@ -43,31 +99,43 @@ class PipelineStep:
         """
         raise NotImplementedError("Steps must implement execute()")
 
+    async def execute_async(self, context: PipelineContext, bus=None) -> None:
+        """
+        Event-loop variant of execute().
+        CPU-bound steps run inline (they are short and never block on I/O);
+        steps that touch files or sockets override this to await/offload that work.
+        """
+        self.execute(context, bus)
+
+    def execute_batch(self, contexts: List[PipelineContext], bus=None) -> None:
+        """
+        Runs the step over a batch of contexts that belong to distinct sessions.
+        Steps with shareable work (vectorized sampling, grouped I/O) override this.
+        """
+        for context in contexts:
+            self.execute(context, bus)
+
     def notify(self, bus, event_type, data, context: PipelineContext):
         """
         Helper to emit events and track them in the context.
         """
-        if bus:
-            from gecce_kernel.core.types import Event
-            event = Event(
-                event_type=event_type,
-                source=self.name,
-                data=data,
-                metadata={"trace_id": context.trace_id}
-            )
+        if isinstance(bus, BatchEventBuffer):
+            bus.record(self.name, event_type, data, context)
+        elif bus:
+            event = _kernel_event(event_type, self.name, data, {"trace_id": context.trace_id})
             bus.publish(event)
             context.event_refs.append(event.event_id)
 
 class ScenarioAnalysisStep(PipelineStep):
-    def __init__(self, engine):
+    def __init__(self, service):
         super().__init__("L0_ScenarioAnalysis")
-        self.engine = engine
+        self.service = service
 
     def execute(self, context: PipelineContext, bus=None) -> None:
-        from gecce_kernel.core.types import EventType
         from src import config
         
-        scene = self.engine.analyze_scenario(context.user_input)
+        engine = context.session.engine
+        scene = engine.analyze_scenario(context.user_input)
         context.scene = scene
         context.reason_codes.append(f"SCENE_{scene}")
         
@@ -78,76 +146,80 @@ class ScenarioAnalysisStep(PipelineStep):
             context.constraints['recommended_stance'] = config.FACTUAL_STANCE
             context.reason_codes.append("INFLUENCE_DEGRADED_FACTUAL")
         elif scene == "SOCIAL_SUPPORT":
-            context.constraints['influence'] = self.engine.influence_level
+            context.constraints['influence'] = engine.influence_level
             context.constraints['mode'] = "FULL_PERSONA"
             context.constraints['recommended_stance'] = config.SUPPORTIVE_STANCE
             context.reason_codes.append("INFLUENCE_FULL_SUPPORT")
         else:
-            context.constraints['influence'] = self.engine.influence_level
+            context.constraints['influence'] = engine.influence_level
             context.constraints['mode'] = "FULL_PERSONA"
             context.constraints['recommended_stance'] = None
             context.reason_codes.append("INFLUENCE_FULL_CREATIVE")
 
-        self.notify(bus, EventType.SCENE_ANALYZED, {
+        self.notify(bus, "SCENE_ANALYZED", {
             "scene": context.scene,
             "mode": context.constraints['mode']
         }, context)
 
 class FSMEvaluationStep(PipelineStep):
-    def __init__(self, fsm):
+    def __init__(self, service):
         super().__init__("L1_FSMEvaluation")
-        self.fsm = fsm
+        self.service = service
 
     def execute(self, context: PipelineContext, bus=None) -> None:
-        from gecce_kernel.core.types import EventType
-        
+        fsm = context.session.fsm
         # Pulse affect based on scene
         if context.scene == "SOCIAL_SUPPORT":
-            self.fsm.affect.update(delta_p=0.2, delta_a=0.1)
+            fsm.affect.update(delta_p=0.2, delta_a=0.1)
         elif context.scene == "SOCIAL_CREATIVE":
-            self.fsm.affect.update(delta_p=0.05, delta_a=0.02)
+            fsm.affect.update(delta_p=0.05, delta_a=0.02)
         
         from src.l1_core.fsm import PersonaState
-        self.fsm.affect.decay(is_locked=(self.fsm.state == PersonaState.LOCKED))
+        fsm.affect.decay(is_locked=(fsm.state == PersonaState.LOCKED))
         
-        status = self.fsm.get_status()
+        status = fsm.get_status()
         context.persona_snapshot['state'] = status['state']
         context.persona_snapshot['affect'] = status['affect']
         context.reason_codes.append(f"FSM_STATE_{status['state']}")
         
-        self.notify(bus, EventType.PERSONA_STATE_CHANGED, {
+        self.notify(bus, "PERSONA_STATE_CHANGED", {
             "state": status['state'],
             "affect": status['affect']
         }, context)
 
 class ValidationStep(PipelineStep):
-    def __init__(self, engine):
+    def __init__(self, service):
         super().__init__("L2_Validation")
-        self.engine = engine
+        self.service = service
 
     def execute(self, context: PipelineContext, bus=None) -> None:
-        from gecce_kernel.core.types import EventType
-        
         # Phase 11 Drift Check
-        correction = self.engine.check_drift()
+        correction = context.session.engine.check_drift()
         if correction:
             context.constraints['governance_override'] = correction
             context.reason_codes.append("DRIFT_DETECTED_CORRECTION_APPLIED")
         else:
             context.reason_codes.append("GOVERNANCE_PASS")
             
-        self.notify(bus, EventType.DRIFT_CHECKED, {
+        self.notify(bus, "DRIFT_CHECKED", {
             "correction": correction,
             "has_drift": bool(correction)
         }, context)
 
 class ProjectionStep(PipelineStep):
-    def __init__(self, service):
+    def __init__(self, service, habits: bool = True):
         super().__init__("L3_Projection")
         self.service = service
+        self.habits = habits  # False renders without the generated habits section
 
-    def execute(self, context: PipelineContext, bus=None) -> None:
-        from gecce_kernel.core.types import EventType
+    def _prepare(self, context: PipelineContext):
+        """
+        Per-cycle inputs of the projection: applies the recommended stance and
+        returns (influence, affect_warp) for sampling. The warp is quantized so
+        that nearby moods share projection cache entries.
+        """
+        from src import config
+        session = context.session
         
         # 1. Update stance if recommended
         rec_stance = context.constraints.get('recommended_stance')
@@ -155,49 +227,59 @@ class ProjectionStep(PipelineStep):
             self.service.set_stance(
                 rigor=rec_stance['rigor'], 
                 warmth=rec_stance['warmth'], 
-                chaos=rec_stance['chaos']
+                chaos=rec_stance['chaos'],
+                session=session
             )
             context.reason_codes.append("STANCE_AUTO_ADJUSTED")
         
-        # 2. Sample Traits
-        projection = {}
-        influence = context.constraints['influence']
-        affect_warp = self.service.fsm.affect.get_warp_factors()
-        
-        for trait in self.service.genome['loci']:
-            val = self.service.sampler.sample_trait(
-                trait, 
-                context.session_id, 
-                influence=influence,
-                affect_warp=affect_warp,
-                manual_seed=context.manual_seed
-            )
-            projection[trait['id']] = val
-            
-        # 3. Augment Prompt
-        intimacy = self.service.fsm.get_status()['intimacy_level']
-        system_instructions = self.service.augmenter.augment(
-            projection, 
-            influence=influence, 
-            intimacy=intimacy
+        affect_warp = quantize_warp(session.fsm.affect.get_warp_factors(), config.PROJECTION_WARP_QUANTUM)
+        return context.constraints['influence'], affect_warp
+
+    def _cache_key(self, context: PipelineContext, influence, affect_warp, time_bucket):
+        if context.manual_seed is not None:
+            seed = ("seed", context.manual_seed)
+        else:
+            seed = ("bucket", time_bucket)
+        return ProjectionCache.make_key(
+            context.session.compiled_genome, context.session_id, seed,
+            influence, affect_warp, context.session.fsm.intimacy_level,
+            variant="full" if self.habits else "lite"
         )
-        context.reason_codes.append("PROMPT_AUGMENTED")
+
+    def _compose(self, context: PipelineContext, projection, influence, habit_text=None, sections=None):
+        """
+        Cacheable part of the render: (projection, sections, habit_text).
+        """
+        # 3. Augment Prompt
+        if sections is None:
+            sections = self.service.augmenter.augment_sections(
+                projection, 
+                influence=influence, 
+                intimacy=context.session.fsm.intimacy_level
+            )
         
         # 4. Hybrid Profile Generation (Sprint 3)
-        habits = self.service.habit_gen.generate(context.session_id)
-        habit_text = "\n".join([f"- {h['text']}" for h in habits])
+        if not self.habits:
+            habit_text = ""
+        elif habit_text is None:
+            habit_text = self.habit_text(context.session_id)
+        return projection, sections, habit_text
+
+    def _render(self, context: PipelineContext, rendered, bus):
+        projection, sections, habit_text = rendered
+        context.reason_codes.append("PROMPT_AUGMENTED")
         
-        # 5. Apply Governance Directive if any
-        governance_directive = ""
-        if context.constraints.get('governance_override'):
-            governance_directive = f"\n[GOVERNANCE OVERRIDE]\n{context.constraints['governance_override']}\n"
-            
-        final_prompt = (
-            f"You are operating under personality constraints:\n{system_instructions}\n\n"
-            f"[BEHAVIORAL HABITS (PROVENANCE: GENERATED)]\n{habit_text}"
-            f"{governance_directive}"
+        # 5. Lay out sections, habits and the governance directive (if any)
+        layout = self.service.prompt_layout
+        budget = self.service.prompt_token_budget
+        assembled = prompt_layout.assemble(
+            sections, habit_text, context.constraints.get('governance_override'), layout, budget
         )
+        final_prompt = assembled.prompt
+        if assembled.trimmed:
+            context.reason_codes.append("PROMPT_COMPACTED")
         
+        rec_stance = context.constraints.get('recommended_stance')
         context.artifact = {
             "model": "persona_v1",
             "messages": [
@@ -211,22 +293,137 @@ class ProjectionStep(PipelineStep):
                 "stance": rec_stance or {"rigor": 0.5, "warmth": 0.5, "chaos": 0.5},
                 "affect": context.persona_snapshot.get('affect'),
                 "reason_codes": context.reason_codes,
-                "mode": context.constraints['mode']
+                "mode": context.constraints['mode'],
+                "profile": context.profile,
+                "layout": layout,
+                "prefix_hash": prompt_layout.prefix_hash(final_prompt, assembled.prefix_length),
+                "prefix_length": assembled.prefix_length,
+                "prompt_tokens": assembled.tokens,
+                "token_budget": budget,
+                "trimmed_sections": assembled.trimmed
             }
         }
         
-        self.notify(bus, EventType.TRAITS_SAMPLED, {"projection": projection}, context)
-        self.notify(bus, EventType.ARTIFACT_READY, {"metadata": context.artifact['metadata']}, context)
+        self.notify(bus, "TRAITS_SAMPLED", {"projection": projection}, context)
+        self.notify(bus, "ARTIFACT_READY", {"metadata": context.artifact['metadata']}, context)
+
+    def habit_text(self, session_id):
+        habits = self.service.habit_gen.generate(session_id)
+        return "\n".join([f"- {h['text']}" for h in habits])
+
+    def execute(self, context: PipelineContext, bus=None) -> None:
+        influence, affect_warp = self._prepare(context)
+        cache = self.service.projection_cache
+        sampler = self.service.sampler
+        
+        # One clock read keys both the cache and the sampler
+        time_bucket = sampler.time_bucket()
+        key = self._cache_key(context, influence, affect_warp, time_bucket)
+        rendered = cache.get(key)
+        if rendered is None:
+            # 2. Sample Traits (one vectorized pass over the compiled genome)
+            projection = sampler.sample_genome(
+                context.session.compiled_genome,
+                context.session_id,
+                influence=influence,
+                affect_warp=affect_warp,
+                cycle_key=sampler.cycle_key(context.session_id, context.manual_seed, time_seed=time_bucket)
+            )
+            rendered = self._compose(context, projection, influence)
+            cache.put(key, rendered)
+        
+        self._render(context, rendered, bus)
+
+    def execute_batch(self, contexts: List[PipelineContext], bus=None) -> None:
+        """
+        Batch projection: stances are applied row by row, cache misses sharing a
+        compiled genome are then sampled in a single (rows x loci) vectorized call.
+        Habit text is generated once per session of the batch.
+        """
+        prepared = [self._prepare(context) for context in contexts]
+        cache = self.service.projection_cache
+        sampler = self.service.sampler
+        time_bucket = sampler.time_bucket()
+        
+        keys = [self._cache_key(c, inf, warp, time_bucket) for c, (inf, warp) in zip(contexts, prepared)]
+        rendered = [cache.get(key) for key in keys]
+        
+        groups = {}
+        for row, context in enumerate(contexts):
+            if rendered[row] is None:
+                groups.setdefault(id(context.session.compiled_genome), []).append(row)
+        
+        habit_texts = {}
+        for rows in groups.values():
+            compiled = contexts[rows[0]].session.compiled_genome
+            cycle_keys = [
+                sampler.cycle_key(contexts[r].session_id, contexts[r].manual_seed, time_seed=time_bucket)
+                for r in rows
+            ]
+            influences = [prepared[r][0] for r in rows]
+            sampled = sampler.sample_genome_rows(
+                compiled,
+                cycle_keys,
+                influences=influences,
+                affect_warps=[prepared[r][1] for r in rows]
+            )
+            # Rows of one genome share their trait order: one table lookup per trait column
+            rendered_sections = self.service.augmenter.augment_sections_batch(
+                sampled, influences, [contexts[r].session.fsm.intimacy_level for r in rows]
+            )
+            for r, projection, sections in zip(rows, sampled, rendered_sections):
+                session_id = contexts[r].session_id
+                if self.habits and session_id not in habit_texts:
+                    habit_texts[session_id] = self.habit_text(session_id)
+                rendered[r] = self._compose(contexts[r], projection, prepared[r][0], habit_texts.get(session_id),
+                                            sections)
+                cache.put(keys[r], rendered[r])
+        
+        for context, row in zip(contexts, rendered):
+            self._render(context, row, bus)
+
+class PrecomputedProjectionStep(ProjectionStep):
+    """
+    STRICT_FACT fast path of L3. Influence is pinned low on factual turns, so the
+    sampled drift barely moves the prompt; this step renders the stance's modal
+    projection instead (no sampling, no habits). The rendering depends only on the
+    stance genome, influence and intimacy, so after the first factual turn it is a
+    shared cache hit for every session.
+    """
+    def __init__(self, service):
+        super().__init__(service, habits=False)
+
+    def execute(self, context: PipelineContext, bus=None) -> None:
+        influence, _ = self._prepare(context)
+        cache = self.service.projection_cache
+        compiled = context.session.compiled_genome
+        
+        key = ProjectionCache.make_key(
+            compiled, None, None, influence, {}, context.session.fsm.intimacy_level, variant="modal"
+        )
+        rendered = cache.get(key)
+        if rendered is None:
+            rendered = self._compose(context, compiled.modal(), influence)
+            cache.put(key, rendered)
+        
+        context.reason_codes.append("PROJECTION_PRECOMPUTED")
+        self._render(context, rendered, bus)
+
+    def execute_batch(self, contexts: List[PipelineContext], bus=None) -> None:
+        for context in contexts:
+            self.execute(context, bus)
 
 class MemoryRefinementStep(PipelineStep):
     def __init__(self, service):
         super().__init__("L4_MemoryRefinement")
         self.service = service
 
-    def execute(self, context: PipelineContext, bus=None) -> None:
-        from gecce_kernel.core.types import EventType
-        
-        status = self.service.fsm.get_status()
+    def _refine(self, context: PipelineContext):
+        """
+        In-memory part of the step. Returns the FSM status to journal and the prune codes.
+        """
+        session = context.session
+        status = session.fsm.get_status()
         entry = {
             "timestamp": time.time(),
             "state": status['state'],
@@ -236,40 +433,249 @@ class MemoryRefinementStep(PipelineStep):
         }
         
         # 1. Active Memory (Saliency Pruning)
-        prune_codes = self.service.stm.add(entry)
+        prune_codes = session.stm.add(entry)
         context.reason_codes.extend(prune_codes)
-        
-        # 2. Permanent Journal (Append-only)
-        self.service.journal.log_entry(status, user_input=context.user_input)
-        
-        self.notify(bus, EventType.MEMORY_REFINED, {
+        return status, prune_codes
+
+    def _notify_refined(self, context: PipelineContext, bus, prune_codes):
+        self.notify(bus, "MEMORY_REFINED", {
             "pruned": bool(prune_codes),
             "reason_codes": prune_codes
         }, context)
 
+    def execute(self, context: PipelineContext, bus=None) -> None:
+        status, prune_codes = self._refine(context)
+        
+        # 2. Permanent Journal (Append-only, group-committed in the background)
+        self.service.journal.log_entry(status, user_input=context.user_input)
+        
+        self._notify_refined(context, bus, prune_codes)
+
+    async def execute_async(self, context: PipelineContext, bus=None) -> None:
+        status, prune_codes = self._refine(context)
+        
+        # 2. Permanent Journal: queuing does no I/O, so nothing blocks the loop
+        await self.service.journal.log_entry_async(status, user_input=context.user_input)
+        
+        self._notify_refined(context, bus, prune_codes)
+
+    def execute_batch(self, contexts: List[PipelineContext], bus=None) -> None:
+        refined = [self._refine(context) for context in contexts]
+        
+        # 2. Permanent Journal: queued at once, by the batch buffer in input order
+        if isinstance(bus, BatchEventBuffer):
+            for context, (status, _) in zip(contexts, refined):
+                bus.record_journal(status, context)
+        else:
+            self.service.journal.log_entries([
+                (status, context.user_input) for context, (status, _) in zip(contexts, refined)
+            ])
+        
+        for context, (_, prune_codes) in zip(contexts, refined):
+            self._notify_refined(context, bus, prune_codes)
+
+# Step names usable in config.PIPELINE_PROFILES
+STEP_REGISTRY = {
+    "scenario_analysis": ScenarioAnalysisStep,
+    "fsm_evaluation": FSMEvaluationStep,
+    "validation": ValidationStep,
+    "projection": ProjectionStep,
+    "projection_lite": partial(ProjectionStep, habits=False),
+    "projection_precomputed": PrecomputedProjectionStep,
+    "memory_refinement": MemoryRefinementStep,
+}
+
 class CognitiveDirector:
     """
     Orchestrates the Cognitive Pipeline using a Step-based Event-Driven flow.
+    The steps of a cycle come from a named profile (config.PIPELINE_PROFILES).
+    Every profile opens with scenario analysis; when no profile is requested,
+    the analysed scene picks one (config.PIPELINE_SCENE_PROFILES).
     """
-    def __init__(self, service):
+    def __init__(self, service, profiles: Optional[Dict[str, List[str]]] = None):
+        from src import config
         self.service = service
-        self.steps = [
-            ScenarioAnalysisStep(service.engine),
-            FSMEvaluationStep(service.fsm),
-            ValidationStep(service.engine),
-            ProjectionStep(service),
-            MemoryRefinementStep(service)
-        ]
-
-    def run_cycle(self, user_input: str, session_id: str = "default", manual_seed: Optional[int] = None) -> PipelineContext:
+        self.scene_profiles = config.PIPELINE_SCENE_PROFILES
+        self.default_profile = config.PIPELINE_DEFAULT_PROFILE
+        
+        # One instance per step name, shared by every profile that lists it
+        instances: Dict[str, PipelineStep] = {}
+        self.profiles: Dict[str, List[PipelineStep]] = {}
+        for name, step_names in (profiles or config.PIPELINE_PROFILES).items():
+            if not step_names or step_names[0] != "scenario_analysis":
+                raise ValueError(f"Pipeline profile '{name}' must start with 'scenario_analysis'.")
+            unknown = [step for step in step_names if step not in STEP_REGISTRY]
+            if unknown:
+                raise ValueError(f"Pipeline profile '{name}' uses unknown steps: {unknown}")
+            for step in step_names:
+                if step not in instances:
+                    instances[step] = STEP_REGISTRY[step](service)
+            self.profiles[name] = [instances[step] for step in step_names]
+        
+        if self.default_profile not in self.profiles:
+            raise ValueError(f"Unknown default pipeline profile '{self.default_profile}'.")
+        self.scenario_step = instances["scenario_analysis"]
+        self.steps = self.profiles[self.default_profile]
+
+    def _check_profile(self, profile):
+        if profile is not None and profile not in self.profiles:
+            raise ValueError(f"Unknown pipeline profile '{profile}'. Available: {sorted(self.profiles)}")
+
+    def _remaining_steps(self, context: PipelineContext) -> List[PipelineStep]:
+        """
+        Resolves the cycle's profile once scenario analysis has run and returns
+        the steps that follow it.
+        """
+        if context.profile is None:
+            context.profile = self.scene_profiles.get(context.scene, self.default_profile)
+        return self.profiles[context.profile][1:]
+
+    def _start_cycle(self, user_input, session_id, manual_seed, profile=None):
+        self._check_profile(profile)
+        # Pinned so the pool cannot hibernate the session while the cycle runs
+        session = self.service.sessions.pin(session_id)
+        self.service.bind_session(session_id, session)
+        context = PipelineContext(user_input=user_input, session_id=session_id, manual_seed=manual_seed,
+                                  session=session, profile=profile)
+        bus = self.service.kernel.bus if self.service.kernel else None
+        return context, bus
+
+    def _end_cycle(self, context, locked=True):
+        """
+        Unpins and re-measures the session, then releases its cycle lock.
+        Re-measuring happens under the lock so a concurrent cycle cannot be
+        mutating the session while it is sized (or hibernated).
+        """
+        try:
+            self.service.sessions.unpin(context.session_id)
+            # Re-measure the session against the pool's memory budget
+            self.service.sessions.touch(context.session)
+        finally:
+            if locked:
+                context.session.lock.release()
+
+    def run_cycle(self, user_input: str, session_id: str = "default", manual_seed: Optional[int] = None,
+                  profile: Optional[str] = None) -> PipelineContext:
         """
         Synchronous run of the pipeline for CLI/API compatibility.
         In a fully async world, these triggers would come from EventBus subscribers.
         """
-        context = PipelineContext(user_input=user_input, session_id=session_id, manual_seed=manual_seed)
-        bus = self.service.kernel.bus if self.service.kernel else None
+        context, bus = self._start_cycle(user_input, session_id, manual_seed, profile)
+        # Serializes cycles of the same session; other sessions proceed in parallel
+        context.session.lock.acquire()
         
-        for step in self.steps:
-            step.execute(context, bus)
+        try:
+            self.scenario_step.execute(context, bus)
+            for step in self._remaining_steps(context):
+                step.execute(context, bus)
+        finally:
+            self._end_cycle(context)
             
         return context
+
+    async def run_cycle_async(self, user_input: str, session_id: str = "default", manual_seed: Optional[int] = None,
+                              profile: Optional[str] = None) -> PipelineContext:
+        """
+        Asyncio run of the pipeline. Steps await their I/O instead of blocking the
+        loop, so many cycles can be multiplexed on a single event loop.
+        Each cycle works on its own PipelineContext/session, so interleaving at
+        await points never mixes state between requests.
+        """
+        context, bus = self._start_cycle(user_input, session_id, manual_seed, profile)
+        try:
+            # Waits on a loop future, not a thread (see SessionLock)
+            await context.session.lock.acquire_async()
+        except BaseException:
+            self._end_cycle(context, locked=False)
+            raise
+        
+        try:
+            await self.scenario_step.execute_async(context, bus)
+            for step in self._remaining_steps(context):
+                await step.execute_async(context, bus)
+        finally:
+            self._end_cycle(context)
+            
+        return context
+
+    def run_batch(self, user_inputs: List[str], session_ids: List[str], manual_seeds: List[Optional[int]],
+                  profiles: Optional[List[Optional[str]]] = None) -> List[PipelineContext]:
+        """
+        Runs N cycles as one batch and returns their contexts in input order.
+        Rows are split into waves so that a wave never holds the same session
+        twice; waves run in input order and each wave runs step by step over all
+        its rows. Per-session ordering is therefore the same as N sequential
+        run_cycle calls, while classification, sampling, habit generation and
+        journal writes are shared across each wave.
+        Within a wave, rows are grouped by pipeline profile after scene analysis.
+        Events and journal entries are held back until the batch ends (or
+        fails), then emitted per cycle in input order, as N run_cycle calls
+        would emit them (see BatchEventBuffer).
+        """
+        n = len(user_inputs)
+        profiles = profiles or [None] * n
+        for profile in set(profiles):
+            self._check_profile(profile)
+        contexts: List[Optional[PipelineContext]] = [None] * n
+        bus = self.service.kernel.bus if self.service.kernel else None
+        buffer = BatchEventBuffer(bus, self.service.journal)
+        
+        # Amortized per-row setup: one entropy read per batch, one clock read per wave
+        entropy = os.urandom(16 * n)
+        
+        waves: List[List[int]] = []
+        seen: Dict[str, int] = {}
+        for row, session_id in enumerate(session_ids):
+            occurrence = seen.get(session_id, 0)
+            seen[session_id] = occurrence + 1
+            if occurrence == len(waves):
+                waves.append([])
+            waves[occurrence].append(row)
+        
+        try:
+            for wave in waves:
+                self._run_wave(wave, contexts, user_inputs, session_ids, manual_seeds, profiles, entropy, buffer)
+        finally:
+            buffer.flush([context for context in contexts if context is not None])
+        return contexts
+
+    def _run_wave(self, wave, contexts, user_inputs, session_ids, manual_seeds, profiles, entropy, buffer):
+        # Rows of one wave belong to distinct sessions
+        start_time = time.time()
+        wave_contexts: List[PipelineContext] = []
+        locked = set()
+        try:
+            for row in wave:
+                session = self.service.sessions.pin(session_ids[row])
+                context = PipelineContext(
+                    trace_id=str(uuid.UUID(bytes=entropy[16 * row:16 * row + 16], version=4)),
+                    session_id=session_ids[row],
+                    user_input=user_inputs[row],
+                    manual_seed=manual_seeds[row],
+                    session=session,
+                    profile=profiles[row],
+                    start_time=start_time
+                )
+                contexts[row] = context
+                wave_contexts.append(context)
+            
+            # Session locks in a global (sorted) order, so concurrent batches cannot deadlock
+            for context in sorted(wave_contexts, key=lambda c: c.session_id):
+                context.session.lock.acquire()
+                locked.add(context.trace_id)
+            
+            self.scenario_step.execute_batch(wave_contexts, buffer)
+            groups: Dict[str, List[PipelineContext]] = {}
+            for context in wave_contexts:
+                self._remaining_steps(context)
+                groups.setdefault(context.profile, []).append(context)
+            for profile, group in groups.items():
+                for step in self.profiles[profile][1:]:
+                    step.execute_batch(group, buffer)
+            last = wave[-1]
+            if last == len(contexts) - 1:
+                # The last row's session stays active, as after N run_cycle calls (bound while pinned)
+                self.service.bind_session(session_ids[last], contexts[last].session)
+        finally:
+            for context in wave_contexts:
+                self._end_cycle(context, locked=context.trace_id in locked)
@@ -0,0 +1,37 @@
+import re
+
+class ScenarioClassifier:
+    """
+    Compiled L0 scene classifier.
+    Folds the fact and support keyword sets into a single matcher so that a
+    scene is resolved in one left-to-right scan of the input.
+    Precedence is preserved: STRICT_FACT > SOCIAL_SUPPORT > SOCIAL_CREATIVE.
+    """
+    def __init__(self, fact_keywords, support_keywords):
+        self.fact_keywords = list(fact_keywords)
+        self.support_keywords = list(support_keywords)
+        self._matcher = re.compile(
+            "(?=(?P<fact>" + self._alternation(self.fact_keywords) + ")"
+            "|(?P<support>" + self._alternation(self.support_keywords) + "))"
+        )
+
+    @staticmethod
+    def _alternation(keywords):
+        # Each keyword keeps its own regex semantics; an empty set never matches.
+        if not keywords:
+            return "(?!)"
+        return "|".join(f"(?:{kw})" for kw in keywords)
+
+    def classify(self, user_input):
+        """
+        Returns STRICT_FACT, SOCIAL_SUPPORT or SOCIAL_CREATIVE for the input.
+        The alternation sits inside a zero-width lookahead, so every position is
+        probed and a support hit can never mask an overlapping fact hit. At any
+        position the fact branch is tried first.
+        """
+        scene = "SOCIAL_CREATIVE"
+        for match in self._matcher.finditer(user_input.lower()):
+            if match.group("fact") is not None:
+                return "STRICT_FACT"
+            scene = "SOCIAL_SUPPORT"
+        return scene
@@ -0,0 +1,340 @@
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict, deque
+from enum import Enum
+
+# Rough per-object costs used by the memory budget (bytes)
+SESSION_BASE_BYTES = 4096
+GENOME_LOCUS_BYTES = 512
+MEMORY_ENTRY_BYTES = 640
+TRANSITION_BYTES = 96
+STANCE_ENTRY_BYTES = 160
+
+def _grant(future):
+    # On the waiter's loop; a cancelled waiter hands the lock back itself
+    if not future.done():
+        future.set_result(None)
+
+class SessionLock:
+    """
+    Cycle lock of a session, usable from threads and coroutines alike.
+    Threads block in acquire(); coroutines await acquire_async(), which parks
+    a future on their loop instead of a thread. release() hands the lock
+    straight to the first waiting coroutine (it never becomes free in
+    between), else frees it for the threads.
+    Not reentrant, and may be released from another thread than its owner.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._mutex = threading.Lock()    # guards the handoff
+        self._waiters = deque()           # [loop, future, granted] per waiting coroutine
+
+    def acquire(self, blocking=True, timeout=-1):
+        return self._lock.acquire(blocking, timeout)
+
+    def locked(self):
+        return self._lock.locked()
+
+    async def acquire_async(self):
+        import asyncio
+        if self._lock.acquire(blocking=False):
+            return
+        loop = asyncio.get_running_loop()
+        waiter = [loop, loop.create_future(), False]
+        with self._mutex:
+            # Released since the first try: release() only hands off to queued waiters
+            if self._lock.acquire(blocking=False):
+                return
+            self._waiters.append(waiter)
+        try:
+            await waiter[1]
+        except asyncio.CancelledError:
+            with self._mutex:
+                granted = waiter[2]
+                if not granted:
+                    self._waiters.remove(waiter)
+            if granted:
+                # Handed over while the task was being cancelled: pass it on
+                self.release()
+            raise
+
+    def release(self):
+        with self._mutex:
+            while self._waiters:
+                waiter = self._waiters.popleft()
+                loop, future = waiter[0], waiter[1]
+                try:
+                    loop.call_soon_threadsafe(_grant, future)
+                except RuntimeError:
+                    continue  # its loop is closed: nobody is waiting any more
+                waiter[2] = True
+                return
+            self._lock.release()
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc):
+        self.release()
+
+class SessionState:
+    """
+    Mutable, per-session slice of a PersonaService.
+    Holds everything a cycle writes to (FSM + affect, engine history, short-term
+    memory, current genome view). The base genome, sampler, augmenter and
+    config stay shared across sessions.
+    A cycle holds `lock` for its whole duration, so concurrent requests for the
+    same session are serialized while different sessions run in parallel.
+    """
+    def __init__(self, session_id, fsm, engine, stm, memory_bridge, compiled_genome):
+        self.session_id = session_id
+        self.fsm = fsm
+        self.engine = engine
+        self.stm = stm
+        self.memory_bridge = memory_bridge
+        self.compiled_genome = compiled_genome
+        self.stance = None            # (rigor, warmth, chaos) when the genome is stance-derived
+        self.custom_genome = False    # True when a genome was assigned explicitly
+        self.stance_view = None       # Lattice view owned by the session, rewritten on stance changes
+        self.lock = SessionLock()
+
+    @property
+    def genome(self):
+        return self.compiled_genome.genome
+
+    def estimate_size(self):
+        """
+        Cheap approximation of the session's resident memory, used for budgeting.
+        """
+        size = SESSION_BASE_BYTES
+        size += len(self.engine.stance_window) * STANCE_ENTRY_BYTES
+        size += len(self.stm.entries) * MEMORY_ENTRY_BYTES
+        size += len(self.fsm.history) * TRANSITION_BYTES
+        # Stance genomes are shared overlay views; only a custom genome is owned
+        if self.custom_genome:
+            size += self.compiled_genome.size * GENOME_LOCUS_BYTES
+        return size
+
+    def to_dict(self):
+        return {
+            "version": "1.0.0",
+            "session_id": self.session_id,
+            "fsm_state": self.fsm.to_dict(),
+            "engine": {
+                "influence_level": self.engine.influence_level,
+                "kill_switch_active": self.engine.kill_switch_active,
+                "stance_window": self.engine.stance_window.to_dict()
+            },
+            "stm_entries": self.stm.entries,
+            "stance": list(self.stance) if self.stance is not None else None,
+            "genome": self.genome if self.custom_genome else None
+        }
+
+def _json_default(value):
+    # FSM transition history stores PersonaState members
+    if isinstance(value, Enum):
+        return value.name
+    return str(value)
+
+class SessionPool:
+    """
+    Bounded LRU pool of SessionState objects.
+    Sessions are evicted least-recently-used first whenever the pool exceeds
+    max_sessions or max_bytes. Evicted sessions hibernate to disk as JSON and are
+    rehydrated transparently on their next request.
+    All bookkeeping is guarded by one pool lock; it is never held while waiting
+    for a session lock, so it cannot deadlock with in-flight cycles, nor during
+    hibernate/rehydrate file I/O: a session being written or read is marked as
+    in transit, and only requests for that session wait for it.
+    """
+    def __init__(self, factory, restore, max_sessions=10000, max_bytes=256 * 1024 * 1024,
+                 hibernate_dir="sessions"):
+        self.factory = factory        # session_id -> fresh SessionState
+        self.restore = restore        # (SessionState, dict) -> None
+        self.max_sessions = max_sessions
+        self.max_bytes = max_bytes
+        self.hibernate_dir = hibernate_dir
+
+        self._sessions = OrderedDict()
+        self._sizes = {}
+        self._pins = {}               # session_id -> in-flight cycle count
+        self._transit = {}            # session_id -> Event set once its hibernate/rehydrate is done
+        self._lock = threading.RLock()
+        self._unpinned = threading.Condition(self._lock)
+        self.total_bytes = 0
+        self.stats = {"hits": 0, "created": 0, "rehydrated": 0, "hibernated": 0}
+
+    def __len__(self):
+        return len(self._sessions)
+
+    def __contains__(self, session_id):
+        return session_id in self._sessions
+
+    def _path_for(self, session_id):
+        digest = hashlib.sha1(session_id.encode("utf-8")).hexdigest()
+        return os.path.join(self.hibernate_dir, f"session_{digest}.json")
+
+    def get(self, session_id):
+        """
+        Returns the live state for session_id, rehydrating or creating it if needed,
+        and marks it most-recently-used.
+        """
+        while True:
+            with self._lock:
+                session = self._sessions.get(session_id)
+                if session is not None:
+                    self._sessions.move_to_end(session_id)
+                    self.stats["hits"] += 1
+                    return session
+                transit = self._transit.get(session_id)
+                if transit is None:
+                    done = self._transit[session_id] = threading.Event()
+                    break
+            # Being hibernated or rehydrated by another thread
+            transit.wait()
+
+        try:
+            session = self.factory(session_id)
+            path = self._path_for(session_id)
+            rehydrated = os.path.exists(path)
+            if rehydrated:
+                with open(path, "r", encoding="utf-8") as f:
+                    self.restore(session, json.load(f))
+                os.remove(path)
+        except BaseException:
+            with self._lock:
+                del self._transit[session_id]
+            done.set()
+            raise
+
+        with self._lock:
+            self.stats["rehydrated" if rehydrated else "created"] += 1
+            self._sessions[session_id] = session
+            del self._transit[session_id]
+            self._account(session)
+            victims = self._enforce_budget()
+        done.set()
+        self._store(victims)
+        return session
+
+    def pin(self, session_id):
+        """
+        Returns the live state for session_id and protects it from eviction
+        until the matching unpin() (used while a cycle is in flight).
+        """
+        with self._lock:
+            self._pins[session_id] = self._pins.get(session_id, 0) + 1
+        try:
+            return self.get(session_id)
+        except BaseException:
+            self.unpin(session_id)
+            raise
+
+    def unpin(self, session_id):
+        with self._lock:
+            count = self._pins.get(session_id, 0) - 1
+            if count > 0:
+                self._pins[session_id] = count
+            else:
+                self._pins.pop(session_id, None)
+                self._unpinned.notify_all()
+
+    def touch(self, session):
+        """
+        Re-measures a session after a cycle has mutated it and applies the budget.
+        """
+        with self._lock:
+            if self._sessions.get(session.session_id) is not session:
+                return
+            self._account(session)
+            victims = self._enforce_budget()
+        self._store(victims)
+
+    def _account(self, session):
+        size = session.estimate_size()
+        self.total_bytes += size - self._sizes.get(session.session_id, 0)
+        self._sizes[session.session_id] = size
+
+    def _enforce_budget(self):
+        # Under the pool lock; returns the evicted sessions for _store().
+        # The most-recently-used session and pinned (in-flight) sessions are never evicted
+        victims = []
+        while len(self._sessions) > self.max_sessions or self.total_bytes > self.max_bytes:
+            newest = next(reversed(self._sessions))
+            victim = next(
+                (sid for sid in self._sessions if sid != newest and sid not in self._pins),
+                None
+            )
+            if victim is None:
+                break
+            victims.append(self._detach(victim))
+        return victims
+
+    def _detach(self, session_id):
+        # Under the pool lock: drops the session from memory and marks it in
+        # transit until _store() has written it
+        session = self._sessions.pop(session_id)
+        self.total_bytes -= self._sizes.pop(session_id, 0)
+        self._transit[session_id] = threading.Event()
+        return session
+
+    def _store(self, sessions):
+        """
+        Writes detached sessions to disk, outside the pool lock. A session that
+        cannot be written is put back (least-recently-used) and the error raised.
+        """
+        error = None
+        for session in sessions:
+            try:
+                data = json.dumps(session.to_dict(), ensure_ascii=False, default=_json_default)
+                os.makedirs(self.hibernate_dir, exist_ok=True)
+                with open(self._path_for(session.session_id), "w", encoding="utf-8") as f:
+                    f.write(data)
+            except Exception as e:
+                error = error or e
+                with self._lock:
+                    self._sessions[session.session_id] = session
+                    self._sessions.move_to_end(session.session_id, last=False)
+                    self._account(session)
+            else:
+                with self._lock:
+                    self.stats["hibernated"] += 1
+            with self._lock:
+                done = self._transit.pop(session.session_id)
+            done.set()
+        if error is not None:
+            raise error
+
+    def hibernate(self, session_id):
+        """
+        Writes a session to disk and drops it from memory. Pinned (in-flight)
+        sessions are left alone; returns whether the session was hibernated.
+        """
+        with self._lock:
+            if session_id not in self._sessions or session_id in self._pins:
+                return False
+            session = self._detach(session_id)
+        self._store([session])
+        return True
+
+    def resident(self):
+        """Snapshot of the live (in-memory) sessions."""
+        with self._lock:
+            return list(self._sessions.values())
+
+    def hibernate_all(self):
+        """
+        Persists every live session (e.g. on shutdown), waiting for in-flight
+        cycles to unpin theirs.
+        """
+        while True:
+            with self._lock:
+                while self._sessions and all(sid in self._pins for sid in self._sessions):
+                    self._unpinned.wait()
+                victims = [self._detach(sid) for sid in list(self._sessions) if sid not in self._pins]
+            if not victims:
+                return
+            self._store(victims)
@@ -1,7 +1,8 @@
 import json
-import copy
 import os
 
+from src.l2_genome.overlay import GenomeOverlay
+
 class ArchetypeManager:
     """
     Fluid Stance Manager (R.W.C Model)
@@ -9,7 +10,10 @@ class ArchetypeManager:
     """
     def __init__(self, base_genome, config_path="src/l2_genome/presets/standard_archetypes.json"):
         self.base_genome = base_genome
+        self.config_path = config_path
         self.presets = {}
+        # Optional StanceLattice: interpolated stance -> compiled genome lookups
+        self.lattice = None
         
         # Load presets if available
         if os.path.exists(config_path):
@@ -19,56 +23,70 @@ class ArchetypeManager:
     def get_preset_stance(self, preset_name):
         return self.presets.get(preset_name, {"rigor": 0.5, "warmth": 0.5, "chaos": 0.3})
 
-    def calculate_genome_from_stance(self, rigor: float, warmth: float, chaos: float):
+    def stance_overlay(self, rigor: float, warmth: float, chaos: float):
         """
         The core mapping algorithm: Maps 3D stance to multi-dimensional DNA space.
         rigor: [0.0 - 1.0] -> logical depth, rigor, analytical strategy
         warmth: [0.0 - 1.0] -> happiness baseline, feminine bias, harmony strategy
         chaos: [0.0 - 1.0] -> humor, trait variability, stochastic jitter
+        Returns the result as a GenomeOverlay on the base genome (no copy is made).
         """
-        new_genome = copy.deepcopy(self.base_genome)
-        
         # Constraints clipping
         r = max(0.0, min(1.0, rigor))
         w = max(0.0, min(1.0, warmth))
         c = max(0.0, min(1.0, chaos))
 
-        for locus in new_genome['loci']:
+        defaults, categorical = {}, {}
+        for locus in self.base_genome['loci']:
             l_id = locus['id']
             vals = locus['distribution']['values']
             
             # 1. Map Rigor (R)
             if l_id == "logical_rigor":
                 # Scale between min and max based on R
-                locus['distribution']['values']['default'] = vals['min'] + (vals['max'] - vals['min']) * r
+                defaults[l_id] = vals['min'] + (vals['max'] - vals['min']) * r
             elif l_id == "explanation_depth":
-                 locus['distribution']['values']['default'] = vals['min'] + (vals['max'] - vals['min']) * r
+                defaults[l_id] = vals['min'] + (vals['max'] - vals['min']) * r
 
             # 2. Map Warmth (W)
             elif l_id == "identity_signature":
                 # W=1.0 is full Warm/Feminine, W=0.0 is cold/masculine
-                locus['distribution']['values']['default'] = w
+                defaults[l_id] = w
             
             # 3. Map Chaos (C)
             elif l_id == "humor_density":
-                locus['distribution']['values']['default'] = vals['min'] + (vals['max'] - vals['min']) * c
-            
-            # 4. Global Effects of Chaos (C) on Variability
-            # Higher chaos means higher stochastic noise for all traits
-            locus['variability'] = 0.05 + (0.4 * c)
+                defaults[l_id] = vals['min'] + (vals['max'] - vals['min']) * c
 
             # 5. Categorical Mappings (Conflict Strategy)
             if l_id == "conflict_strategy":
                 # Distribute probabilities based on R and W
                 # analytical (favored by R), accommodating (favored by W), assertive (neutral)
                 total = r + w + 0.3 # 0.3 is base for assertive
-                locus['distribution']['values'] = {
+                categorical[l_id] = {
                     "analytical": round(r / total, 2),
                     "accommodating": round(w / total, 2),
                     "assertive": round(0.3 / total, 2)
                 }
 
-        return new_genome
+        # 4. Global Effects of Chaos (C) on Variability
+        # Higher chaos means higher stochastic noise for all traits
+        return GenomeOverlay(defaults=defaults, variability=0.05 + (0.4 * c), categorical=categorical)
+
+    def calculate_genome_from_stance(self, rigor: float, warmth: float, chaos: float):
+        """
+        Stance genome as a standalone dict (deep copy of the base genome).
+        Prefer stance_overlay() + CompiledGenome.with_overlay() on hot paths.
+        """
+        return self.stance_overlay(rigor, warmth, chaos).apply(self.base_genome)
+
+    def build_lattice(self, base_compiled, resolution=9):
+        """
+        Precompiles the stance mapping over the R.W.C cube and attaches it.
+        base_compiled must be the CompiledGenome of self.base_genome.
+        """
+        from src.l2_genome.lattice import StanceLattice
+        self.lattice = StanceLattice.build(self, base_compiled, resolution=resolution)
+        return self.lattice
 
     def get_affect_baseline(self, rigor, warmth, chaos):
         """
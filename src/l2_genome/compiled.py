@@ -0,0 +1,193 @@
+import copy
+import hashlib
+import json
+
+import numpy as np
+
+class CompiledGenome:
+    """
+    Array-backed, read-only view of a JSON genome for vectorized L3 sampling.
+    Built once per genome: range loci become contiguous min/max/default/variability
+    arrays and categorical loci become padded cumulative-weight (CDF) tables, so a
+    whole cycle can be projected without walking the nested locus dicts.
+
+    The compiled form is a snapshot. Edits made to the source genome dict after
+    compilation are not seen until the genome is compiled again.
+
+    with_overlay() derives a compiled view with a GenomeOverlay folded in; the
+    view shares the base's arrays wherever the overlay leaves them untouched.
+    """
+    def __init__(self, genome):
+        self._genome = genome
+        self._base = None
+        self._overlay = None
+        loci = genome.get('loci', [])
+        self.locus_ids = tuple(locus['id'] for locus in loci)
+        self.size = len(loci)
+
+        range_pos, r_min, r_max, r_default, r_var = [], [], [], [], []
+        cat_pos, cat_choices, cat_weights = [], [], []
+
+        for pos, locus in enumerate(loci):
+            dist = locus['distribution']
+            if dist['type'] == 'range':
+                vals = dist['values']
+                range_pos.append(pos)
+                r_min.append(vals['min'])
+                r_max.append(vals['max'])
+                r_default.append(vals['default'])
+                r_var.append(locus.get('variability', 0.1))
+            elif dist['type'] == 'categorical':
+                cat_pos.append(pos)
+                cat_choices.append(tuple(dist['values'].keys()))
+                cat_weights.append(list(dist['values'].values()))
+
+        # --- Range loci ---
+        self.range_pos = np.asarray(range_pos, dtype=np.intp)
+        self.range_min = np.ascontiguousarray(r_min, dtype=np.float64)
+        self.range_max = np.ascontiguousarray(r_max, dtype=np.float64)
+        self.range_default = np.ascontiguousarray(r_default, dtype=np.float64)
+        self.range_variability = np.ascontiguousarray(r_var, dtype=np.float64)
+        self.range_span = self.range_max - self.range_min
+
+        # --- Categorical loci ---
+        self.cat_pos = np.asarray(cat_pos, dtype=np.intp)
+        self._set_categorical(cat_choices, cat_weights)
+        self._fingerprint = None
+
+    def _set_categorical(self, cat_choices, cat_weights):
+        # Rows hold cumulative weights padded with +inf. The last real column is
+        # also masked so that a lookup clamps to the final choice, mirroring
+        # random.choices (bisect over cum_weights[:n-1]).
+        self.cat_choices = cat_choices
+        self.cat_weights = cat_weights
+        width = max((len(w) for w in cat_weights), default=0)
+        self.cat_cdf = np.full((len(cat_weights), max(width - 1, 0)), np.inf)
+        self.cat_total = np.zeros(len(cat_weights), dtype=np.float64)
+        for row, weights in enumerate(cat_weights):
+            cum = np.cumsum(np.asarray(weights, dtype=np.float64))
+            self.cat_total[row] = cum[-1]
+            self.cat_cdf[row, :len(weights) - 1] = cum[:-1]
+
+        # Choice labels padded to the CDF width so a pick is a single fancy-index
+        self.cat_labels = np.empty((len(cat_choices), max(width, 1)), dtype=object)
+        for row, choices in enumerate(cat_choices):
+            self.cat_labels[row, :len(choices)] = choices
+        self._cat_rows = np.arange(len(cat_choices))
+        # Heaviest choice per categorical locus (first one on ties)
+        self.cat_mode = [max(range(len(w)), key=w.__getitem__) for w in cat_weights]
+
+    def with_overlay(self, overlay):
+        """
+        Returns a compiled view of this genome with `overlay` applied, equivalent
+        to CompiledGenome(overlay.apply(self.genome)) without copying the genome.
+        Only the arrays the overlay touches are rebuilt.
+        """
+        view = copy.copy(self)
+        view._base, view._overlay = self, overlay
+        view._genome = None
+        view._fingerprint = None
+
+        if overlay.defaults:
+            view.range_default = self.range_default.copy()
+            for row, pos in enumerate(self.range_pos.tolist()):
+                l_id = self.locus_ids[pos]
+                if l_id in overlay.defaults:
+                    view.range_default[row] = overlay.defaults[l_id]
+        if overlay.variability is not None:
+            if isinstance(overlay.variability, dict):
+                view.range_variability = np.ascontiguousarray(
+                    [overlay.variability_for(self.locus_ids[pos], v)
+                     for pos, v in zip(self.range_pos.tolist(), self.range_variability.tolist())],
+                    dtype=np.float64)
+            else:
+                view.range_variability = np.full(len(self.range_pos), float(overlay.variability))
+
+        touched = [row for row, pos in enumerate(self.cat_pos.tolist()) if self.locus_ids[pos] in overlay.categorical]
+        if touched:
+            choices, weights = list(self.cat_choices), list(self.cat_weights)
+            for row in touched:
+                values = overlay.categorical[self.locus_ids[self.cat_pos[row]]]
+                choices[row] = tuple(values.keys())
+                weights[row] = list(values.values())
+            view._set_categorical(choices, weights)
+        return view
+
+    @property
+    def genome(self):
+        """
+        Source genome dict. Overlay views materialize it on first access only.
+        """
+        if self._genome is None:
+            self._genome = self._overlay.apply(self._base.genome)
+        return self._genome
+
+    @property
+    def fingerprint(self):
+        """
+        Content hash of the source genome, computed once per compiled genome.
+        Two compilations of equal genomes share a fingerprint; an overlay view
+        hashes its base fingerprint together with the overlay.
+        """
+        if self._fingerprint is None:
+            if self._overlay is not None:
+                canonical = f"{self._base.fingerprint}+{self._overlay.fingerprint}"
+            else:
+                canonical = json.dumps(self._genome, sort_keys=True, separators=(",", ":"))
+            self._fingerprint = hashlib.sha1(canonical.encode("utf-8")).hexdigest()
+        return self._fingerprint
+
+    def modal(self):
+        """
+        Deterministic anchor projection: range loci at their default, categorical
+        loci at their heaviest choice. This is what the stance encodes with all
+        stochastic drift removed.
+        """
+        values = [0.5] * self.size
+        for pos, lo, hi, default in zip(self.range_pos.tolist(), self.range_min.tolist(),
+                                        self.range_max.tolist(), self.range_default.tolist()):
+            values[pos] = max(lo, min(hi, default))
+        for row, pos in enumerate(self.cat_pos.tolist()):
+            values[pos] = self.cat_choices[row][self.cat_mode[row]]
+        return dict(zip(self.locus_ids, values))
+
+    def sample(self, uniforms, influence=1.0, affect_warp=None):
+        """
+        Projects every locus in one vectorized pass.
+        uniforms: scalar or array of shape (size,) with one U[0,1) draw per locus.
+        Returns {locus_id: value} in genome order.
+        """
+        u = np.broadcast_to(np.asarray(uniforms, dtype=np.float64), (1, self.size))
+        return self.sample_rows(u, [influence], [affect_warp])[0]
+
+    def sample_rows(self, uniforms, influences, affect_warps):
+        """
+        Projects several cycles at once (one row per cycle).
+        uniforms: array of shape (rows, size); influences/affect_warps: one per row.
+        Row r is identical to sample(uniforms[r], influences[r], affect_warps[r]).
+        """
+        rows = len(influences)
+        u = np.asarray(uniforms, dtype=np.float64).reshape(rows, self.size)
+        warps = [w or {"variability_warp": 1.0, "bias_warp": 0.0} for w in affect_warps]
+        influence = np.asarray(influences, dtype=np.float64)[:, None]
+        variability_warp = np.array([w['variability_warp'] for w in warps], dtype=np.float64)[:, None]
+        bias_warp = np.array([w['bias_warp'] for w in warps], dtype=np.float64)[:, None]
+
+        # Unknown distribution types stay at the neutral midpoint
+        values = np.full((rows, self.size), 0.5, dtype=object)
+
+        if len(self.range_pos):
+            # Same operation order as SeededSampler.sample_trait, element-wise
+            stochastic = self.range_min + self.range_span * u[:, self.range_pos]
+            effective_variability = self.range_variability * variability_warp
+            effective_default = np.maximum(self.range_min, np.minimum(self.range_max, self.range_default + bias_warp))
+            drift = (stochastic - effective_default) * influence * effective_variability
+            projected = np.maximum(self.range_min, np.minimum(self.range_max, effective_default + drift))
+            values[:, self.range_pos] = projected.tolist()
+
+        if len(self.cat_pos):
+            thresholds = u[:, self.cat_pos] * self.cat_total
+            picks = (self.cat_cdf <= thresholds[:, :, None]).sum(axis=2)
+            values[:, self.cat_pos] = self.cat_labels[self._cat_rows, picks]
+
+        return [dict(zip(self.locus_ids, row)) for row in values.tolist()]
@@ -0,0 +1,291 @@
+import copy
+import hashlib
+import json
+import threading
+
+import numpy as np
+
+from src.l2_genome.overlay import GenomeOverlay
+
+class LatticeStance:
+    """
+    Overlay stand-in for compiled views written by a StanceLattice: the view's
+    arrays already hold the interpolated parameters, so the GenomeOverlay is
+    only rebuilt if the genome dict is materialized.
+    """
+    __slots__ = ("lattice", "stance", "_fingerprint")
+
+    def __init__(self, lattice, stance):
+        self.lattice = lattice
+        self.stance = stance
+        self._fingerprint = None
+
+    @property
+    def fingerprint(self):
+        if self._fingerprint is None:
+            canonical = f"{self.lattice.fingerprint}@{self.stance!r}"
+            self._fingerprint = hashlib.sha1(canonical.encode("utf-8")).hexdigest()
+        return self._fingerprint
+
+    def apply(self, genome):
+        return self.lattice.overlay(*self.stance).apply(genome)
+
+class StanceLattice:
+    """
+    Precompiled stance -> genome parameters over the R.W.C cube.
+    Every lattice node stores the compiled parameter vector of its stance
+    (range defaults, range variability, overridden categorical weights), and
+    any stance in between is a trilinear blend of the 8 surrounding nodes.
+
+    interpolate() writes into preallocated per-thread buffers, and compiled()
+    can rewrite a view it returned earlier in place, so sweeping a stance slider
+    costs 8 vector multiply-adds and no array allocations. The interpolation
+    error against the exact ArchetypeManager mapping is measured at build time
+    (cell centers plus random probes) and kept in `error`.
+    """
+    def __init__(self, base, grid, cat_rows, cat_choices, error=None):
+        self.base = base
+        self.grid = np.ascontiguousarray(grid, dtype=np.float64)
+        self.resolution = self.grid.shape[0]
+        self.cat_rows = list(cat_rows)
+        self.cat_choices = [tuple(choices) for choices in cat_choices]
+        self.error = error or {}
+
+        n_range = len(base.range_pos)
+        self._defaults = slice(0, n_range)
+        self._variability = slice(n_range, 2 * n_range)
+        self._cat_slices = []
+        start = 2 * n_range
+        for choices in self.cat_choices:
+            self._cat_slices.append(slice(start, start + len(choices)))
+            start += len(choices)
+        if start != self.grid.shape[-1]:
+            raise ValueError(f"Lattice width {self.grid.shape[-1]} does not match the genome layout ({start}).")
+
+        self.width = start
+        # Scratch buffers are per thread: concurrent cycles interpolate in parallel
+        self._scratch = threading.local()
+        self._fingerprint = None
+
+    # --- Encoding ---
+
+    @staticmethod
+    def _layout(base, overlay):
+        # Categorical loci the stance mapping rewrites, with the overlay's choice order
+        cat_rows, cat_choices = [], []
+        for row, pos in enumerate(base.cat_pos.tolist()):
+            values = overlay.categorical.get(base.locus_ids[pos])
+            if values is not None:
+                cat_rows.append(row)
+                cat_choices.append(tuple(values.keys()))
+        return cat_rows, cat_choices
+
+    def encode(self, overlay):
+        """Exact parameter vector of an overlay, in lattice layout."""
+        base = self.base
+        ids = [base.locus_ids[pos] for pos in base.range_pos.tolist()]
+        vector = np.empty(self.width)
+        vector[self._defaults] = [overlay.defaults.get(l_id, d) for l_id, d in zip(ids, base.range_default.tolist())]
+        vector[self._variability] = [overlay.variability_for(l_id, v)
+                                     for l_id, v in zip(ids, base.range_variability.tolist())]
+        for row, choices, part in zip(self.cat_rows, self.cat_choices, self._cat_slices):
+            values = overlay.categorical.get(base.locus_ids[base.cat_pos[row]], {})
+            vector[part] = [values.get(choice, 0.0) for choice in choices]
+        return vector
+
+    @classmethod
+    def build(cls, archetype_mgr, base, resolution=9, probes=512, seed=0):
+        """
+        Evaluates the exact mapping at every node of a resolution^3 lattice and
+        measures the interpolation error. Meant to run offline (see __main__).
+        """
+        if resolution < 2:
+            raise ValueError("Lattice resolution must be at least 2.")
+        axis = np.linspace(0.0, 1.0, resolution)
+        cat_rows, cat_choices = cls._layout(base, archetype_mgr.stance_overlay(0.5, 0.5, 0.5))
+        width = 2 * len(base.range_pos) + sum(len(c) for c in cat_choices)
+
+        lattice = cls(base, np.zeros((resolution, resolution, resolution, width)), cat_rows, cat_choices)
+        for i, r in enumerate(axis.tolist()):
+            for j, w in enumerate(axis.tolist()):
+                for k, c in enumerate(axis.tolist()):
+                    lattice.grid[i, j, k] = lattice.encode(archetype_mgr.stance_overlay(r, w, c))
+
+        # Linear interpolation errs most away from the nodes: probe every cell
+        # center, plus random stances for the rest of the cube
+        centers = (axis[:-1] + axis[1:]) / 2
+        points = [(r, w, c) for r in centers.tolist() for w in centers.tolist() for c in centers.tolist()]
+        points += np.random.default_rng(seed).random((probes, 3)).tolist()
+        lattice.error = lattice.measure_error(archetype_mgr, points)
+        return lattice
+
+    # --- Lookup ---
+
+    @property
+    def fingerprint(self):
+        """Content hash of the lattice (grid and the base genome it was built for)."""
+        if self._fingerprint is None:
+            digest = hashlib.sha1(self.base.fingerprint.encode("utf-8"))
+            digest.update(self.grid)
+            self._fingerprint = digest.hexdigest()
+        return self._fingerprint
+
+    def _buffers(self):
+        scratch = self._scratch
+        if not hasattr(scratch, "out"):
+            scratch.out = np.empty(self.width)
+            scratch.term = np.empty(self.width)
+        return scratch.out, scratch.term
+
+    def interpolate(self, rigor, warmth, chaos, out=None):
+        """
+        Trilinear blend of the 8 nodes around (rigor, warmth, chaos), clipped to
+        the unit cube. Writes into `out` (or the calling thread's buffer,
+        overwritten by its next call) and returns it.
+        """
+        buffer, term = self._buffers()
+        out = buffer if out is None else out
+        top = self.resolution - 1
+        cell, frac = [], []
+        for value in (rigor, warmth, chaos):
+            x = max(0.0, min(1.0, value)) * top
+            i = min(int(x), top - 1)
+            cell.append(i)
+            frac.append(x - i)
+        (i, j, k), (fr, fw, fc) = cell, frac
+
+        out.fill(0.0)
+        for di, wr in ((0, 1.0 - fr), (1, fr)):
+            for dj, ww in ((0, 1.0 - fw), (1, fw)):
+                for dk, wc in ((0, 1.0 - fc), (1, fc)):
+                    weight = wr * ww * wc
+                    if weight:
+                        np.multiply(self.grid[i + di, j + dj, k + dk], weight, out=term)
+                        np.add(out, term, out=out)
+        return out
+
+    def overlay(self, rigor, warmth, chaos):
+        """Interpolated stance as a GenomeOverlay."""
+        vector = self.interpolate(rigor, warmth, chaos).tolist()
+        base = self.base
+        ids = [base.locus_ids[pos] for pos in base.range_pos.tolist()]
+        categorical = {
+            base.locus_ids[base.cat_pos[row]]: dict(zip(choices, vector[part]))
+            for row, choices, part in zip(self.cat_rows, self.cat_choices, self._cat_slices)
+        }
+        return GenomeOverlay(
+            defaults=dict(zip(ids, vector[self._defaults])),
+            variability=dict(zip(ids, vector[self._variability])),
+            categorical=categorical
+        )
+
+    def _new_view(self):
+        # A view with its own range and categorical arrays, laid out for this lattice
+        base = self.base
+        view = copy.copy(base)
+        view._base, view._genome, view._fingerprint = base, None, None
+        view.range_default = base.range_default.copy()
+        view.range_variability = base.range_variability.copy()
+        choices, weights = list(base.cat_choices), [list(w) for w in base.cat_weights]
+        for row, row_choices in zip(self.cat_rows, self.cat_choices):
+            choices[row], weights[row] = row_choices, [1.0] * len(row_choices)
+        view._set_categorical(choices, weights)
+        return view
+
+    def compiled(self, rigor, warmth, chaos, into=None):
+        """
+        Interpolated stance as a CompiledGenome view on the base, equivalent to
+        base.with_overlay(self.overlay(...)). `into`, a view returned by an
+        earlier call and owned by the caller, is rewritten in place instead:
+        a slider sweep then allocates no arrays per step.
+        """
+        stance = into._overlay if into is not None else None
+        view = into if isinstance(stance, LatticeStance) and stance.lattice is self else self._new_view()
+        vector = self.interpolate(rigor, warmth, chaos)
+
+        np.copyto(view.range_default, vector[self._defaults])
+        np.copyto(view.range_variability, vector[self._variability])
+        for row, part in zip(self.cat_rows, self._cat_slices):
+            # Same values as CompiledGenome._set_categorical (sequential cumsum)
+            weights = vector[part]
+            n = len(weights)
+            if n > 1:
+                cdf = view.cat_cdf[row, :n - 1]
+                np.cumsum(weights[:-1], out=cdf)
+                view.cat_total[row] = cdf[-1] + weights[-1]
+            else:
+                view.cat_total[row] = weights[0]
+            view.cat_weights[row] = weights.tolist()
+            view.cat_mode[row] = int(weights.argmax())
+
+        view._overlay = LatticeStance(self, (rigor, warmth, chaos))
+        view._genome = None
+        view._fingerprint = None
+        return view
+
+    def measure_error(self, archetype_mgr, points):
+        """
+        Max / mean absolute error of interpolate() against the exact mapping
+        over `points`, per parameter group.
+        """
+        groups = {"default": [self._defaults], "variability": [self._variability], "categorical": self._cat_slices}
+        worst = {name: 0.0 for name in groups}
+        total = {name: 0.0 for name in groups}
+        for r, w, c in points:
+            diff = np.abs(self.interpolate(r, w, c) - self.encode(archetype_mgr.stance_overlay(r, w, c)))
+            for name, parts in groups.items():
+                for part in parts:
+                    if part.stop > part.start:
+                        worst[name] = max(worst[name], float(diff[part].max()))
+                        total[name] += float(diff[part].mean()) / len(parts)
+        report = {f"max_{name}": worst[name] for name in groups}
+        report.update({f"mean_{name}": total[name] / max(len(points), 1) for name in groups})
+        report["max"] = max(worst.values())
+        report["points"] = len(points)
+        return report
+
+    # --- Persistence ---
+
+    def save(self, path):
+        np.savez_compressed(
+            path,
+            grid=self.grid,
+            cat_rows=np.asarray(self.cat_rows, dtype=np.intp),
+            meta=np.asarray(json.dumps({
+                "base_fingerprint": self.base.fingerprint,
+                "cat_choices": self.cat_choices,
+                "error": self.error
+            }))
+        )
+
+    @classmethod
+    def load(cls, path, base):
+        """
+        Loads a lattice built for `base`. Raises ValueError when it was built
+        from a different genome.
+        """
+        with np.load(path) as data:
+            meta = json.loads(str(data["meta"]))
+            if meta["base_fingerprint"] != base.fingerprint:
+                raise ValueError(f"Stance lattice {path} was built for a different base genome.")
+            return cls(base, data["grid"], data["cat_rows"].tolist(), meta["cat_choices"], meta["error"])
+
+if __name__ == "__main__":
+    import argparse
+
+    from src import config
+    from src.l2_genome.archetypes import ArchetypeManager
+    from src.l2_genome.compiled import CompiledGenome
+    from src.utils.paths import resolve_resource
+
+    parser = argparse.ArgumentParser(description="Build a stance lattice offline")
+    parser.add_argument("--genome", default="src/l2_genome/sample_genome.json")
+    parser.add_argument("--resolution", type=int, default=config.STANCE_LATTICE_RESOLUTION)
+    parser.add_argument("--output", required=True, help="Destination .npz file")
+    args = parser.parse_args()
+
+    with open(resolve_resource(args.genome), "r") as f:
+        genome = json.load(f)
+    lattice = StanceLattice.build(ArchetypeManager(genome), CompiledGenome(genome), resolution=args.resolution)
+    lattice.save(args.output)
+    print(json.dumps({"output": args.output, "resolution": args.resolution, "error": lattice.error}, indent=2))
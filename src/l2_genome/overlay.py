@@ -0,0 +1,50 @@
+import copy
+import hashlib
+import json
+
+class GenomeOverlay:
+    """
+    Sparse, immutable edits on top of a base genome: per-locus range defaults,
+    per-locus (or global) variability and replacement categorical weights.
+    An overlay is a few numbers, so applying a stance does not copy the genome;
+    CompiledGenome.with_overlay() folds it into the sampling arrays instead.
+    """
+    __slots__ = ("defaults", "variability", "categorical", "_fingerprint")
+
+    def __init__(self, defaults=None, variability=None, categorical=None):
+        self.defaults = dict(defaults or {})
+        # float: every locus; dict: {locus_id: variability}; None: unchanged
+        self.variability = dict(variability) if isinstance(variability, dict) else variability
+        self.categorical = {l_id: dict(weights) for l_id, weights in (categorical or {}).items()}
+        self._fingerprint = None
+
+    def variability_for(self, locus_id, current):
+        if self.variability is None:
+            return current
+        if isinstance(self.variability, dict):
+            return self.variability.get(locus_id, current)
+        return self.variability
+
+    @property
+    def fingerprint(self):
+        if self._fingerprint is None:
+            canonical = json.dumps([self.defaults, self.variability, self.categorical],
+                                   sort_keys=True, separators=(",", ":"))
+            self._fingerprint = hashlib.sha1(canonical.encode("utf-8")).hexdigest()
+        return self._fingerprint
+
+    def apply(self, genome):
+        """
+        Materializes the overlay as a standalone genome dict (deep copy of the base).
+        Only needed when a full JSON genome is asked for, e.g. for snapshots.
+        """
+        new_genome = copy.deepcopy(genome)
+        for locus in new_genome['loci']:
+            l_id = locus['id']
+            if l_id in self.defaults:
+                locus['distribution']['values']['default'] = self.defaults[l_id]
+            if self.variability is not None:
+                locus['variability'] = self.variability_for(l_id, locus.get('variability', 0.1))
+            if l_id in self.categorical:
+                locus['distribution']['values'] = dict(self.categorical[l_id])
+        return new_genome
@@ -1,13 +1,10 @@
-import sys
-import os
 import json
 
-# Add path for gecce_kernel
-sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", "gecce_kernel_pkg")))
+from src.utils.paths import ensure_kernel_path
+ensure_kernel_path()
 
 from gecce_kernel.core.types import Event, EventType
-from gecce_kernel.core.modules.base_module import ModuleContext, ModuleResult
-from kernel_integration import PersonaBaseModule
+from kernel_integration import PersonaBaseModule, ModuleContext, ModuleResult
 from .projection import SeededSampler
 
 class KernelExpression(PersonaBaseModule):
@@ -34,11 +31,14 @@ class KernelExpression(PersonaBaseModule):
         
         # 执行采样
         projection = {}
-        for trait in self.genome['loci']:
+        cycle_key = self.sampler.cycle_key(session_id)
+        for i, trait in enumerate(self.genome['loci']):
             val = self.sampler.sample_trait(
                 trait, 
                 session_id, 
-                influence=self.current_influence
+                influence=self.current_influence,
+                locus_index=i,
+                cycle_key=cycle_key
             )
             projection[trait['id']] = val
             
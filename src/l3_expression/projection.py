@@ -1,32 +1,50 @@
-import random
 import hashlib
+from bisect import bisect
+from itertools import accumulate
+
+import numpy as np
+
+from src.l3_expression.streams import batch_uniforms, key_from_int, substream_uniforms
 
 class SeededSampler:
     def __init__(self, time_bucket_size=3600):
         self.time_bucket_size = time_bucket_size
 
-    def _get_seed(self, session_id, time_seed=None):
-        if time_seed is None:
-            # Create a time bucket (e.g., changes every hour for "long term variance")
+    def time_bucket(self, now=None):
+        """Current time bucket (e.g., changes every hour for "long term variance")."""
+        if now is None:
             import time
-            time_seed = int(time.time() / self.time_bucket_size)
+            now = time.time()
+        return int(now / self.time_bucket_size)
+
+    def cycle_key(self, session_id, manual_seed=None, time_seed=None):
+        """
+        Derives the counter-based RNG key for one cycle.
+        Hashed once per (session, time bucket); every locus then draws from its
+        own substream of this key, addressed by locus index.
+        """
+        if manual_seed is not None:
+            return key_from_int(manual_seed)
+
+        if time_seed is None:
+            time_seed = self.time_bucket()
         
         seed_str = f"{session_id}_{time_seed}"
-        return int(hashlib.md5(seed_str.encode()).hexdigest(), 16) % (2**32)
+        return key_from_int(int.from_bytes(hashlib.md5(seed_str.encode()).digest()[:8], "big"))
 
-    def sample_trait(self, trait_locus, session_id, influence=1.0, affect_warp=None, manual_seed=None):
+    def sample_trait(self, trait_locus, session_id, influence=1.0, affect_warp=None, manual_seed=None,
+                     locus_index=0, cycle_key=None):
         """
         Sample a value from the locus distribution using a stable seed.
+        locus_index selects the locus' independent substream; pass a precomputed
+        cycle_key to avoid re-deriving it for every trait of a cycle.
         """
         if affect_warp is None:
             affect_warp = {"variability_warp": 1.0, "bias_warp": 0.0}
 
-        if manual_seed is not None:
-            seed = manual_seed
-        else:
-            seed = self._get_seed(session_id)
-            
-        rng = random.Random(seed)
+        if cycle_key is None:
+            cycle_key = self.cycle_key(session_id, manual_seed=manual_seed)
+        u = float(substream_uniforms(cycle_key, (locus_index,))[0])
         
         dist = trait_locus['distribution']
         base_value = 0.5
@@ -34,7 +52,7 @@ class SeededSampler:
         if dist['type'] == 'range':
             vals = dist['values']
             # Stochastic value within range
-            stochastic_val = rng.uniform(vals['min'], vals['max'])
+            stochastic_val = vals['min'] + (vals['max'] - vals['min']) * u
             # Shift towards default based on influence (1.0 = full stochastic within drift, 
             # 0.0 = stick strictly to default or neutral 0.5)
             # Actually, standard interpretation: influence scales the range or anchors to mean
@@ -55,12 +73,31 @@ class SeededSampler:
             
         elif dist['type'] == 'categorical':
             choices = list(dist['values'].keys())
-            weights = list(dist['values'].values())
-            # Simple weighted choice
-            base_value = rng.choices(choices, weights=weights, k=1)[0]
+            cum_weights = list(accumulate(dist['values'].values()))
+            # Inverse-CDF weighted choice on the locus' own draw
+            base_value = choices[bisect(cum_weights, u * cum_weights[-1], 0, len(choices) - 1)]
             
         return base_value
 
+    def sample_genome(self, compiled_genome, session_id, influence=1.0, affect_warp=None, manual_seed=None,
+                      cycle_key=None):
+        """
+        Batch counterpart of sample_trait: projects every locus of a CompiledGenome
+        in one vectorized call. Produces the same values as calling sample_trait
+        per locus, since locus i always reads substream i of the cycle key.
+        """
+        key = cycle_key if cycle_key is not None else self.cycle_key(session_id, manual_seed=manual_seed)
+        u = substream_uniforms(key, np.arange(compiled_genome.size))
+        return compiled_genome.sample(u, influence=influence, affect_warp=affect_warp)
+
+    def sample_genome_rows(self, compiled_genome, cycle_keys, influences, affect_warps):
+        """
+        Projects many cycles of one CompiledGenome in a single (rows x loci) pass.
+        Row r equals sample_genome() for the session/seed that produced cycle_keys[r].
+        """
+        u = batch_uniforms(cycle_keys, compiled_genome.size)
+        return compiled_genome.sample_rows(u, influences, affect_warps)
+
 if __name__ == "__main__":
     # Test L3 Projection
     import json
@@ -0,0 +1,78 @@
+import threading
+from collections import OrderedDict
+
+def quantize_warp(affect_warp, quantum):
+    """
+    Snaps affect warp factors onto a grid of step `quantum`.
+    Sampling uses the quantized warp as well, so a cache hit returns exactly
+    what a fresh projection would have produced.
+    """
+    if not quantum:
+        return dict(affect_warp)
+    return {name: round(value / quantum) * quantum for name, value in affect_warp.items()}
+
+class ProjectionCache:
+    """
+    Bounded LRU cache of rendered L3 projections.
+    Within one sampler time bucket the projection is a pure function of
+    (genome, session, seed, influence, affect warp, intimacy), so the trait
+    projection, the augmented system-prompt body and the habit text can be
+    reused across the turns of a session. Safe to share between threads.
+    """
+    def __init__(self, max_entries=4096):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    @staticmethod
+    def make_key(compiled_genome, session_id, seed, influence, affect_warp, intimacy, variant="full"):
+        """
+        seed is the manual seed when one was given, otherwise the time bucket
+        (tagged so the two can never collide). variant names the rendering
+        (e.g. with or without habits) so pipeline profiles never share entries.
+        """
+        return (
+            variant,
+            compiled_genome.fingerprint,
+            session_id,
+            seed,
+            influence,
+            tuple(sorted(affect_warp.items())),
+            intimacy
+        )
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(self, key, entry):
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0
+            }
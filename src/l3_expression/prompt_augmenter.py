@@ -1,118 +1,215 @@
+import json
+from bisect import bisect_left
+
+from src.utils.paths import resolve_resource
+
+DEFAULT_MANIFOLD_PATH = "src/l3_expression/prompt_manifold.json"
+
+ROLE_LINE = "You are an intelligent AI assistant governed by a dynamic persona engine."
+
+# Priority Stack order
+PRIORITY_ORDER = ["ROLE", "MISSION", "POLICIES", "STYLE", "OUTPUT_FORMAT", "OPTIONAL_FLAVOR"]
+
+# Attractors are dropped below this influence
+FLAVOR_MIN_INFLUENCE = 0.3
+
+# Intimacy/Warmth Gating Logic (Phase 6): trait -> (threshold, rewrite(value, text)).
+# Below the threshold the band's text is replaced by the rewrite.
+INTIMACY_GATES = {
+    "explanation_depth": (
+        0.4,
+        lambda value, text: "Maintain a standard, polite, and helpful tone." if "Explain using simple" in text else text
+    ),
+    "topic_attractors": (
+        0.5,
+        lambda value, text: f"Occasionally mention interests related to {value.replace('_', ' ')}."
+    ),
+}
+
+UNGATED = float("-inf")
+
+def _entry(trait_id, value, text):
+    """
+    Pre-rendered (gate threshold, gated line, line) for one band, or None.
+    The gated line is used when intimacy < threshold; ungated bands never are.
+    """
+    if not text:
+        return None
+    line = f"- {text}"
+    threshold, rewrite = INTIMACY_GATES.get(trait_id, (UNGATED, None))
+    if rewrite is None:
+        return (UNGATED, line, line)
+    return (threshold, f"- {rewrite(value, text)}", line)
+
+class RangeTable:
+    """
+    Compiled range bands of one trait.
+    The band boundaries are sorted into one array; every boundary point and
+    every open gap between two boundaries is a region whose winning band (the
+    first band in manifold order with low <= v <= high) is resolved at compile
+    time. A lookup is one bisect. NaN falls in no band, as before.
+    """
+    __slots__ = ("bounds", "entries", "_bounds_array")
+
+    def __init__(self, trait_id, ranges):
+        self.bounds = sorted({float(b) for low, high, _ in ranges for b in (low, high)})
+        # Region 2i+1 is the point bounds[i]; region 2i is the gap below it
+        probes = []
+        for i, bound in enumerate(self.bounds):
+            probes.append(None if i == 0 else (self.bounds[i - 1] + bound) / 2)
+            probes.append(bound)
+        probes.append(None)
+        self.entries = []
+        for probe in probes:
+            text = None
+            if probe is not None:
+                text = next((t for low, high, t in ranges if low <= probe <= high), None)
+            self.entries.append(_entry(trait_id, probe, text))
+        self._bounds_array = None
+
+    def lookup(self, value):
+        bounds = self.bounds
+        pos = bisect_left(bounds, value)
+        if pos < len(bounds) and bounds[pos] == value:
+            return self.entries[2 * pos + 1]
+        return self.entries[2 * pos]
+
+    def lookup_many(self, values):
+        """Vectorized lookup (numpy.searchsorted) for a column of values."""
+        import numpy as np
+
+        if not self.bounds:
+            return [None] * len(values)
+        if self._bounds_array is None:
+            self._bounds_array = np.asarray(self.bounds, dtype=np.float64)
+        values = np.asarray(values, dtype=np.float64)
+        pos = np.searchsorted(self._bounds_array, values, side="left")
+        hit = np.take(self._bounds_array, np.minimum(pos, len(self.bounds) - 1)) == values
+        entries = self.entries
+        return [entries[r] for r in (2 * pos + hit).tolist()]
+
+class ValueTable:
+    """Compiled categorical values of one trait: value -> pre-rendered entry."""
+    __slots__ = ("entries", "lookup")
+
+    def __init__(self, trait_id, values):
+        self.entries = {value: _entry(trait_id, value, text) for value, text in values.items()}
+        self.lookup = self.entries.get
+
+    def lookup_many(self, values):
+        lookup = self.lookup
+        return [lookup(value) for value in values]
+
 class PromptAugmenter:
     """
     Task 4.2: Translates L3 Projection into Structured System Instructions.
     Refactored in Phase 11 for Enterprise-Grade Governance.
+
+    The manifold is compiled at construction: range bands into bisect tables,
+    categorical values into dicts, every line (and its intimacy-gated variant)
+    pre-rendered and every section header pre-joined. A render is one lookup
+    per trait and one join per section.
     """
-    def __init__(self):
-        # Manifold now includes category tags for structured assembly
-        self.manifold = {
-            "explanation_depth": {
-                "category": "MISSION",
-                "ranges": [
-                    (0.0, 0.3, "Explain using simple analogies. Avoid technical jargon."),
-                    (0.3, 0.7, "Balance abstract theory with practical examples. Be professional and clear."),
-                    (0.7, 1.0, "Dive deep into technical details using precise terminology.")
-                ]
-            },
-            "humor_density": {
-                "category": "STYLE",
-                "ranges": [
-                    (0.0, 0.2, "Maintain a serious, professional tone. No jokes."),
-                    (0.2, 0.5, "Be pleasant and occasionally lighthearted."),
-                    (0.5, 1.0, "Adopt an informal and humorous tone.")
-                ]
-            },
-            "conflict_strategy": {
-                "category": "POLICIES",
-                "values": {
-                    "accommodating": "Prioritize agreement. Be polite even when challenging.",
-                    "assertive": "Confidently stand your ground.",
-                    "analytical": "Deconstruct conflicts using logic and evidence."
-                }
-            },
-            "logical_rigor": {
-                "category": "OUTPUT_FORMAT",
-                "ranges": [
-                    (0.0, 0.5, "Focus on intuition over detailed proofs."),
-                    (0.5, 1.0, "Show your work concisely when necessary for correctness.") # Safer phrasing
-                ]
-            },
-            "topic_attractors": {
-                "category": "OPTIONAL_FLAVOR",
-                "values": {
-                    "space_exploration": "Uses metaphors related to the cosmos.",
-                    "cybernetics": "Views problems through systems theory lenses.",
-                    "vintage_computing": "References legacy computing concepts."
-                }
-            },
-            "identity_signature": {
-                "category": "STYLE",
-                "ranges": [
-                    (0.0, 0.4, "Direct and concise."),
-                    (0.4, 0.6, "Balanced and objective."),
-                    (0.6, 1.0, "Collaborative and warm.")
-                ]
-            }
-        }
+    def __init__(self, manifold_path=None):
+        # Manifold (trait -> category + range/value texts) lives in prompt_manifold.json
+        # so prompt wording can be tuned (and hot-reloaded) without a code change
+        self.manifold_path = manifold_path or resolve_resource(DEFAULT_MANIFOLD_PATH)
+        with open(self.manifold_path, "r", encoding="utf-8") as f:
+            self.manifold = json.load(f)["manifold"]
+
+        self.tables = {}
+        self.categories = {}
+        for trait_id, config in self.manifold.items():
+            category = config.get("category", "STYLE")
+            if category not in PRIORITY_ORDER:
+                raise ValueError(f"Unknown prompt category '{category}' for trait '{trait_id}'")
+            self.categories[trait_id] = category
+            if "ranges" in config:
+                self.tables[trait_id] = RangeTable(trait_id, config["ranges"])
+            else:
+                self.tables[trait_id] = ValueTable(trait_id, config.get("values", {}))
+
+        self._role_block = f"[ROLE]\n{ROLE_LINE}"
+        self._plans = {}
+
+    def _plan(self, trait_ids):
+        """
+        Render plan for one trait order (projections of a genome share it):
+        [(section, header, is_flavor, ((trait_id, lookup), ...))] in priority order.
+        """
+        plan = self._plans.get(trait_ids)
+        if plan is None:
+            by_section = {section: [] for section in PRIORITY_ORDER[1:]}
+            for trait_id in trait_ids:
+                if trait_id in self.tables:
+                    by_section[self.categories[trait_id]].append((trait_id, self.tables[trait_id].lookup))
+            plan = [(section, f"[{section}]\n", section == "OPTIONAL_FLAVOR", tuple(traits))
+                    for section, traits in by_section.items() if traits]
+            self._plans[trait_ids] = plan
+        return plan
+
+    def augment_sections(self, projection: dict, influence: float = 1.0, intimacy: float = 0.0):
+        """
+        The rendered sections as [(section, block), ...] in priority order, ROLE
+        first and empty sections omitted. augment() is their "\n\n" join.
+        """
+        sections = [("ROLE", self._role_block)]
+        for section, header, is_flavor, traits in self._plan(tuple(projection)):
+            # Filter low-influence attractors
+            if is_flavor and influence < FLAVOR_MIN_INFLUENCE:
+                continue
+            lines = []
+            for trait_id, lookup in traits:
+                entry = lookup(projection[trait_id])
+                if entry is not None:
+                    lines.append(entry[1] if intimacy < entry[0] else entry[2])
+            if lines:
+                sections.append((section, header + "\n".join(lines)))
+        return sections
 
     def augment(self, projection: dict, influence: float = 1.0, intimacy: float = 0.0) -> str:
         """
         Synthesizes a structured System Prompt (Enterprise Format).
         """
-        sections = {
-            "ROLE": ["You are an intelligent AI assistant governed by a dynamic persona engine."],
-            "MISSION": [],
-            "POLICIES": [],
-            "STYLE": [],
-            "OUTPUT_FORMAT": [],
-            "OPTIONAL_FLAVOR": []
+        return "\n\n".join([block for _, block in self.augment_sections(projection, influence, intimacy)])
+
+    def augment_sections_batch(self, projections, influences, intimacies):
+        """
+        augment_sections() for many projections at once: each trait column is
+        looked up in one vectorized pass. Row r equals
+        augment_sections(projections[r], influences[r], intimacies[r]).
+        """
+        if not projections:
+            return []
+        keys = tuple(projections[0])
+        if any(tuple(p) != keys for p in projections[1:]):
+            return [self.augment_sections(p, inf, intim) for p, inf, intim in zip(projections, influences, intimacies)]
+
+        plan = self._plan(keys)
+        looked_up = {
+            trait_id: self.tables[trait_id].lookup_many([p[trait_id] for p in projections])
+            for _, _, _, traits in plan for trait_id, _ in traits
         }
-        
-        for trait_id, value in projection.items():
-            if trait_id not in self.manifold:
-                continue
-                
-            config = self.manifold[trait_id]
-            category = config.get("category", "STYLE")
-            text = None
-            
-            # Range Logic
-            if "ranges" in config:
-                for low, high, mapping_text in config["ranges"]:
-                    if low <= value <= high:
-                        text = mapping_text
-                        break
-            # Categorical Logic
-            elif "values" in config and value in config["values"]:
-                text = config["values"][value]
-                
-            # Filter low-influence attractors
-            if category == "OPTIONAL_FLAVOR" and influence < 0.3:
-                continue
-                
-            if text:
-                # Intimacy/Warmth Gating Logic (Phase 6)
-                if trait_id == "explanation_depth" and "Explain using simple" in text and intimacy < 0.4:
-                    text = "Maintain a standard, polite, and helpful tone."
-                
-                if trait_id == "topic_attractors" and intimacy < 0.5:
-                     text = f"Occasionally mention interests related to {value.replace('_', ' ')}."
-
-                sections[category].append(f"- {text}")
-
-        # Assemble Structured Prompt
-        final_prompt = []
-        
-        # Priority Stack order
-        priority_order = ["ROLE", "MISSION", "POLICIES", "STYLE", "OUTPUT_FORMAT", "OPTIONAL_FLAVOR"]
-        
-        for section in priority_order:
-            if sections[section]:
-                header = f"[{section}]"
-                content = "\n".join(sections[section])
-                final_prompt.append(f"{header}\n{content}")
-                
-        return "\n\n".join(final_prompt)
+        rows = []
+        for row, (influence, intimacy) in enumerate(zip(influences, intimacies)):
+            sections = [("ROLE", self._role_block)]
+            for section, header, is_flavor, traits in plan:
+                if is_flavor and influence < FLAVOR_MIN_INFLUENCE:
+                    continue
+                lines = []
+                for trait_id, _ in traits:
+                    entry = looked_up[trait_id][row]
+                    if entry is not None:
+                        lines.append(entry[1] if intimacy < entry[0] else entry[2])
+                if lines:
+                    sections.append((section, header + "\n".join(lines)))
+            rows.append(sections)
+        return rows
+
+    def augment_batch(self, projections, influences, intimacies):
+        """augment() for many projections at once (see augment_sections_batch)."""
+        return ["\n\n".join([block for _, block in sections])
+                for sections in self.augment_sections_batch(projections, influences, intimacies)]
 
 if __name__ == "__main__":
     # Test
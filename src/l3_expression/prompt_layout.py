@@ -0,0 +1,123 @@
+"""
+Assembly of the final system prompt from the rendered sections.
+
+Two layouts:
+- "classic": trait sections in priority order, then habits, then any
+  governance override (the original layout).
+- "prefix_stable": sections ordered from most to least stable across turns, so
+  that provider-side prefix / KV caches keep hitting. ROLE never changes, the
+  habits only change with the session, the genome-derived sections change when
+  sampling crosses a band, and a governance override is appended only on some
+  turns.
+
+Both layouts report the stable prefix of the prompt (the part that is
+byte-identical across turns while its inputs are unchanged): its length and a
+hash, so callers can place a cache breakpoint and detect prefix churn.
+
+Given a token budget, either layout renders compact (short headers, single
+newlines) and trims the lowest-priority sections, line by line from the end,
+until the estimated size fits. ROLE and the governance override are never
+trimmed.
+"""
+import hashlib
+import re
+from functools import lru_cache
+from typing import Dict, NamedTuple
+
+PREAMBLE = "You are operating under personality constraints:\n"
+HABITS_HEADER = "[BEHAVIORAL HABITS (PROVENANCE: GENERATED)]\n"
+COMPACT_PREAMBLE = "Persona constraints:\n"
+COMPACT_HABITS_HEADER = "[HABITS]\n"
+
+LAYOUTS = ("classic", "prefix_stable")
+
+# Most stable first. HABITS is the habit block; the rest are augmenter sections.
+STABLE_ORDER = ["ROLE", "HABITS", "POLICIES", "OUTPUT_FORMAT", "MISSION", "STYLE", "OPTIONAL_FLAVOR"]
+STABLE_PREFIX = {"classic": ("ROLE",), "prefix_stable": ("ROLE", "HABITS")}
+
+# Trim order under a budget: the augmenter's priority_order, lowest first. Habits
+# sit below every trait section in the classic stack; in prefix_stable they are
+# part of the cached prefix, so they are kept as long as possible.
+TRIM_ORDER = {
+    "classic": ["HABITS", "OPTIONAL_FLAVOR", "OUTPUT_FORMAT", "STYLE", "POLICIES", "MISSION"],
+    "prefix_stable": ["OPTIONAL_FLAVOR", "OUTPUT_FORMAT", "STYLE", "POLICIES", "MISSION", "HABITS"],
+}
+
+# Letter runs, up to 3 digits, or any other single non-space character (punctuation, CJK)
+_TOKEN_PIECES = re.compile(r"[A-Za-z]+|\d{1,3}|[^\sA-Za-z\d]")
+
+@lru_cache(maxsize=8192)
+def estimate_tokens(text):
+    """
+    Fast local approximation of a BPE token count (no tokenizer download).
+    Common words count as one token, long words as one per 8 letters; digits
+    group by three and every other symbol counts alone. The estimate is
+    additive over whitespace-joined text, so section counts sum to the total.
+    """
+    count = 0
+    for piece in _TOKEN_PIECES.findall(text):
+        count += 1 + (len(piece) - 1) // 8 if piece[0].isalpha() and piece.isascii() else 1
+    return count
+
+class AssembledPrompt(NamedTuple):
+    prompt: str
+    prefix_length: int              # prompt[:prefix_length] is the stable prefix
+    tokens: int                     # estimate_tokens() of the whole prompt
+    trimmed: Dict[str, int]         # section -> lines removed to fit the budget
+
+def _governance_block(governance_override):
+    if not governance_override:
+        return ""
+    return f"\n[GOVERNANCE OVERRIDE]\n{governance_override}\n"
+
+def _fit(blocks, tokens, budget, layout):
+    lines = {name: block.split("\n") for name, block in blocks}
+    trimmed = {}
+    for name in TRIM_ORDER[layout]:
+        section = lines.get(name)
+        while section and tokens > budget:
+            # Condense before dropping: the section's last line goes first,
+            # the header goes with its last line
+            tokens -= estimate_tokens(section.pop())
+            trimmed[name] = trimmed.get(name, 0) + 1
+            if len(section) == 1:
+                tokens -= estimate_tokens(section.pop())
+        if tokens <= budget:
+            break
+    return [(name, "\n".join(lines[name])) for name, _ in blocks if lines[name]], tokens, trimmed
+
+def assemble(sections, habit_text="", governance_override=None, layout="classic", budget=None):
+    """
+    Builds the system prompt from augmenter sections [(section, block), ...].
+    budget (estimated tokens) switches to the compact rendering. Returns an
+    AssembledPrompt.
+    """
+    if layout not in LAYOUTS:
+        raise ValueError(f"Unknown prompt layout '{layout}' (expected one of {LAYOUTS})")
+    compact = budget is not None
+
+    blocks = list(sections)
+    if habit_text:
+        blocks.append(("HABITS", (COMPACT_HABITS_HEADER if compact else HABITS_HEADER) + habit_text))
+    if layout == "prefix_stable":
+        rank = {name: i for i, name in enumerate(STABLE_ORDER)}
+        blocks.sort(key=lambda item: rank.get(item[0], len(rank)))
+
+    preamble = COMPACT_PREAMBLE if compact else PREAMBLE
+    separator = "\n" if compact else "\n\n"
+    governance = _governance_block(governance_override)
+    tokens = estimate_tokens(preamble) + estimate_tokens(governance) + sum(estimate_tokens(b) for _, b in blocks)
+    trimmed = {}
+    if compact and tokens > budget:
+        blocks, tokens, trimmed = _fit(blocks, tokens, budget, layout)
+
+    stable = 0
+    while stable < len(blocks) and blocks[stable][0] in STABLE_PREFIX[layout]:
+        stable += 1
+    prefix_length = len(preamble) + len(separator.join(block for _, block in blocks[:stable]))
+    prompt = preamble + separator.join(block for _, block in blocks) + governance
+    return AssembledPrompt(prompt, prefix_length, tokens, trimmed)
+
+def prefix_hash(prompt, prefix_length):
+    """Content hash of the stable prefix."""
+    return hashlib.sha1(prompt[:prefix_length].encode("utf-8")).hexdigest()
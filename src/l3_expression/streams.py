@@ -0,0 +1,65 @@
+import numpy as np
+
+# Philox4x32-10 constants (Salmon et al., "Parallel Random Numbers: As Easy as 1, 2, 3")
+_M0 = np.uint64(0xD2511F53)
+_M1 = np.uint64(0xCD9E8D57)
+_W0 = 0x9E3779B9
+_W1 = 0xBB67AE85
+_MASK32 = np.uint64(0xFFFFFFFF)
+_SHIFT32 = np.uint64(32)
+_ROUNDS = 10
+
+def philox4x32(c0, c1, c2, c3, key):
+    """
+    Counter-based generator: maps (counter, key) to four 32-bit words.
+    Counters are uint64 arrays holding 32-bit values, so a whole batch of
+    independent substreams is evaluated in one vectorized pass. Key words may be
+    ints or uint64 arrays broadcastable against the counters (one key per row).
+    """
+    k0 = np.asarray(key[0], dtype=np.uint64)
+    k1 = np.asarray(key[1], dtype=np.uint64)
+    for r in range(_ROUNDS):
+        if r:
+            k0 = (k0 + np.uint64(_W0)) & _MASK32
+            k1 = (k1 + np.uint64(_W1)) & _MASK32
+        p0 = _M0 * c0
+        p1 = _M1 * c2
+        c0, c1, c2, c3 = (
+            (p1 >> _SHIFT32) ^ c1 ^ k0,
+            p1 & _MASK32,
+            (p0 >> _SHIFT32) ^ c3 ^ k1,
+            p0 & _MASK32,
+        )
+    return c0, c1, c2, c3
+
+def key_from_int(value):
+    """Splits an integer seed into a 2x32-bit Philox key."""
+    return (value & 0xFFFFFFFF, (value >> 32) & 0xFFFFFFFF)
+
+def batch_uniforms(keys, n):
+    """
+    Uniform matrix of shape (len(keys), n): row r holds substreams 0..n-1 of keys[r].
+    Identical, row by row, to substream_uniforms(keys[r], range(n)).
+    """
+    k = np.asarray(keys, dtype=np.uint64).reshape(-1, 2)
+    return substream_uniforms((k[:, 0:1], k[:, 1:2]), np.arange(n, dtype=np.uint64)[None, :])
+
+def substream_uniforms(key, indices, draw=0):
+    """
+    Returns one U[0,1) double per substream index.
+    Substream i of a key is the counter (i, draw, 0, 0): its value depends only
+    on (key, i, draw), never on how many other substreams were evaluated or in
+    which order, so loci can be sampled individually or in parallel.
+    """
+    k0 = np.asarray(key[0], dtype=np.uint64)
+    k1 = np.asarray(key[1], dtype=np.uint64)
+    idx = np.broadcast_to(np.asarray(indices, dtype=np.uint64), np.broadcast_shapes(
+        np.shape(indices), k0.shape, k1.shape))
+    c0 = idx & _MASK32
+    c1 = idx >> _SHIFT32
+    c2 = np.full(idx.shape, draw & 0xFFFFFFFF, dtype=np.uint64)
+    c3 = np.zeros(idx.shape, dtype=np.uint64)
+    w0, w1, _, _ = philox4x32(c0, c1, c2, c3, (k0, k1))
+    # 53-bit mantissa from the first two words, as in random.random()
+    mantissa = ((w0 >> np.uint64(5)) << np.uint64(26)) | (w1 >> np.uint64(6))
+    return mantissa.astype(np.float64) * (1.0 / 9007199254740992.0)
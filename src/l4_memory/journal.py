@@ -1,58 +1,655 @@
+import atexit
 import json
 import os
+import sqlite3
+import sys
+import threading
 import time
+from collections import deque
+from contextlib import contextmanager
+from itertools import islice
+
+try:
+    import fcntl
+except ImportError:  # No advisory locks (Windows): one writer per journal directory
+    fcntl = None
+
+from src.l4_memory.journal_index import JournalIndex, entry_row
+from src.l4_memory.segments import CODECS, SegmentIndex, list_segments, segment_path
 
 class PersonaReflectionJournal:
     """
     Logs the internal evolution of the persona.
     Used for 'Recursive Self-Observation'.
+
+    Writes are group-committed: log_entry() only queues the record; a background
+    flusher formats the queued records and appends them through a file handle
+    that stays open. A flush happens every `flush_every` entries, every
+    `flush_interval_ms`, on flush() and on close() (also registered at exit).
+    `fsync` decides what a completed flush guarantees:
+    - "never": entries reach the OS page cache (survive a process crash)
+    - "flush": every flush is fsynced (survive a power loss)
+    - "close": only close() fsyncs
+    Entries still queued are lost if the process dies; stats() reports how many.
+    Entries logged after close() are dropped (stats()["dropped"]).
+
+    The journal is stored as segments next to `journal_path` (see segments.py).
+    Writers append to the newest unsealed segment, shared by every journal
+    instance and process on the directory: each batch is written under an
+    advisory lock file (<journal>.lock), after indexing whatever other writers
+    appended. Entries are stamped under that lock, never earlier than the
+    newest entry already in the journal, so timestamps stay non-decreasing
+    across writers. The segment is sealed (sidecar index written) and a new one
+    started only past `segment_max_bytes` or `segment_max_age_s`; close()
+    leaves it open for the next writer. A pre-segment single-file journal at
+    `journal_path` is adopted as segment 0. Segments no writer appends to any
+    more (the adopted file, or ones a crash left unsealed) are sealed once by
+    the first journal to open the directory.
+    Only the flusher thread rotates (seals) segments and compresses sealed
+    ones (`compression`: "zlib", "lzma" or "none"), after the write lock is
+    released; a flush() from any other thread (readers, callers past
+    `max_pending`) just appends, past the limit if need be, and leaves the
+    rotation to the flusher.
+
+    With `index_path` set, written entries are queued for a SQLite JournalIndex,
+    which backs query(). Only the flusher feeds it, after the write lock is
+    released, so a busy database never stalls a request or a reader;
+    stats()["index_pending"] is the rows written but not indexed yet.
     """
-    def __init__(self, journal_path="logs/persona_journal.jsonl"):
-        self.journal_path = journal_path
-        os.makedirs(os.path.dirname(self.journal_path), exist_ok=True)
+    FSYNC_POLICIES = ("never", "flush", "close")
 
-    def log_entry(self, status, user_input=None):
-        entry = {
-            "timestamp": time.time(),
-            "iso_time": time.ctime(),
+    def __init__(self, journal_path=None, flush_every=None, flush_interval_ms=None, fsync=None, max_pending=None,
+                 segment_max_bytes=None, segment_max_age_s=None, index_stride=None, compression=None,
+                 index_path=None, recent_cache=None):
+        from src import config
+
+        self.journal_path = journal_path or config.JOURNAL_PATH
+        os.makedirs(os.path.dirname(self.journal_path) or ".", exist_ok=True)
+        self._lock_path = os.path.splitext(self.journal_path)[0] + ".lock"
+        self.flush_every = flush_every if flush_every is not None else config.JOURNAL_FLUSH_EVERY
+        self.flush_interval_ms = flush_interval_ms if flush_interval_ms is not None else config.JOURNAL_FLUSH_INTERVAL_MS
+        self.fsync = fsync or config.JOURNAL_FSYNC
+        if self.fsync not in self.FSYNC_POLICIES:
+            raise ValueError(f"Unknown journal fsync policy '{self.fsync}' (expected one of {self.FSYNC_POLICIES})")
+        # Past this depth the caller flushes inline instead of waiting for the flusher
+        self.max_pending = max_pending or config.JOURNAL_MAX_PENDING
+        self.segment_max_bytes = segment_max_bytes or config.JOURNAL_SEGMENT_MAX_BYTES
+        self.segment_max_age_s = segment_max_age_s or config.JOURNAL_SEGMENT_MAX_AGE_S
+        self.index_stride = index_stride or config.JOURNAL_INDEX_STRIDE
+        self.compression = compression or config.JOURNAL_COMPRESSION
+        if self.compression != "none" and self.compression not in CODECS:
+            raise ValueError(f"Unknown journal compression '{self.compression}' (expected none or one of {tuple(CODECS)})")
+        index_path = index_path or config.JOURNAL_SQLITE_PATH
+        self.index = JournalIndex(index_path) if index_path else None
+        self.recent_cache = recent_cache or config.JOURNAL_RECENT_CACHE
+
+        # Queued (log time, status, user_input) records, swapped out whole by the flusher
+        self._pending = []
+        self._queued = 0        # records ever queued
+        self._dropped = 0       # records logged after close()
+        self._written = 0       # records handed to the OS
+        self._synced = 0        # records fsynced
+        self._flushes = 0
+        self._lock = threading.Lock()           # guards the queue and counters
+        self._write_lock = threading.Lock()     # one flush at a time, keeps lines ordered
+        self._wake = threading.Event()
+        self._file = None
+        self._segment = None    # SegmentIndex of the (shared) segment this instance appends to
+        self._indexes = {}      # path -> SegmentIndex of segments already read
+        self._to_compress = []  # sealed SegmentIndex objects awaiting compression
+        self._to_index = []     # entry_row() tuples awaiting the SQLite index (flusher feeds them)
+        self._indexed = 0       # rows ever fed to the SQLite index
+        self._index_fed = threading.Condition(self._lock)
+        self._index_failed = False
+        # get_recent_insights state: decoded entries of the segment being written
+        # (newest last), decoded tails of other segments and the segment listing
+        self._recent = deque(maxlen=self.recent_cache)
+        self._tails = {}        # path -> (indexed size, decoded entries newest first)
+        self._listing = None    # (directory mtime_ns, [segment paths])
+        self._flusher = None
+        self._closed = False
+        self._recover()
+
+    @contextmanager
+    def _segment_lock(self):
+        # Serializes appends, rotation and recovery across writers of the directory
+        with open(self._lock_path, "a") as f:
+            if fcntl is not None:
+                fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+            yield  # closing the file releases the lock
+
+    def _recover(self):
+        # Adopts a legacy single-file journal and seals every unsealed segment
+        # but the newest (the only one appended to), so their scan is saved in
+        # a sidecar instead of being repeated by every reader and process
+        with self._segment_lock():
+            existing = list_segments(self.journal_path)
+            if os.path.isfile(self.journal_path) and not existing:
+                os.replace(self.journal_path, segment_path(self.journal_path, 0))
+                existing = [(0, segment_path(self.journal_path, 0))]
+            else:
+                existing = existing[:-1]
+            for _, path in existing:
+                if os.path.exists(path + ".idx"):
+                    continue
+                index = SegmentIndex.scan(path, self.index_stride)
+                if os.path.getsize(path) > index.size:
+                    os.truncate(path, index.size)  # torn tail: nobody will complete it
+                index.save()
+                self._indexes[path] = index
+                if self.compression != "none":
+                    self._to_compress.append(index)
+
+    @staticmethod
+    def _make_entry(timestamp, status, user_input=None):
+        return {
+            "timestamp": timestamp,
+            "iso_time": time.ctime(timestamp),
             "interaction_id": status['interaction_count'],
             "state": status['state'],
             "affect": status['affect'],
             "intimacy": status['intimacy_level'],
             "context_shorthand": user_input[:50] if user_input else "background_process"
         }
-        
-        with open(self.journal_path, "a", encoding="utf-8") as f:
-            f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+
+    def _enqueue(self, records):
+        with self._lock:
+            closed = self._closed
+            if closed:
+                # Too late for the flusher's last pass: dropped and counted
+                first_drop = not self._dropped
+                self._dropped += len(records)
+            else:
+                now = time.time()
+                self._pending.extend((now, status, user_input) for status, user_input in records)
+                self._queued += len(records)
+                depth = len(self._pending)
+                if self._flusher is None:
+                    self._start_flusher()
+        if closed:
+            if first_drop:
+                sys.stderr.write(f"⚠️  Journal {self.journal_path} is closed; dropping late entries\n")
+        elif depth >= self.max_pending:
+            self.flush()
+        elif self.flush_every and depth >= self.flush_every:
+            self._wake.set()
+
+    def log_entry(self, status, user_input=None):
+        self._enqueue([(status, user_input)])
+
+    def log_entries(self, records):
+        """
+        Queues several (status, user_input) records; they are written together.
+        """
+        records = list(records)
+        if records:
+            self._enqueue(records)
+
+    async def log_entry_async(self, status, user_input=None):
+        """
+        Awaitable log_entry. Queuing never touches the file, so this does not
+        block the event loop.
+        """
+        self.log_entry(status, user_input)
+
+    # --- Group commit ---
+
+    def _start_flusher(self):
+        self._flusher = threading.Thread(target=self._run, name="journal-flush", daemon=True)
+        self._flusher.start()
+        atexit.register(self.close)
+
+    def _run(self):
+        timeout = self.flush_interval_ms / 1000 if self.flush_interval_ms else None
+        while True:
+            self._wake.wait(timeout)
+            self._wake.clear()
+            closing = self._closed
+            # The last pass (on close) also fsyncs
+            self._flush(sync=True if closing and self.fsync != "never" else None, rotate=True)
+            self._compress_sealed()
+            if self.index is not None:
+                self._index_written()
+            if closing:
+                return
+
+    def flush(self, sync=None):
+        """
+        Writes every queued entry. sync=True also fsyncs regardless of policy.
+        Returns the number of entries written. Never seals or compresses a
+        segment nor feeds the SQLite index: that is left to the flusher.
+        """
+        return self._flush(sync, rotate=False)
+
+    def _flush(self, sync, rotate):
+        with self._write_lock:
+            with self._lock:
+                batch, self._pending = self._pending, []
+            if batch or (rotate and self._segment is not None and self._due(self._segment, time.time())):
+                self._write(batch, rotate)
+            with self._lock:
+                self._written += len(batch)
+                self._flushes += bool(batch)
+                written = self._written
+            if self._file is not None and written > self._synced and (sync or (sync is None and self.fsync == "flush")):
+                os.fsync(self._file.fileno())
+                with self._lock:
+                    self._synced = written
+        return len(batch)
+
+    def _due(self, segment, timestamp):
+        # Past the size or age limit: the flusher rotates before its next append
+        return (segment.size >= self.segment_max_bytes
+                or (segment.count and timestamp - segment.first_ts >= self.segment_max_age_s))
+
+    def _write(self, batch, rotate):
+        """
+        Appends `batch` under the segment lock. With rotate=False (any thread
+        but the flusher) a segment past its limits is appended to anyway and
+        the flusher is woken to seal it.
+        """
+        rows = []
+        with self._segment_lock():
+            segment = self._attach()
+            if rotate and segment is not None and self._due(segment, batch[0][0] if batch else time.time()):
+                self._seal(sync=self.fsync != "never")
+                segment = None
+            # Non-decreasing across writers, so segments and stride points can be bisected by time
+            floor = self._newest_ts(segment)
+            for logged, status, user_input in batch:
+                timestamp = floor = max(logged, floor)
+                if segment is None or (rotate and self._due(segment, timestamp)):
+                    segment = self._rotate()
+                entry = self._make_entry(timestamp, status, user_input)
+                line = (json.dumps(entry, ensure_ascii=False) + "\n").encode("utf-8")
+                self._file.write(line)
+                self._recent.append(entry)
+                if self.index is not None:
+                    rows.append(entry_row(os.path.basename(segment.path), segment.count, entry))
+                segment.add(timestamp, segment.size, len(line))
+            if batch:
+                # Complete lines only, before another writer takes the lock
+                self._file.flush()
+            overdue = not rotate and segment is not None and self._due(segment, time.time())
+        if rows:
+            with self._lock:
+                self._to_index.extend(rows)
+        if not rotate and (overdue or rows):
+            # Rotation and the index feed are the flusher's
+            self._wake.set()
+
+    def _newest_ts(self, segment):
+        """
+        Timestamp of the newest entry in the journal, under the segment lock:
+        the attached segment's last one, else that of the newest non-empty
+        segment on disk (e.g. the one another writer just sealed).
+        """
+        if segment is not None and segment.count:
+            return segment.last_ts
+        for _, path in reversed(list_segments(self.journal_path)):
+            if segment is not None and path == segment.path:
+                continue
+            index = self._indexes.get(path)
+            if index is None or index.stale():
+                try:
+                    index = self._indexes[path] = SegmentIndex.load(path, self.index_stride)
+                except OSError:
+                    continue
+            if index.count:
+                return index.last_ts
+        return 0.0
+
+    def _sync_segment(self):
+        """
+        Catches the shared segment's index up with other writers' appends and
+        returns it, or None once another writer sealed it. Caller holds _write_lock.
+        """
+        segment = self._segment
+        if segment is None:
+            return None
+        try:
+            if os.path.exists(segment.sidecar_path):
+                raise FileExistsError(segment.sidecar_path)
+            if segment.extend():
+                # Interleaved with entries this instance did not write
+                self._recent.clear()
+        except OSError:
+            self._release()
+            return None
+        return segment
+
+    def _attach(self):
+        """
+        Segment to append to, under the segment lock: the current one unless
+        another writer sealed it, else the newest unsealed segment (its torn
+        tail, if any, cut off), else None.
+        """
+        if self._sync_segment() is not None:
+            return self._segment
+        existing = list_segments(self.journal_path)
+        if not existing:
+            return None
+        path = existing[-1][1]
+        try:
+            index = SegmentIndex.load(path, self.index_stride)
+        except OSError:
+            return None  # compressed: rotate
+        if index.sealed:
+            return None
+        if os.path.getsize(path) > index.size:
+            os.truncate(path, index.size)  # a crashed writer's half line
+        self._file = open(path, "ab")
+        self._segment = index
+        self._recent = deque(maxlen=self.recent_cache)
+        return index
+
+    def _release(self):
+        # Closes the handle on the current segment without sealing it
+        if self._file is not None:
+            self._file.close()
+        self._file = None
+        self._segment = None
+        self._recent = deque(maxlen=self.recent_cache)
+
+    def _seal(self, sync):
+        if self._file is None:
+            return
+        self._file.flush()
+        if sync:
+            os.fsync(self._file.fileno())
+        self._file.close()
+        self._file = None
+        self._segment.save()
+        self._indexes[self._segment.path] = self._segment
+        if self.compression != "none":
+            with self._lock:
+                self._to_compress.append(self._segment)
+        self._segment = None
+
+    def _index_written(self):
+        # Flusher thread only. Rows stay queued (and counted as pending) until
+        # inserted; a failed insert is retried on the next pass and never
+        # fails the write itself
+        with self._lock:
+            rows = self._to_index[:]
+        if not rows:
+            return
+        try:
+            self.index.add(rows)
+        except sqlite3.Error as e:
+            with self._lock:
+                self._index_failed = True
+                self._index_fed.notify_all()
+            sys.stderr.write(f"⚠️  Journal index update failed, will retry: {e}\n")
+            return
+        with self._lock:
+            del self._to_index[:len(rows)]
+            self._indexed += len(rows)
+            self._index_failed = False
+            self._index_fed.notify_all()
+
+    def _await_index(self):
+        # Waits for the flusher to feed the rows written so far (or to fail)
+        with self._lock:
+            target = self._indexed + len(self._to_index)
+            self._index_failed = False
+            while self._indexed < target and self._flusher is not None and not self._index_failed:
+                self._wake.set()
+                self._index_fed.wait(0.1)
+
+    def _compress_sealed(self):
+        # Flusher thread only
+        while True:
+            with self._lock:
+                if not self._to_compress:
+                    return
+                index = self._to_compress.pop(0)
+            try:
+                index.compress(self.compression)
+            except FileNotFoundError:
+                continue  # compressed by another process in the meantime
+
+    def compact(self):
+        """
+        Compresses every sealed, uncompressed segment of the journal, e.g. the
+        ones written before compression was enabled. Returns how many were
+        compressed. Segments still being written (no sidecar) are left alone.
+        """
+        if self.compression == "none":
+            return 0
+        compacted = 0
+        for index in self.segments():
+            if index.sealed and not index.codec:
+                try:
+                    index.compress(self.compression)
+                except FileNotFoundError:
+                    continue  # compressed by its own writer in the meantime
+                compacted += 1
+        return compacted
+
+    def _rotate(self):
+        """Seals the current segment (under the segment lock) and starts the next one."""
+        self._seal(sync=self.fsync != "never")
+        existing = list_segments(self.journal_path)
+        seq = existing[-1][0] + 1 if existing else 1
+        while True:
+            path = segment_path(self.journal_path, seq)
+            try:
+                # Exclusive (lock-less platforms may race for the number), and
+                # O_APPEND: other writers will append to this segment too
+                fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL | os.O_APPEND | getattr(os, "O_BINARY", 0))
+                self._file = os.fdopen(fd, "ab")
+                break
+            except FileExistsError:
+                seq += 1
+        self._segment = SegmentIndex(path, self.index_stride)
+        self._recent = deque(maxlen=self.recent_cache)
+        return self._segment
+
+    def close(self):
+        """
+        Flushes and fsyncs everything queued, stops the flusher and closes the
+        SQLite index. The segment is left unsealed for the next writer to
+        append to. Later entries are dropped.
+        """
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            flusher, self._flusher = self._flusher, None
+        self._wake.set()
+        if flusher is not None and flusher is not threading.current_thread():
+            # Its last pass writes, fsyncs, rotates and compresses what is left
+            flusher.join()
+            atexit.unregister(self.close)
+        self.flush(sync=self.fsync != "never")
+        with self._write_lock:
+            self._release()
+        if self.index is not None:
+            self.index.close()
+
+    def stats(self):
+        """
+        Queue depth and durability counters: entries queued (in memory only),
+        written (in the OS page cache or later) and synced (on stable storage).
+        """
+        with self._lock:
+            return {
+                "pending": len(self._pending),
+                "queued": self._queued,
+                "dropped": self._dropped,
+                "written": self._written,
+                "synced": self._synced,
+                "flushes": self._flushes,
+                "flush_every": self.flush_every,
+                "flush_interval_ms": self.flush_interval_ms,
+                "fsync": self.fsync,
+                "compression": self.compression,
+                "index_pending": len(self._to_index),
+                "segment": self._segment.path if self._segment else None,
+            }
+
+    # --- Reading ---
+
+    def segments(self):
+        """
+        Indexes of every segment, oldest first, consistent with everything
+        flushed so far. Indexes are cached; a segment still being written is
+        re-indexed when it grows.
+        """
+        self.flush()
+        with self._write_lock:
+            own = self._sync_segment()
+            own = own.snapshot() if own else None
+        indexes = []
+        for _, path in list_segments(self.journal_path):
+            if own is not None and path == own.path:
+                indexes.append(own)
+                continue
+            index = self._indexes.get(path)
+            if index is None or index.stale():
+                try:
+                    index = self._indexes[path] = SegmentIndex.load(path, self.index_stride)
+                except OSError:
+                    continue
+            indexes.append(index)
+        return indexes
+
+    def read_range(self, start=None, end=None):
+        """
+        Yields the entries with start <= timestamp <= end (None: unbounded),
+        oldest first. Only segments overlapping the range are opened, and each
+        is entered at the stride point just before `start`.
+        """
+        for index in self.segments():
+            if not index.overlaps(start, end):
+                continue
+            for line in self._read_lines(index, index.seek_offset(start)):
+                entry = json.loads(line)
+                if start is not None and entry["timestamp"] < start:
+                    continue
+                if end is not None and entry["timestamp"] > end:
+                    break
+                yield entry
+
+    def _reload(self, index):
+        # The files changed under a cached index: the segment was compressed
+        # (raw file removed) after the staleness check. Raises OSError if gone.
+        index = self._indexes[index.path] = SegmentIndex.load(index.path, self.index_stride)
+        return index
+
+    def _read_lines(self, index, offset=0):
+        """index.read_lines(offset), reloading the index once if the segment was compressed meanwhile."""
+        lines = index.read_lines(offset)
+        try:
+            first = next(lines, None)
+        except OSError:
+            try:
+                lines = self._reload(index).read_lines(offset)
+                first = next(lines, None)
+            except OSError:
+                return
+        if first is not None:
+            yield first
+            yield from lines
+
+    def _segment_paths(self):
+        # A segment is created or removed only through a directory entry, so an
+        # unchanged directory mtime means an unchanged listing. Listings taken
+        # within a second of the last change are not trusted (coarse mtimes).
+        directory = os.path.dirname(self.journal_path) or "."
+        mtime = os.stat(directory).st_mtime_ns
+        if self._listing is not None and self._listing[0] == mtime and time.time_ns() - mtime > 1_000_000_000:
+            return self._listing[1]
+        paths = [path for _, path in list_segments(self.journal_path)]
+        self._listing = (mtime, paths)
+        return paths
+
+    def _tail(self, path, n, index=None):
+        """Decoded last n entries of a segment, newest first."""
+        index = index or self._indexes.get(path)
+        if index is None or index.stale():
+            try:
+                index = self._indexes[path] = SegmentIndex.load(path, self.index_stride)
+            except OSError:
+                return []
+        cached = self._tails.get(path)
+        if cached is not None and cached[0] == index.size and len(cached[1]) >= min(n, index.count):
+            return cached[1][:n]
+        try:
+            lines = index.tail_lines(max(n, self.recent_cache))
+        except OSError:
+            try:
+                index = self._reload(index)
+                lines = index.tail_lines(max(n, self.recent_cache))
+            except OSError:
+                return []
+        entries = [json.loads(line) for line in reversed(lines)]
+        self._tails[path] = (index.size, entries)
+        return entries[:n]
 
     def get_recent_insights(self, limit=10):
         """
-        Reads the last few entries to provide 'context' for the AI's self-reflection.
-        Optimized for large files: Reads from the end.
+        Reads the last few entries (newest first) to provide 'context' for the
+        AI's self-reflection. Entries this journal wrote to its current segment
+        come from memory; other segments are read from the tail only and their
+        decoded tails are cached until the segment changes.
         """
-        if not os.path.exists(self.journal_path):
-            return []
-            
+        self.flush()
+        with self._write_lock:
+            segment = self._sync_segment()
+            own = segment.path if segment else None
+            own_count = segment.count if segment else 0
+            recent = list(self._recent)
         results = []
-        chunk_size = 1024
-        with open(self.journal_path, "rb") as f:
-            f.seek(0, 2)
-            file_size = f.tell()
-            buffer = b""
-            pointer = file_size
-            
-            while len(results) < limit and pointer > 0:
-                step = min(chunk_size, pointer)
-                pointer -= step
-                f.seek(pointer)
-                buffer = f.read(step) + buffer
-                lines = buffer.split(b"\n")
-                
-                # Keep the first part in buffer (it might be incomplete)
-                buffer = lines[0]
-                # Process the rest
-                for line in reversed(lines[1:]):
-                    if line.strip() and len(results) < limit:
-                        results.append(json.loads(line.decode("utf-8")))
-        
-        return results
+        for path in reversed(self._segment_paths()):
+            need = limit - len(results)
+            if need <= 0:
+                break
+            if path == own and len(recent) >= min(need, own_count):
+                results.extend(recent[:-need - 1:-1])
+            elif path == own:
+                # More than the in-memory window: read back through the live index
+                with self._write_lock:
+                    index = self._segment.snapshot() if self._segment and self._segment.path == own else None
+                results.extend(self._tail(path, need, index))
+            else:
+                results.extend(self._tail(path, need))
+        # Shared with the caches: hand out copies
+        return [dict(entry, affect=dict(entry["affect"])) if "affect" in entry else dict(entry)
+                for entry in results[:limit]]
+
+    # --- SQLite index ---
+
+    def query(self, **filters):
+        """
+        Streams entries from the SQLite index (see JournalIndex.query for the
+        filters), including everything logged so far: waits for the flusher
+        to index what is pending.
+        """
+        if self.index is None:
+            raise RuntimeError("Journal has no SQLite index (set index_path or config.JOURNAL_SQLITE_PATH)")
+        self.flush()
+        self._await_index()
+        return self.index.query(**filters)
+
+    def rebuild_index(self):
+        """
+        Feeds the SQLite index every entry of segments it does not fully cover,
+        e.g. after enabling it on an existing journal. Returns the rows added.
+        """
+        if self.index is None:
+            raise RuntimeError("Journal has no SQLite index (set index_path or config.JOURNAL_SQLITE_PATH)")
+        added = 0
+        for segment in self.segments():
+            name = os.path.basename(segment.path)
+            missing = segment.count - self.index.count(name)
+            if missing <= 0:
+                continue
+            lines = enumerate(self._read_lines(segment))
+            while True:
+                rows = [entry_row(name, number, json.loads(line)) for number, line in islice(lines, 1000)]
+                if not rows:
+                    break
+                added += self.index.add(rows)
+        return added
@@ -0,0 +1,123 @@
+import os
+import sqlite3
+import threading
+import time
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    segment TEXT NOT NULL,
+    entry INTEGER NOT NULL,
+    timestamp REAL NOT NULL,
+    interaction_id INTEGER,
+    state TEXT,
+    p REAL,
+    a REAL,
+    d REAL,
+    intimacy REAL,
+    context TEXT,
+    PRIMARY KEY (segment, entry)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS entries_timestamp ON entries (timestamp);
+CREATE INDEX IF NOT EXISTS entries_interaction ON entries (interaction_id);
+CREATE INDEX IF NOT EXISTS entries_state ON entries (state, timestamp);
+CREATE INDEX IF NOT EXISTS entries_p ON entries (p);
+CREATE INDEX IF NOT EXISTS entries_a ON entries (a);
+CREATE INDEX IF NOT EXISTS entries_d ON entries (d);
+"""
+
+COLUMNS = "timestamp, interaction_id, state, p, a, d, intimacy, context"
+
+def entry_row(segment, number, entry):
+    """Row for journal entry `number` of `segment` (a segment file name)."""
+    affect = entry.get("affect") or {}
+    return (segment, number, entry["timestamp"], entry.get("interaction_id"), entry.get("state"),
+            affect.get("p"), affect.get("a"), affect.get("d"), entry.get("intimacy"), entry.get("context_shorthand"))
+
+class JournalIndex:
+    """
+    SQLite (WAL mode) index of the reflection journal with indexed timestamp,
+    interaction_id, state and PAD columns, for compliance queries such as
+    "LOCKED turns with p < -0.5 last month" without scanning the JSONL.
+
+    Rows are keyed by (segment, entry number), so feeding the same entry twice
+    (a rebuild after a crash) is harmless. The journal feeds it from its
+    flusher thread only; queries use their own read-only connection and stream rows, so
+    they neither block the writer nor load the journal into memory.
+    """
+    def __init__(self, path):
+        self.path = path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._lock = threading.Lock()
+        # Short busy timeout: the flusher retries a locked database on its next pass
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=1)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+
+    def add(self, rows):
+        """
+        Inserts entry_row() tuples in one transaction. Returns how many were
+        new (rows already indexed are ignored).
+        """
+        with self._lock, self._conn:
+            before = self._conn.total_changes
+            self._conn.executemany("INSERT OR IGNORE INTO entries VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+            return self._conn.total_changes - before
+
+    def count(self, segment=None):
+        with self._lock:
+            if segment is None:
+                return self._conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+            return self._conn.execute("SELECT COUNT(*) FROM entries WHERE segment = ?", (segment,)).fetchone()[0]
+
+    def query(self, start=None, end=None, state=None, interaction_id=None, p=None, a=None, d=None,
+              limit=None, newest_first=False):
+        """
+        Yields journal entries (same shape as the JSONL ones) matching every
+        given filter, in timestamp order. start/end and the (low, high) PAD
+        ranges are inclusive, None leaves a side open; `state` may be a name or
+        a collection of names.
+        """
+        clauses, params = [], []
+        for column, bounds in (("timestamp", (start, end)), ("p", p), ("a", a), ("d", d)):
+            low, high = bounds or (None, None)
+            if low is not None:
+                clauses.append(f"{column} >= ?")
+                params.append(low)
+            if high is not None:
+                clauses.append(f"{column} <= ?")
+                params.append(high)
+        if state is not None:
+            states = [state] if isinstance(state, str) else list(state)
+            clauses.append(f"state IN ({', '.join('?' * len(states))})")
+            params.extend(states)
+        if interaction_id is not None:
+            clauses.append("interaction_id = ?")
+            params.append(interaction_id)
+
+        sql = f"SELECT {COLUMNS} FROM entries"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += " ORDER BY timestamp DESC, segment DESC, entry DESC" if newest_first else " ORDER BY timestamp, segment, entry"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+
+        conn = sqlite3.connect(f"file:{self.path}?mode=ro", uri=True, timeout=30)
+        try:
+            for timestamp, interaction_id, state, p, a, d, intimacy, context in conn.execute(sql, params):
+                yield {
+                    "timestamp": timestamp,
+                    "iso_time": time.ctime(timestamp),
+                    "interaction_id": interaction_id,
+                    "state": state,
+                    "affect": {"p": p, "a": a, "d": d},
+                    "intimacy": intimacy,
+                    "context_shorthand": context
+                }
+        finally:
+            conn.close()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
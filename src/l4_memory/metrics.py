@@ -1,4 +1,4 @@
-import re
+from collections import deque
 
 class StanceAnalyzer:
     """
@@ -21,6 +21,38 @@ class StanceAnalyzer:
              "cyber", "entropy", "chaos"
         ]
 
+    @property
+    def axes(self):
+        """Marker lists per stance axis."""
+        return {'rigor': self.rigor_markers, 'warmth': self.warmth_markers, 'chaos': self.chaos_markers}
+
+    def extract_features(self, text):
+        """
+        Per-entry statistics: (word_count, {axis: markers present in text}).
+        Markers contain no whitespace, so a marker occurs in the space-joined
+        history exactly when it occurs in one of its entries; per-entry features
+        therefore compose into the same counts analyze_history computes.
+        """
+        lowered = str(text).lower()
+        present = {axis: tuple(m for m in markers if m in lowered) for axis, markers in self.axes.items()}
+        return len(lowered.split()), present
+
+    def score(self, counts, total_words):
+        """
+        Maps per-axis marker counts and a word count to an observed stance.
+        """
+        if total_words == 0:
+            return {'rigor': 0.5, 'warmth': 0.5, 'chaos': 0.5}
+
+        # Normalize (Arbitrary scaling for demo purposes)
+        # A density of 1 marker per 20 words is considered "High"
+        def normalize(count, total):
+            density = count / max(total, 1)
+            val = min(density * 20, 1.0) # Scaling factor
+            return float(f"{val:.2f}")
+
+        return {axis: normalize(counts[axis], total_words) for axis in ('rigor', 'warmth', 'chaos')}
+
     def analyze_history(self, history_entries):
         """
         Analyzes a list of user/assistant interaction texts.
@@ -34,26 +66,10 @@ class StanceAnalyzer:
         # For now, we assume history_entries contains text strings of the Persona's Output
         combined_text = " ".join([str(e) for e in history_entries]).lower()
         total_words = len(combined_text.split())
-        if total_words == 0:
-             return {'rigor': 0.5, 'warmth': 0.5, 'chaos': 0.5}
 
         # Calculate density
-        w_count = sum(1 for w in self.warmth_markers if w in combined_text)
-        r_count = sum(1 for w in self.rigor_markers if w in combined_text)
-        c_count = sum(1 for w in self.chaos_markers if w in combined_text)
-
-        # Normalize (Arbitrary scaling for demo purposes)
-        # A density of 1 marker per 20 words is considered "High"
-        def normalize(count, total):
-            density = count / max(total, 1)
-            val = min(density * 20, 1.0) # Scaling factor
-            return float(f"{val:.2f}")
-
-        return {
-            'rigor': normalize(r_count, total_words),
-            'warmth': normalize(w_count, total_words),
-            'chaos': normalize(c_count, total_words)
-        }
+        counts = {axis: sum(1 for w in markers if w in combined_text) for axis, markers in self.axes.items()}
+        return self.score(counts, total_words)
 
     def calculate_drift(self, target_stance, observed_stance):
         """
@@ -66,3 +82,86 @@ class StanceAnalyzer:
         }
         # Formatting for readability
         return {k: float(f"{v:.2f}") for k, v in delta.items()}
+
+class RollingStanceWindow:
+    """
+    Incremental counterpart of StanceAnalyzer.analyze_history over the last
+    `window` outputs. Each output is reduced to its word count and the markers
+    it contains when logged; rolling per-marker entry counts are kept, so
+    observed() is O(1) and raw output strings are never retained.
+    """
+    def __init__(self, analyzer=None, window=20):
+        self.analyzer = analyzer or StanceAnalyzer()
+        self.window = window
+        self.clear()
+
+    def clear(self):
+        self._entries = deque()       # (word_count, {axis: markers present})
+        self._marker_counts = {}      # (axis, marker) -> entries containing it
+        self._present = {axis: 0 for axis in self.analyzer.axes}
+        self._total_words = 0
+        self._observed = None
+
+    def __len__(self):
+        return len(self._entries)
+
+    def append(self, text):
+        self._push(*self.analyzer.extract_features(text))
+
+    def _push(self, word_count, present):
+        self._entries.append((word_count, present))
+        self._total_words += word_count
+        for axis, markers in present.items():
+            for marker in markers:
+                key = (axis, marker)
+                count = self._marker_counts.get(key, 0)
+                if count == 0:
+                    self._present[axis] += 1
+                self._marker_counts[key] = count + 1
+
+        while len(self._entries) > self.window:
+            self._evict()
+        self._observed = None
+
+    def _evict(self):
+        word_count, present = self._entries.popleft()
+        self._total_words -= word_count
+        for axis, markers in present.items():
+            for marker in markers:
+                key = (axis, marker)
+                count = self._marker_counts[key] - 1
+                if count == 0:
+                    del self._marker_counts[key]
+                    self._present[axis] -= 1
+                else:
+                    self._marker_counts[key] = count
+
+    def observed(self):
+        """Observed stance of the window; equal to analyze_history over the same outputs."""
+        if self._observed is None:
+            if not self._entries:
+                self._observed = {'rigor': 0.5, 'warmth': 0.5, 'chaos': 0.5}
+            else:
+                self._observed = self.analyzer.score(self._present, self._total_words)
+        return dict(self._observed)
+
+    def to_dict(self):
+        return {
+            "window": self.window,
+            "entries": [
+                {"words": words, "markers": {axis: list(m) for axis, m in present.items()}}
+                for words, present in self._entries
+            ]
+        }
+
+    def load(self, data):
+        """Replaces the window with entries produced by to_dict()."""
+        self.window = data.get("window", self.window)
+        self.clear()
+        known = self.analyzer.axes
+        for entry in data.get("entries", []):
+            present = {
+                axis: tuple(m for m in entry["markers"].get(axis, []) if m in known[axis])
+                for axis in known
+            }
+            self._push(entry["words"], present)
@@ -0,0 +1,300 @@
+"""
+Journal segments and their sidecar indexes.
+
+A journal is a sequence of JSONL segment files next to the configured journal
+path: logs/persona_journal.jsonl -> logs/persona_journal.000001.jsonl, ...
+Each segment has a sidecar index (<segment>.idx, JSON) with the first and last
+timestamp, the entry count, the byte size and the byte offset of every
+`stride`-th entry, so a time range or tail read seeks straight to the entries it
+needs instead of scanning. Timestamps are non-decreasing within a journal, which
+is what lets both the segments and the stride points be bisected.
+
+Sealed segments can be compressed (<segment>.z) in independently decodable
+blocks, one per stride, with the block table in the sidecar: a range or tail
+read decompresses only the blocks it covers.
+"""
+import json
+import lzma
+import mmap
+import os
+import re
+import threading
+import zlib
+from bisect import bisect_left, bisect_right
+
+SEGMENT_DIGITS = 6
+COMPRESSED_SUFFIX = ".z"
+
+# codec -> (compress, decompress)
+CODECS = {
+    "zlib": (lambda data: zlib.compress(data, 6), zlib.decompress),
+    "lzma": (lambda data: lzma.compress(data, preset=6), lzma.decompress),
+}
+
+def segment_path(journal_path, seq):
+    stem, ext = os.path.splitext(journal_path)
+    return f"{stem}.{seq:0{SEGMENT_DIGITS}d}{ext or '.jsonl'}"
+
+def list_segments(journal_path):
+    """
+    [(seq, path)] of the journal's segments, oldest first. `path` is the
+    uncompressed segment path even when only its compressed file remains.
+    """
+    directory = os.path.dirname(journal_path) or "."
+    stem, ext = os.path.splitext(os.path.basename(journal_path))
+    pattern = re.compile(rf"^({re.escape(stem)}\.(\d{{{SEGMENT_DIGITS},}}){re.escape(ext or '.jsonl')})"
+                         rf"(?:{re.escape(COMPRESSED_SUFFIX)})?$")
+    if not os.path.isdir(directory):
+        return []
+    found = {}
+    for name in os.listdir(directory):
+        match = pattern.match(name)
+        if match:
+            found[int(match.group(2))] = os.path.join(directory, match.group(1))
+    return sorted(found.items())
+
+class SegmentIndex:
+    """
+    Index of one segment: first/last timestamp, entry count, byte size and
+    (offset, timestamp) of entries 0, stride, 2 * stride, ...
+    `sealed` means the segment is complete and the sidecar is on disk.
+    A compressed segment also has its codec and, per stride point, the
+    (offset, length) of its block in the compressed file; offsets and size
+    still refer to the uncompressed bytes.
+    """
+    def __init__(self, path, stride, first_ts=None, last_ts=None, count=0, size=0, offsets=None, sealed=False,
+                 codec=None, blocks=None):
+        self.path = path
+        self.stride = stride
+        self.first_ts = first_ts
+        self.last_ts = last_ts
+        self.count = count
+        self.size = size
+        self.offsets = [tuple(point) for point in offsets or []]
+        self.sealed = sealed
+        self.codec = codec
+        self.blocks = [tuple(block) for block in blocks or []]
+
+    @property
+    def sidecar_path(self):
+        return self.path + ".idx"
+
+    @property
+    def compressed_path(self):
+        return self.path + COMPRESSED_SUFFIX
+
+    @property
+    def stored_bytes(self):
+        """Bytes on disk (compressed size for compressed segments)."""
+        return sum(length for _, length in self.blocks) if self.codec else self.size
+
+    def stale(self):
+        """True when the files on disk no longer match this index."""
+        if self.codec:
+            return False
+        try:
+            # Compressed (and the raw file removed) since, or still growing
+            return os.path.getsize(self.path) != self.size
+        except OSError:
+            return True
+
+    def add(self, timestamp, offset, length):
+        """Records an entry of `length` bytes written at `offset`."""
+        if self.count % self.stride == 0:
+            self.offsets.append((offset, timestamp))
+        if self.first_ts is None:
+            self.first_ts = timestamp
+        self.last_ts = timestamp
+        self.count += 1
+        self.size = offset + length
+
+    def snapshot(self):
+        """Copy that stays consistent while the writer keeps appending."""
+        return SegmentIndex(self.path, self.stride, self.first_ts, self.last_ts,
+                            self.count, self.size, self.offsets, self.sealed, self.codec, self.blocks)
+
+    # --- Sidecar ---
+
+    def to_dict(self):
+        data = {
+            "segment": os.path.basename(self.path),
+            "first_ts": self.first_ts,
+            "last_ts": self.last_ts,
+            "count": self.count,
+            "size": self.size,
+            "stride": self.stride,
+            "offsets": [list(point) for point in self.offsets],
+        }
+        if self.codec:
+            data["codec"] = self.codec
+            data["blocks"] = [list(block) for block in self.blocks]
+        return data
+
+    def save(self):
+        """Writes the sidecar (atomically) and marks the segment sealed."""
+        tmp_path = self.sidecar_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, separators=(",", ":"))
+        os.replace(tmp_path, self.sidecar_path)
+        self.sealed = True
+
+    @classmethod
+    def load(cls, path, stride):
+        """
+        Index of the segment at `path`: its sidecar when it matches the files
+        on disk, otherwise rebuilt by scanning (a segment still being written,
+        or left behind by a crash). Raises OSError when the segment is gone.
+        """
+        try:
+            with open(path + ".idx", "r", encoding="utf-8") as f:
+                data = json.load(f)
+            index = cls(path, data["stride"], data["first_ts"], data["last_ts"], data["count"], data["size"],
+                        data["offsets"], sealed=True, codec=data.get("codec"), blocks=data.get("blocks"))
+            if index.codec:
+                if os.path.getsize(index.compressed_path) == index.stored_bytes:
+                    return index
+            elif os.path.getsize(path) == index.size:
+                return index
+        except (OSError, ValueError, KeyError):
+            pass
+        return cls.scan(path, stride, os.path.getsize(path))
+
+    @classmethod
+    def scan(cls, path, stride, size=None):
+        """Builds the index from the segment's complete lines (up to `size` bytes)."""
+        index = cls(path, stride)
+        index.extend(size)
+        return index
+
+    def extend(self, size=None):
+        """
+        Indexes the complete lines past the indexed size (up to `size` bytes),
+        e.g. the ones other writers appended to a shared segment. Returns how
+        many entries were added.
+        """
+        added = 0
+        with open(self.path, "rb") as f:
+            if size is None and os.fstat(f.fileno()).st_size == self.size:
+                return 0
+            f.seek(self.size)
+            offset = self.size
+            for line in f:
+                if size is not None and offset + len(line) > size or not line.endswith(b"\n"):
+                    break  # torn tail of an interrupted write
+                if line.strip():
+                    self.add(json.loads(line)["timestamp"], offset, len(line))
+                    added += 1
+                else:
+                    self.size = offset + len(line)
+                offset += len(line)
+        return added
+
+    # --- Lookup ---
+
+    def overlaps(self, start, end):
+        if not self.count:
+            return False
+        return (start is None or self.last_ts >= start) and (end is None or self.first_ts <= end)
+
+    def seek_offset(self, start):
+        """Offset of the stride point at or before the first entry with timestamp >= start."""
+        if start is None or not self.offsets:
+            return 0
+        stamps = [ts for _, ts in self.offsets]
+        return self.offsets[max(bisect_left(stamps, start) - 1, 0)][0]
+
+    def tail_offset(self, n):
+        """(offset, entries to skip) to read the last n entries."""
+        first = max(self.count - n, 0)
+        point = first // self.stride
+        if point >= len(self.offsets):
+            return self.size, 0
+        return self.offsets[point][0], first - point * self.stride
+
+    # --- Compression ---
+
+    def compress(self, codec):
+        """
+        Rewrites a sealed segment as independently compressed blocks, one per
+        stride, then drops the uncompressed file. Crash-safe: the raw segment
+        stays authoritative until the sidecar records the block table.
+        """
+        if not self.sealed or self.codec:
+            return
+        encode = CODECS[codec][0]
+        bounds = [offset for offset, _ in self.offsets] + [self.size]
+        blocks, position = [], 0
+        tmp_path = f"{self.compressed_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(self.path, "rb") as src, open(tmp_path, "wb") as dst:
+            for start, stop in zip(bounds, bounds[1:]):
+                src.seek(start)
+                block = encode(src.read(stop - start))
+                dst.write(block)
+                blocks.append((position, len(block)))
+                position += len(block)
+            dst.flush()
+            os.fsync(dst.fileno())
+        os.replace(tmp_path, self.compressed_path)
+        # Block table before codec: a concurrent reader never sees a codec without blocks
+        self.blocks = blocks
+        self.codec = codec
+        self.save()
+        os.remove(self.path)
+
+    # --- Reading ---
+
+    def _read_blocks(self, offset):
+        # Decompresses the blocks from the one holding `offset` onwards, lazily
+        decode = CODECS[self.codec][1]
+        bounds = [start for start, _ in self.offsets]
+        block = bisect_right(bounds, offset) - 1
+        skip = offset - bounds[block]
+        with open(self.compressed_path, "rb") as f:
+            for start, length in self.blocks[block:]:
+                f.seek(start)
+                data = decode(f.read(length))
+                for line in data[skip:].splitlines(keepends=True):
+                    yield line
+                skip = 0
+
+    def tail_lines(self, n):
+        """
+        The last n complete lines, oldest first. An uncompressed segment is
+        walked backwards with rfind over an mmap, touching only the tail pages;
+        a compressed one decodes only its last blocks.
+        """
+        if n <= 0 or not self.count:
+            return []
+        if self.codec:
+            offset, skip = self.tail_offset(n)
+            return list(self.read_lines(offset))[skip:]
+        lines = []
+        with open(self.path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as view:
+            # The indexed size always ends right after a newline
+            end = self.size
+            while len(lines) < n and end > 0:
+                start = view.rfind(b"\n", 0, end - 1) + 1
+                if view[start:end].strip():
+                    lines.append(view[start:end])
+                end = start
+        lines.reverse()
+        return lines
+
+    def read_lines(self, offset=0):
+        """Complete lines from `offset` up to the indexed size."""
+        if offset >= self.size:
+            return
+        if self.codec:
+            for line in self._read_blocks(offset):
+                if line.strip():
+                    yield line
+            return
+        with open(self.path, "rb") as f:
+            f.seek(offset)
+            remaining = self.size - offset
+            for line in f:
+                if remaining <= 0:
+                    break
+                remaining -= len(line)
+                if line.strip():
+                    yield line
@@ -1,21 +1,60 @@
+import itertools
+import math
 import time
+from bisect import bisect_left, bisect_right, insort
 from typing import List, Dict, Any, Tuple
 
+PROTECTED_TAIL = 2      # latest entries that are never pruned
+RECENCY_FLOOR = 0.5     # recency weight of the oldest entry
+
 class ShortTermMemory:
     """
     Manages the active context window for the Persona.
     Uses Saliency Scoring to prune noise instead of simple FIFO.
+
+    The position-independent part of each score (intensity x state weight) is
+    computed once on insert and kept in a sorted salience index. Recency is
+    linear in the position and never below RECENCY_FLOOR, so pruning walks the
+    index from the least salient entry up and stops as soon as no remaining
+    entry can beat the best score found: it scores only entries whose weight
+    is below 1 / RECENCY_FLOOR times the least salient one.
+
+    This is not O(log n): a score depends on the entry's current position,
+    which every removal shifts, so no static key orders the victims. When all
+    weights lie within that 2x band (affect drifting slowly) every candidate
+    is visited, O(n log n) with one bisect each. Inserts and removals are list
+    memmoves, O(n) but cheap at context-window sizes.
     """
     def __init__(self, max_entries=10):
         self.max_entries = max_entries
         self.entries = []
 
+    @property
+    def entries(self) -> List[Dict[str, Any]]:
+        return self._entries
+
+    @entries.setter
+    def entries(self, entries):
+        # Restored from a snapshot: rebuild the index
+        self._entries = []
+        self._seqs = []         # insertion sequence per position, ascending
+        self._index = []        # sorted (weight, seq)
+        self._counter = itertools.count()
+        for entry in entries:
+            self._insert(entry)
+
+    def _insert(self, entry: Dict[str, Any]):
+        seq = next(self._counter)
+        self._entries.append(entry)
+        self._seqs.append(seq)
+        insort(self._index, (self._weight(entry), seq))
+
     def add(self, entry: Dict[str, Any]) -> List[str]:
         """
         Adds a new memory entry. Prunes if limit exceeded.
         Returns a list of reason codes related to pruning.
         """
-        self.entries.append(entry)
+        self._insert(entry)
         reason_codes = []
         
         if len(self.entries) > self.max_entries:
@@ -24,11 +63,9 @@ class ShortTermMemory:
             
         return reason_codes
 
-    def _score_entry(self, entry: Dict[str, Any], index: int, total: int) -> float:
-        """
-        Heuristic Saliency Scoring.
-        Score = Intensity * StateWeight * Recency
-        """
+    @staticmethod
+    def _weight(entry: Dict[str, Any]) -> float:
+        """Position-independent factor of the saliency score: Intensity * StateWeight."""
         # Affect intensity
         affect = entry.get('affect', {'p': 0, 'a': 0, 'd': 0})
         intensity = abs(affect.get('p', 0)) + abs(affect.get('a', 0)) + abs(affect.get('d', 0))
@@ -36,33 +73,53 @@ class ShortTermMemory:
         # State importance (Transitions or high-risk states)
         state = entry.get('state', 'STABLE')
         state_weight = 1.5 if state in ['LOCKED', 'DRIFTING', 'FORMING'] else 1.0
-        
+        return (intensity + 0.1) * state_weight
+
+    def _score_entry(self, entry: Dict[str, Any], index: int, total: int) -> float:
+        """
+        Heuristic Saliency Scoring.
+        Score = Intensity * StateWeight * Recency
+        """
         # Recency (Linear weight from 0.5 to 1.0)
         recency = 0.5 + (0.5 * (index / total)) if total > 1 else 1.0
         
-        return (intensity + 0.1) * state_weight * recency
+        return self._weight(entry) * recency
 
     def _prune(self) -> Tuple[int, str]:
         """
         Finds the least 'salient' entry and removes it.
         We protect the latest 2 entries from pruning to ensure immediate conversational flow.
+        Same choice as scoring every candidate (lowest score, earliest on ties).
         """
-        if len(self.entries) <= 2:
+        if len(self.entries) <= PROTECTED_TAIL:
             # Should not happen if max_entries > 2
             return -1, "BUFFER_TOO_SMALL"
             
-        # Candidates for pruning: all except the last 2
-        candidates_end_idx = len(self.entries) - 2
-        candidates = self.entries[:candidates_end_idx]
-        
-        scores = [self._score_entry(e, i, len(self.entries)) for i, e in enumerate(candidates)]
-        
-        # Find index of minimum score
-        min_score_idx = scores.index(min(scores))
-        
+        total = len(self._entries)
+        candidates_end_idx = total - PROTECTED_TAIL
+        index, seqs = self._index, self._seqs
+        best = best_idx = best_rank = None
+        rank = 0
+        while rank < len(index):
+            weight, seq = index[rank]
+            # weight * RECENCY_FLOOR bounds this and every later score from below
+            if best is not None and weight * RECENCY_FLOOR > best:
+                break
+            idx = bisect_left(seqs, seq)
+            if idx >= candidates_end_idx:
+                rank += 1
+                continue
+            score = weight * (0.5 + (0.5 * (idx / total)))
+            if best is None or score < best or (score == best and idx < best_idx):
+                best, best_idx, best_rank = score, idx, rank
+            # Equal weights sort by age, so the rest of this group scores higher
+            rank = bisect_right(index, (weight, math.inf), rank)
+
         # Remove and return info
-        self.entries.pop(min_score_idx)
-        return min_score_idx, "LOW_SALIENCE"
+        del self._index[best_rank]
+        del self._seqs[best_idx]
+        self._entries.pop(best_idx)
+        return best_idx, "LOW_SALIENCE"
 
     def get_summary(self) -> List[Dict[str, Any]]:
         """Returns the current prioritized memory entries."""
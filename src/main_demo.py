@@ -1,9 +1,8 @@
 import json
 import os
-import sys
 import time
-from src.utils.paths import resolve_resource
-sys.path.append(str(resolve_resource("gecce_kernel_pkg")))
+from src.utils.paths import ensure_kernel_path
+ensure_kernel_path()
 
 from src.app_integration import PersonaService
 from gecce_kernel.core.types import EventType
@@ -1,33 +1,62 @@
+import os
 import sys
 import argparse
 import json
 import uuid
-from src.app_integration import PersonaService
+from src import config
 
 def main():
     parser = argparse.ArgumentParser(description="Persona Engine: Context Compiler CLI")
-    parser.add_argument("user_input", help="The raw user input string")
-    parser.add_argument("--format", choices=["text", "json"], default="text", 
+    parser.add_argument("user_input", nargs="?", help="The raw user input string")
+    parser.add_argument("--format", choices=["text", "json"], default="text",
                         help="Output format (default: text). Use 'json' for full metadata.")
-    parser.add_argument("--session-id", default=f"user_{uuid.uuid4().hex[:8]}", 
+    parser.add_argument("--session-id", default=f"user_{uuid.uuid4().hex[:8]}",
                         help="Session ID for stability and history")
-    parser.add_argument("--persona-id", default="pioneer_v2", 
+    parser.add_argument("--persona-id", default="pioneer_v2",
                         help="Persona ID to use (default: pioneer_v2)")
-    parser.add_argument("--trace", action="store_true", 
+    parser.add_argument("--trace", action="store_true",
                         help="Enable detailed trace output to stderr")
     parser.add_argument("--seed", type=int, help="Optional manual seed for reproducibility")
     parser.add_argument("--genome", help="Path to a specific genome file")
+    parser.add_argument("--profile", help="Pipeline profile (default: picked from the scene)")
+    parser.add_argument("--socket", nargs="?", const=config.DAEMON_SOCKET_PATH,
+                        help=f"Send the request to a running persona daemon (default socket: {config.DAEMON_SOCKET_PATH})")
+    parser.add_argument("--serve", action="store_true",
+                        help="Run the persona daemon on --socket instead of compiling a prompt")
 
     args = parser.parse_args()
 
+    if args.serve:
+        from src.persona_daemon import PersonaDaemon
+        try:
+            PersonaDaemon(socket_path=args.socket).serve()
+        except Exception as e:
+            sys.stderr.write(f"❌ Persona Daemon Error: {str(e)}\n")
+            sys.exit(1)
+        return
+
+    if args.user_input is None:
+        parser.error("user_input is required unless --serve is given")
+
     try:
-        service = PersonaService(genome_path=args.genome, persona_id=args.persona_id)
-        
-        # In a real implementation, we would pass args.seed to SeededSampler 
-        # via PersonaService. For now, session_id handles it.
-        
-        payload = service.get_llm_payload(args.user_input, session_id=args.session_id, manual_seed=args.seed)
-        
+        if args.socket:
+            # Client mode: the warm daemon runs the cycle, nothing heavy is imported here
+            from src.persona_client import request
+            payload = request(args.socket, {
+                "user_input": args.user_input,
+                "session_id": args.session_id,
+                "persona_id": args.persona_id,
+                # The daemon may run from another working directory
+                "genome": os.path.abspath(args.genome) if args.genome else None,
+                "seed": args.seed,
+                "profile": args.profile
+            })
+        else:
+            from src.app_integration import PersonaService
+            service = PersonaService(genome_path=args.genome, persona_id=args.persona_id)
+            payload = service.get_llm_payload(args.user_input, session_id=args.session_id, manual_seed=args.seed,
+                                              profile=args.profile)
+
         if args.trace:
             sys.stderr.write(f"--- Persona Engine CLI Trace ---\n")
             sys.stderr.write(f"Session: {args.session_id}\n")
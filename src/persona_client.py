@@ -0,0 +1,32 @@
+"""
+Thin client for the persona daemon (src/persona_daemon.py).
+Deliberately imports nothing from the engine itself, so a per-message CLI call
+only pays for a socket round-trip instead of building a PersonaService.
+"""
+import json
+import socket
+
+class DaemonError(RuntimeError):
+    """Raised when the daemon is unreachable or reports a failed request."""
+
+def request(socket_path, message, timeout=30.0):
+    """
+    Sends one JSON request to the daemon and returns its decoded payload.
+    The wire format is one JSON object per line in each direction.
+    """
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(timeout)
+            sock.connect(socket_path)
+            sock.sendall(json.dumps(message, ensure_ascii=False).encode("utf-8") + b"\n")
+            with sock.makefile("rb") as stream:
+                line = stream.readline()
+    except OSError as e:
+        raise DaemonError(f"Persona daemon unavailable at {socket_path}: {e}") from e
+
+    if not line:
+        raise DaemonError("Persona daemon closed the connection without a response.")
+    response = json.loads(line)
+    if not response.get("ok"):
+        raise DaemonError(response.get("error", "Unknown daemon error"))
+    return response.get("payload")
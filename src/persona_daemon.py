@@ -0,0 +1,196 @@
+"""
+Persona daemon: keeps warm PersonaService instances behind a Unix domain socket.
+Start it with `python -m src.persona_cli --serve` and point per-message callers
+at it with `python -m src.persona_cli "..." --socket`.
+"""
+import hashlib
+import json
+import os
+import socket
+import socketserver
+import sys
+import threading
+
+from src import config
+from src.utils.paths import get_project_root
+
+def _interrupt(signum, frame):
+    raise KeyboardInterrupt
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        # One JSON request per line; a connection may carry several
+        for line in self.rfile:
+            if not line.strip():
+                continue
+            try:
+                response = {"ok": True, "payload": self.server.persona_daemon.dispatch(json.loads(line))}
+            except Exception as e:
+                response = {"ok": False, "error": str(e)}
+            self.wfile.write(json.dumps(response, ensure_ascii=False).encode("utf-8") + b"\n")
+            self.wfile.flush()
+
+class _DaemonServer(socketserver.ThreadingUnixStreamServer):
+    # One thread per connection: an idle or slow client never holds up the
+    # others, and open connections do not keep the process alive on shutdown
+    daemon_threads = True
+
+    def __init__(self, *args, **kwargs):
+        self._requests = set()              # open connections
+        self._idle = threading.Condition()
+        super().__init__(*args, **kwargs)
+
+    def process_request(self, request, client_address):
+        with self._idle:
+            self._requests.add(request)
+        super().process_request(request, client_address)
+
+    def shutdown_request(self, request):
+        # Called once a connection's handler is done (or it was refused)
+        super().shutdown_request(request)
+        with self._idle:
+            self._requests.discard(request)
+            self._idle.notify_all()
+
+    def drain(self, timeout=None):
+        """
+        Ends every open connection after the request it is serving (its
+        reads see end-of-file) and waits for the handlers to finish.
+        """
+        with self._idle:
+            for request in self._requests:
+                try:
+                    request.shutdown(socket.SHUT_RD)
+                except OSError:
+                    pass  # already gone
+            return self._idle.wait_for(lambda: not self._requests, timeout)
+
+class PersonaDaemon:
+    """
+    Long-running host for PersonaService instances, one per (persona_id, genome).
+    Services are built on first use and then reused, so a request only pays for
+    the cognitive cycle itself. Connections are served concurrently; sessions
+    serialize their own cycles (see SessionState.lock).
+    """
+    def __init__(self, socket_path=None, session_dir=None, journal_path=None):
+        self.socket_path = socket_path or config.DAEMON_SOCKET_PATH
+        self.session_dir = session_dir or config.SESSION_HIBERNATE_DIR
+        self.journal_path = journal_path  # None: config.JOURNAL_PATH
+        self.services = {}
+        self._services_lock = threading.Lock()
+        self.server = None
+        self._serving = False
+
+    def get_service(self, persona_id=None, genome_path=None):
+        from src.app_integration import PersonaService
+
+        persona_id = persona_id or config.DEFAULT_PERSONA_ID
+        key = (persona_id, genome_path)
+        # Built under the lock: concurrent first requests share one service
+        with self._services_lock:
+            service = self.services.get(key)
+            if service is None:
+                # Separate hibernation directories so services never read each other's sessions
+                slug = hashlib.sha1(repr(key).encode("utf-8")).hexdigest()[:12]
+                service = PersonaService(
+                    genome_path=genome_path,
+                    persona_id=persona_id,
+                    session_dir=os.path.join(self.session_dir, f"{persona_id}_{slug}"),
+                    journal_path=self.journal_path
+                )
+                self.services[key] = service
+        return service
+
+    def dispatch(self, message):
+        op = message.get("op", "payload")
+        if op == "ping":
+            return {"services": len(self.services), "pid": os.getpid()}
+        if op != "payload":
+            raise ValueError(f"Unknown op '{op}'")
+
+        service = self.get_service(message.get("persona_id"), self._genome_path(message.get("genome")))
+        return service.get_llm_payload(
+            message["user_input"],
+            session_id=message.get("session_id", config.DEFAULT_SESSION_ID),
+            manual_seed=message.get("seed"),
+            profile=message.get("profile")
+        )
+
+    @staticmethod
+    def _genome_path(genome):
+        # Any local user may reach the socket: clients only name genomes under the project root
+        if genome is None:
+            return None
+        root = os.path.realpath(get_project_root())
+        path = os.path.realpath(os.path.join(root, genome))
+        if os.path.commonpath([root, path]) != root:
+            raise ValueError(f"Genome '{genome}' is outside {root}")
+        return path
+
+    def _claim_socket(self):
+        if not os.path.exists(self.socket_path):
+            return
+        # A live daemon answers; a stale socket file is left behind by a crash
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as probe:
+            try:
+                probe.connect(self.socket_path)
+            except OSError:
+                os.remove(self.socket_path)
+                return
+        raise RuntimeError(f"A persona daemon is already listening on {self.socket_path}")
+
+    def start(self):
+        """Binds the socket. Call serve_forever() (or serve()) to handle requests."""
+        self._claim_socket()
+        self.server = _DaemonServer(self.socket_path, _RequestHandler)
+        # Owner only: requests run cycles on the owner's sessions
+        os.chmod(self.socket_path, 0o600)
+        self.server.persona_daemon = self
+        return self
+
+    def serve_forever(self):
+        self._serving = True
+        try:
+            self.server.serve_forever()
+        finally:
+            self._serving = False
+
+    def shutdown(self):
+        """Stops a serve_forever() running in another thread."""
+        if self.server and self._serving:
+            self.server.shutdown()
+
+    def close(self):
+        """
+        Stops accepting connections, lets the open ones finish the request they
+        are serving, then hibernates every warm session, flushes the journals
+        and removes the socket.
+        """
+        if self.server:
+            self.shutdown()
+            if not self.server.drain(config.DAEMON_DRAIN_TIMEOUT_S):
+                sys.stderr.write("⚠️  Persona daemon: requests still running at shutdown\n")
+        for service in self.services.values():
+            service.sessions.hibernate_all()
+            service.close()
+        if self.server:
+            self.server.server_close()
+            self.server = None
+        if os.path.exists(self.socket_path):
+            os.remove(self.socket_path)
+
+    def serve(self):
+        """Blocking entry point used by `persona_cli --serve`."""
+        import signal
+
+        self.start()
+        # SIGTERM takes the same clean path as Ctrl-C
+        signal.signal(signal.SIGTERM, _interrupt)
+        sys.stderr.write(f"🛰️  Persona daemon listening on {self.socket_path}\n")
+        try:
+            self.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.close()
+            sys.stderr.write("🛰️  Persona daemon stopped.\n")
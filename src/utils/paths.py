@@ -1,5 +1,6 @@
 from pathlib import Path
 import os
+import sys
 
 def get_project_root() -> Path:
     """
@@ -19,3 +20,13 @@ def ensure_dir(path: Path):
     Ensures a directory exists.
     """
     path.mkdir(parents=True, exist_ok=True)
+
+def ensure_kernel_path() -> None:
+    """
+    Makes the vendored gecce_kernel package importable.
+    Idempotent; called lazily by the code paths that actually need the kernel,
+    so plain PersonaService use never pays for importing it.
+    """
+    kernel_root = str(resolve_resource("gecce_kernel_pkg"))
+    if kernel_root not in sys.path:
+        sys.path.append(kernel_root)
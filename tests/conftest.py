@@ -0,0 +1,9 @@
+import pytest
+from src import config
+
+@pytest.fixture(autouse=True)
+def temporary_outputs(tmp_path, monkeypatch):
+    """Journals, snapshots and hibernated sessions at their default paths go under tmp_path, not the repo."""
+    monkeypatch.setattr(config, "JOURNAL_PATH", str(tmp_path / "logs" / "persona_journal.jsonl"))
+    monkeypatch.setattr(config, "SNAPSHOT_DIR", str(tmp_path / "snapshots"))
+    monkeypatch.setattr(config, "SESSION_HIBERNATE_DIR", str(tmp_path / "sessions"))
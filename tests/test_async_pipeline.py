@@ -0,0 +1,99 @@
+import unittest
+import asyncio
+import os
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from src.app_integration import PersonaService
+from src.l0_orchestrator.sessions import SessionLock
+
+class TestAsyncPipeline(unittest.TestCase):
+    """
+    run_cycle_async must match run_cycle and multiplex cycles on one loop.
+    """
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.sync_service = PersonaService(session_dir=os.path.join(self.tmp.name, "a"),
+                                           journal_path=os.path.join(self.tmp.name, "a.jsonl"))
+        self.async_service = PersonaService(session_dir=os.path.join(self.tmp.name, "b"),
+                                            journal_path=os.path.join(self.tmp.name, "b.jsonl"))
+        # Services close before the directory goes
+        self.addCleanup(self.sync_service.close)
+        self.addCleanup(self.async_service.close)
+
+    def test_async_matches_sync(self):
+        inputs = ["Calculate 2+2", "I feel lonely", "Tell me a story"]
+        for text in inputs:
+            expected = self.sync_service.get_llm_payload(text, session_id="s", manual_seed=7)
+            actual = asyncio.run(self.async_service.get_llm_payload_async(text, session_id="s", manual_seed=7))
+            self.assertEqual(actual['messages'], expected['messages'])
+            self.assertEqual(actual['metadata']['reason_codes'], expected['metadata']['reason_codes'])
+            self.assertEqual(actual['metadata']['mode'], expected['metadata']['mode'])
+
+    def test_many_cycles_on_one_loop(self):
+        async def drive():
+            return await asyncio.gather(*[
+                self.async_service.get_llm_payload_async(f"Hello number {i}", session_id=f"user_{i % 5}")
+                for i in range(40)
+            ])
+
+        payloads = asyncio.run(drive())
+        self.assertEqual(len(payloads), 40)
+        for i, payload in enumerate(payloads):
+            self.assertEqual(payload['metadata']['session_id'], f"user_{i % 5}")
+        for i in range(5):
+            self.assertEqual(len(self.async_service.sessions.get(f"user_{i}").stm.entries), 8)
+
+        insights = self.async_service.journal.get_recent_insights(limit=40)
+        self.assertEqual(len(insights), 40)
+
+    def test_cancelled_wait_releases_the_session_lock(self):
+        lock = SessionLock()
+        lock.acquire()
+
+        async def drive():
+            waiter = asyncio.ensure_future(lock.acquire_async())
+            second = asyncio.ensure_future(lock.acquire_async())
+            await asyncio.sleep(0.01)
+            self.assertFalse(waiter.done())
+            waiter.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await waiter
+            # Handed over while its task is cancelled: the lock moves on to the next waiter
+            third = asyncio.ensure_future(lock.acquire_async())
+            await asyncio.sleep(0)
+            lock.release()
+            third.cancel()
+            await second
+            with self.assertRaises(asyncio.CancelledError):
+                await third
+            self.assertTrue(lock.locked())
+            lock.release()
+            return lock.acquire(blocking=False)
+
+        self.assertTrue(asyncio.run(drive()))
+
+    def test_waiting_cycles_hold_no_thread(self):
+        session = self.async_service.sessions.get("busy")
+        session.lock.acquire()
+
+        async def drive():
+            # One executor thread, still free for offloaded I/O while 20 cycles wait
+            asyncio.get_running_loop().set_default_executor(ThreadPoolExecutor(max_workers=1))
+            cycles = [asyncio.ensure_future(self.async_service.get_llm_payload_async(f"Hello {i}", session_id="busy"))
+                      for i in range(20)]
+            await asyncio.sleep(0.01)
+            self.assertEqual(await asyncio.wait_for(asyncio.to_thread(lambda: "io"), 1), "io")
+            self.assertFalse(any(cycle.done() for cycle in cycles))
+            # Released from another thread, e.g. a synchronous cycle
+            threading.Thread(target=session.lock.release).start()
+            return await asyncio.wait_for(asyncio.gather(*cycles), 10)
+
+        payloads = asyncio.run(drive())
+        self.assertEqual(len(payloads), 20)
+        self.assertFalse(session.lock.locked())
+        self.assertEqual(len(session.stm.entries), min(20, session.stm.max_entries))
+
+if __name__ == '__main__':
+    unittest.main()
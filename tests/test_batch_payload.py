@@ -0,0 +1,140 @@
+import unittest
+import json
+import os
+import tempfile
+from types import SimpleNamespace
+from src.app_integration import PersonaService
+from src.l0_orchestrator.pipeline import BatchEventBuffer, PipelineContext
+
+INPUTS = [
+    ("Calculate the square root of 256", "alice"),
+    ("I feel lonely today", "bob"),
+    ("Tell me a story about robots", "alice"),
+    ("Thanks, that helps", "carol"),
+    ("Prove that 2+2=4", "bob"),
+    ("What a weird dream I had", "alice"),
+    ("Hello there", "dave"),
+]
+
+class RecordingBus:
+    def __init__(self):
+        self.events = []
+
+    def publish(self, event):
+        self.events.append(event)
+
+def comparable(artifact):
+    metadata = dict(artifact['metadata'])
+    metadata.pop('trace_id')
+    return artifact['messages'], metadata
+
+class TestBatchPayload(unittest.TestCase):
+    """
+    get_llm_payload_batch must equal N sequential get_llm_payload calls.
+    """
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def make_service(self, name, **kwargs):
+        service = PersonaService(session_dir=os.path.join(self.tmp.name, name),
+                                 journal_path=os.path.join(self.tmp.name, f"{name}.jsonl"), **kwargs)
+        self.addCleanup(service.close)  # before the directory goes
+        return service
+
+    def test_batch_matches_sequential(self):
+        sequential = self.make_service("seq")
+        batched = self.make_service("batch")
+        seeds = [11, None, 13, None, 15, 16, None]
+
+        expected = [
+            sequential.get_llm_payload(text, session_id=sid, manual_seed=seed)
+            for (text, sid), seed in zip(INPUTS, seeds)
+        ]
+        actual = batched.get_llm_payload_batch(
+            [text for text, _ in INPUTS],
+            session_id=[sid for _, sid in INPUTS],
+            manual_seed=seeds
+        )
+
+        self.assertEqual(len(actual), len(expected))
+        for got, want in zip(actual, expected):
+            self.assertEqual(comparable(got), comparable(want))
+        self.assertEqual(len({a['metadata']['trace_id'] for a in actual}), len(actual))
+
+        for sid in ("alice", "bob", "carol", "dave"):
+            self.assertEqual(
+                batched.sessions.get(sid).fsm.affect.get_affect(),
+                sequential.sessions.get(sid).fsm.affect.get_affect()
+            )
+            self.assertEqual(
+                [e['user_input'] for e in batched.sessions.get(sid).stm.entries],
+                [e['user_input'] for e in sequential.sessions.get(sid).stm.entries]
+            )
+
+    def test_batch_survives_small_pool(self):
+        service = self.make_service("small", max_sessions=2)
+        artifacts = service.get_llm_payload_batch(
+            [text for text, _ in INPUTS], session_id=[sid for _, sid in INPUTS]
+        )
+        self.assertEqual(len(artifacts), len(INPUTS))
+        self.assertLessEqual(len(service.sessions), 2)
+        self.assertEqual(len(service.sessions.get("alice").stm.entries), 3)
+
+    def test_single_session_and_validation(self):
+        service = self.make_service("single")
+        artifacts = service.get_llm_payload_batch(["Hello", "Calculate 1+1"], manual_seed=3)
+        self.assertEqual(artifacts[1]['metadata']['mode'], "STYLE_ONLY")
+        with self.assertRaises(ValueError):
+            service.get_llm_payload_batch(["a", "b"], session_id=["only_one"])
+
+    def test_journal_and_events_keep_input_order(self):
+        # Mixed profiles and repeated sessions: several waves, several profile groups
+        results = {}
+        for mode in ("seq", "batch"):
+            service = self.make_service(mode)
+            service.kernel = SimpleNamespace(bus=RecordingBus())
+            if mode == "seq":
+                contexts = [service.director.run_cycle(text, session_id=sid, manual_seed=5) for text, sid in INPUTS]
+            else:
+                contexts = service.director.run_batch([text for text, _ in INPUTS], [sid for _, sid in INPUTS],
+                                                      [5] * len(INPUTS))
+            service.journal.flush()
+            rank = {context.trace_id: row for row, context in enumerate(contexts)}
+            results[mode] = (
+                [entry["context_shorthand"] for entry in service.journal.read_range()],
+                [(rank[event.metadata["trace_id"]], event.source, event.event_type)
+                 for event in service.kernel.bus.events],
+            )
+        self.assertEqual(results["batch"][0], [text for text, _ in INPUTS])
+        self.assertEqual(results["batch"], results["seq"])
+
+    def test_failed_pin_releases_the_wave(self):
+        service = self.make_service("broken")
+        os.makedirs(service.sessions.hibernate_dir, exist_ok=True)
+        with open(service.sessions._path_for("corrupt"), "w", encoding="utf-8") as f:
+            f.write("{not json")
+        with self.assertRaises(json.JSONDecodeError):
+            service.get_llm_payload_batch(["Hello", "Hi", "Hello again"], session_id=["alice", "corrupt", "bob"])
+        self.assertEqual(service.sessions._pins, {})
+        self.assertFalse(service.sessions.get("alice").lock.locked())
+        # Later waves measure their own latency
+        contexts = service.director.run_batch(["a", "b"], ["carol", "carol"], [1, 1])
+        self.assertLess(contexts[0].start_time, contexts[1].start_time)
+
+    def test_events_are_published_per_cycle(self):
+        bus = RecordingBus()
+        buffer = BatchEventBuffer(bus)
+        contexts = [PipelineContext(session_id=f"s{i}") for i in range(3)]
+        for i, context in enumerate(contexts):
+            buffer.record("L0_ScenarioAnalysis", "scene_analyzed", {"row": i}, context)
+        self.assertEqual(bus.events, [])
+        buffer.flush()
+
+        # The same events (data and metadata) as three sequential cycles
+        self.assertEqual([event.data for event in bus.events], [{"row": 0}, {"row": 1}, {"row": 2}])
+        self.assertEqual([event.metadata for event in bus.events], [{"trace_id": c.trace_id} for c in contexts])
+        self.assertEqual([c.event_refs for c in contexts], [[event.event_id] for event in bus.events])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,55 @@
+import unittest
+import os
+import subprocess
+import sys
+import tempfile
+from src.utils.paths import get_project_root
+
+def loaded_modules(script):
+    """Runs script in a fresh interpreter and returns the top-level packages it loaded."""
+    probe = script + "\nimport sys\nprint(' '.join(sorted({m.split('.')[0] for m in sys.modules})))"
+    result = subprocess.run([sys.executable, "-c", probe], cwd=str(get_project_root()),
+                            capture_output=True, text=True, check=True)
+    return set(result.stdout.split())
+
+class TestColdStart(unittest.TestCase):
+    """
+    The persona runtime must not drag in the kernel stack it does not use.
+    """
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.journal_path = os.path.join(self.tmp.name, "journal.jsonl")
+
+    def test_plain_service_skips_kernel(self):
+        modules = loaded_modules(
+            "from src.app_integration import PersonaService\n"
+            f"PersonaService(journal_path={self.journal_path!r}).get_llm_payload('Hello', session_id='cold')"
+        )
+        for heavy in ("pandas", "pydantic", "loguru", "gecce_kernel", "asyncio"):
+            self.assertNotIn(heavy, modules)
+
+    def test_kernel_service_skips_pandas(self):
+        modules = loaded_modules(
+            "from src.app_integration import PersonaService\n"
+            f"s = PersonaService(use_kernel=True, journal_path={self.journal_path!r})\n"
+            "s.get_llm_payload('Calculate 1+1', session_id='cold')\n"
+            "s.kernel.stop()"
+        )
+        self.assertIn("gecce_kernel", modules)
+        self.assertNotIn("pandas", modules)
+
+    def test_persona_base_module(self):
+        from src.kernel_integration import ModuleContext, ModuleResult, PersonaBaseModule
+
+        class Echo(PersonaBaseModule):
+            def process(self, context):
+                return ModuleResult(metrics={"echo": context.data})
+
+        result = Echo(bus=None).execute(ModuleContext(data="hi"))
+        self.assertTrue(result.success)
+        self.assertEqual(result.metrics, {"echo": "hi"})
+        self.assertEqual(result.metadata["module"], "Echo")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,85 @@
+import unittest
+import json
+import random
+import numpy as np
+from src.utils.paths import resolve_resource
+from src.l2_genome.compiled import CompiledGenome
+from src.l2_genome.archetypes import ArchetypeManager
+from src.l3_expression.projection import SeededSampler
+
+def synthetic_genome(n_loci, seed=0):
+    rng = random.Random(seed)
+    loci = []
+    for i in range(n_loci):
+        if rng.random() < 0.7:
+            lo = round(rng.uniform(0.0, 0.5), 2)
+            hi = round(rng.uniform(lo, 1.0), 2)
+            dist = {"type": "range", "values": {"min": lo, "max": hi, "default": round(rng.uniform(lo, hi), 2)}}
+        else:
+            k = rng.randint(1, 5)
+            dist = {"type": "categorical", "values": {f"c{j}": round(rng.uniform(0.05, 1.0), 2) for j in range(k)}}
+        loci.append({"id": f"locus_{i}", "category": "style", "distribution": dist, "variability": rng.random()})
+    return {"version": "1.0.0", "loci": loci}
+
+class TestCompiledGenome(unittest.TestCase):
+    """
+    The batch sampler must reproduce per-locus sample_trait output exactly.
+    """
+    def setUp(self):
+        with open(resolve_resource("src/l2_genome/sample_genome.json"), "r") as f:
+            self.genome = json.load(f)
+        self.sampler = SeededSampler()
+
+    def assert_equivalent(self, genome, trials=50):
+        compiled = CompiledGenome(genome)
+        rng = random.Random(1)
+        for t in range(trials):
+            seed = rng.randrange(2**32)
+            influence = rng.choice([0.0, 0.1, 0.5, 1.0])
+            warp = {"variability_warp": 1.0 + rng.random() * 0.5, "bias_warp": rng.uniform(-0.2, 0.2)}
+            expected = {
+                locus['id']: self.sampler.sample_trait(locus, "s", influence=influence, affect_warp=warp,
+                                                       manual_seed=seed, locus_index=i)
+                for i, locus in enumerate(genome['loci'])
+            }
+            actual = self.sampler.sample_genome(compiled, "s", influence=influence, affect_warp=warp, manual_seed=seed)
+            self.assertEqual(list(actual.items()), list(expected.items()))
+
+    def test_sample_genome_matches_sample_trait(self):
+        self.assert_equivalent(self.genome)
+
+    def test_stance_genomes(self):
+        mgr = ArchetypeManager(self.genome)
+        for stance in [(0.9, 0.2, 0.1), (0.3, 0.9, 0.4), (0.0, 0.0, 1.0)]:
+            self.assert_equivalent(mgr.calculate_genome_from_stance(*stance), trials=20)
+
+    def test_stance_overlay_matches_stance_genome(self):
+        mgr = ArchetypeManager(self.genome)
+        base = CompiledGenome(self.genome)
+        rng = np.random.default_rng(3)
+        for stance in [(0.9, 0.2, 0.1), (0.3, 0.9, 0.4), (0.0, 0.0, 1.0)]:
+            view = base.with_overlay(mgr.stance_overlay(*stance))
+            expected = CompiledGenome(mgr.calculate_genome_from_stance(*stance))
+            for _ in range(20):
+                u = rng.random(base.size)
+                self.assertEqual(list(view.sample(u, 0.7).items()), list(expected.sample(u, 0.7).items()))
+            self.assertEqual(view.modal(), expected.modal())
+            self.assertEqual(view.genome, expected.genome)
+            # Untouched arrays are shared with the base, not copied
+            self.assertIs(view.range_min, base.range_min)
+            self.assertNotEqual(view.fingerprint, base.fingerprint)
+
+    def test_large_synthetic_genome(self):
+        genome = synthetic_genome(500)
+        compiled = CompiledGenome(genome)
+        self.assertEqual(compiled.size, 500)
+        self.assert_equivalent(genome, trials=10)
+
+    def test_values_are_plain_python(self):
+        projection = self.sampler.sample_genome(CompiledGenome(self.genome), "session_42")
+        json.dumps(projection)
+        self.assertIs(type(projection['explanation_depth']), float)
+        self.assertIs(type(projection['conflict_strategy']), str)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,93 @@
+import unittest
+import json
+import os
+import shutil
+import tempfile
+import time
+from src import config
+from src.app_integration import PersonaService
+from src.l0_orchestrator.hot_reload import RuntimeWatcher
+
+def rewrite(path, old, new):
+    with open(path, "r", encoding="utf-8") as f:
+        text = f.read()
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(text.replace(old, new))
+    # Coarse filesystem clocks: make sure the change is visible to the poller
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+class TestHotReload(unittest.TestCase):
+    """
+    Edited keywords, presets and prompt tables are swapped into a running service.
+    """
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.service = PersonaService(session_dir=os.path.join(self.tmp.name, "sessions"),
+                                      journal_path=os.path.join(self.tmp.name, "journal.jsonl"))
+        self.addCleanup(self.service.close)  # before the directory goes
+        # Watch private copies of the source files
+        self.keywords = shutil.copy(config.__file__, os.path.join(self.tmp.name, "config.py"))
+        self.presets = shutil.copy(self.service.archetype_mgr.config_path, os.path.join(self.tmp.name, "presets.json"))
+        self.manifold = shutil.copy(self.service.augmenter.manifold_path, os.path.join(self.tmp.name, "manifold.json"))
+        self.service.keywords_path = self.keywords
+        self.service.archetype_mgr.config_path = self.presets
+        self.service.augmenter.manifold_path = self.manifold
+        self.watcher = RuntimeWatcher(self.service)
+
+    def tearDown(self):
+        self.watcher.stop()
+
+    def scene(self, text, session_id="alice"):
+        return self.service.get_llm_payload(text, session_id=session_id)['metadata']['reason_codes'][0]
+
+    def test_unchanged_sources_do_nothing(self):
+        self.assertEqual(self.watcher.poll(), ())
+
+    def test_keywords_reach_live_sessions(self):
+        self.assertEqual(self.scene("Tell me about bananas"), "SCENE_SOCIAL_CREATIVE")
+        cache = self.service.projection_cache
+        rewrite(self.keywords, 'r"calculate",', 'r"calculate", r"banana",')
+        self.assertEqual(self.watcher.poll(), ("classifier",))
+        self.assertEqual(self.scene("Tell me about bananas"), "SCENE_STRICT_FACT")
+        # Prompt tables did not change, so the projection cache stays warm
+        self.assertIs(self.service.projection_cache, cache)
+
+    def test_prompt_manifold(self):
+        rewrite(self.manifold, "Maintain a serious, professional tone. No jokes.", "Stay strictly formal.")
+        self.assertEqual(self.watcher.poll(), ("prompts",))
+        prompt = self.service.get_llm_payload("Calculate 2+2", session_id="bob")['messages'][0]['content']
+        self.assertIn("Stay strictly formal.", prompt)
+
+    def test_presets_precompile_overlays(self):
+        with open(self.presets, "r") as f:
+            data = json.load(f)
+        data["presets"]["steady_mentor"] = {"rigor": 0.7, "warmth": 0.6, "chaos": 0.15}
+        with open(self.presets, "w") as f:
+            json.dump(data, f)
+        os.utime(self.presets, ns=(0, time.time_ns() + 1_000_000_000))
+        self.assertEqual(self.watcher.poll(), ("presets",))
+        self.assertIn((0.7, 0.6, 0.15), self.service._preset_stance_genomes)
+        self.service.set_stance(preset_name="steady_mentor")
+        self.assertIs(self.service.compiled_genome, self.service.stance_genome(0.7, 0.6, 0.15))
+
+    def test_failed_reload_keeps_current_tables(self):
+        classifier = self.service.classifier
+        rewrite(self.keywords, 'r"calculate",', 'r"calculate", r"(",')
+        self.assertEqual(self.watcher.poll(), ())
+        self.assertIsNotNone(self.watcher.last_error)
+        self.assertIs(self.service.classifier, classifier)
+        self.assertEqual(self.scene("Calculate 2+2"), "SCENE_STRICT_FACT")
+
+    def test_background_thread(self):
+        self.watcher.interval = 0.01
+        self.watcher.start()
+        rewrite(self.keywords, 'r"calculate",', 'r"calculate", r"banana",')
+        deadline = time.time() + 5
+        while self.watcher.reloads == 0 and time.time() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(self.watcher.reloads, 1)
+
+if __name__ == '__main__':
+    unittest.main()
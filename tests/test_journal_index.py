@@ -0,0 +1,128 @@
+import os
+import random
+import sqlite3
+import tempfile
+import threading
+import time
+import unittest
+
+from itertools import islice
+
+from src.l4_memory.journal import PersonaReflectionJournal
+from src.l4_memory.journal_index import entry_row
+
+def status(i, state, p):
+    return {"interaction_count": i, "state": state, "affect": {"p": p, "a": 0.2, "d": -0.1}, "intimacy_level": i % 4}
+
+class TestJournalIndex(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.path = os.path.join(self.tmp.name, "journal.jsonl")
+        self.db = os.path.join(self.tmp.name, "journal.sqlite")
+        rng = random.Random(5)
+        self.records = [status(i, rng.choice(["STABLE", "LOCKED", "DRIFTING"]), round(rng.uniform(-1, 1), 3))
+                        for i in range(300)]
+
+    def make_journal(self, **kwargs):
+        journal = PersonaReflectionJournal(self.path, flush_every=0, flush_interval_ms=0,
+                                           segment_max_bytes=8000, index_stride=16, **kwargs)
+        self.addCleanup(journal.close)
+        return journal
+
+    def test_query_matches_journal_scan(self):
+        journal = self.make_journal(index_path=self.db)
+        for i, record in enumerate(self.records):
+            journal.log_entry(record, user_input=f"turn {i}")
+            if i % 50 == 0:
+                journal.flush()
+
+        with sqlite3.connect(self.db) as conn:
+            self.assertEqual(conn.execute("PRAGMA journal_mode").fetchone()[0], "wal")
+
+        entries = list(journal.read_range())
+        self.assertEqual(list(journal.query()), entries)
+
+        start, end = entries[40]["timestamp"], entries[260]["timestamp"]
+        expected = [e for e in entries
+                    if e["state"] == "LOCKED" and e["affect"]["p"] <= -0.5 and start <= e["timestamp"] <= end]
+        self.assertTrue(expected)
+        self.assertEqual(list(journal.query(state="LOCKED", p=(None, -0.5), start=start, end=end)), expected)
+
+        both = [e for e in entries if e["state"] in ("LOCKED", "DRIFTING") and e["affect"]["p"] >= 0.9]
+        self.assertEqual(list(journal.query(state=["LOCKED", "DRIFTING"], p=(0.9, None))), both)
+        self.assertEqual(list(journal.query(interaction_id=17)), [entries[17]])
+        self.assertEqual(list(journal.query(limit=3, newest_first=True)), entries[::-1][:3])
+
+    def test_queries_stream(self):
+        journal = self.make_journal(index_path=self.db)
+        journal.log_entries([(record, None) for record in self.records])
+        rows = journal.query()
+        self.assertEqual(next(rows)["interaction_id"], 0)
+        # The writer (and the flusher feeding the index) is not blocked by an open reader
+        journal.log_entry(status(300, "STABLE", 0.0))
+        journal.flush()
+        deadline = time.time() + 5
+        while journal.stats()["index_pending"] and time.time() < deadline:
+            time.sleep(0.005)
+        self.assertEqual(journal.stats()["index_pending"], 0)
+        rows.close()
+        self.assertEqual(len(list(journal.query())), 301)
+
+    def test_index_is_fed_by_the_flusher_only(self):
+        journal = self.make_journal(index_path=self.db)
+        threads = []
+        add = journal.index.add
+
+        def recording(rows):
+            threads.append(threading.current_thread().name)
+            add(rows)
+
+        journal.index.add = recording
+        journal.log_entries([(record, None) for record in self.records[:50]])
+        journal.flush()
+        # flush() only writes; query() waits for the flusher to index the rows
+        self.assertEqual(journal.stats()["written"], 50)
+        self.assertEqual(len(list(journal.query())), 50)
+        self.assertEqual(journal.stats()["index_pending"], 0)
+        self.assertEqual(set(threads), {"journal-flush"})
+
+    def test_rebuild_index_of_existing_journal(self):
+        plain = self.make_journal()
+        plain.log_entries([(record, None) for record in self.records])
+        plain.close()
+
+        indexed = self.make_journal(index_path=self.db)
+        self.assertEqual(list(indexed.query()), [])
+        self.assertEqual(indexed.rebuild_index(), 300)
+        self.assertEqual(indexed.rebuild_index(), 0)
+        self.assertEqual(list(indexed.query()), list(indexed.read_range()))
+
+        with self.assertRaises(RuntimeError):
+            plain.query()
+
+    def test_rebuild_counts_only_new_rows(self):
+        plain = self.make_journal()
+        # Intimacy is a float; 1.0 must not come back as the integer 1
+        plain.log_entries([(dict(record, intimacy_level=float(record["intimacy_level"])), None)
+                           for record in self.records])
+        plain.close()
+
+        indexed = self.make_journal(index_path=self.db)
+        # Part of the segment was indexed before (e.g. a crash mid-rebuild)
+        segment = indexed.segments()[0]
+        name = os.path.basename(segment.path)
+        done = segment.count // 2
+        indexed.index.add([entry_row(name, number, entry) for number, entry in enumerate(islice(indexed.read_range(), done))])
+        # ...and rows the segment no longer holds (e.g. a cut-off tail): not new rows either way
+        stale = next(indexed.read_range())
+        indexed.index.add([entry_row(name, segment.count + k, stale) for k in range(5)])
+        self.assertGreater(done, 0)
+        self.assertEqual(indexed.rebuild_index(), 300 - done)
+        entries = list(indexed.query())
+        self.assertEqual(len(entries), 305)
+        self.assertEqual([e["intimacy"] for e in entries[:4]], [0.0, 1.0, 2.0, 3.0])
+        self.assertTrue(all(isinstance(e["intimacy"], float) for e in entries))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,143 @@
+import unittest
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from src.app_integration import PersonaService
+from src.persona_client import DaemonError, request
+from src.persona_daemon import PersonaDaemon
+from src.utils.paths import get_project_root
+
+@unittest.skipUnless(hasattr(socket, "AF_UNIX"), "Unix domain sockets required")
+class TestPersonaDaemon(unittest.TestCase):
+    """
+    The daemon must answer exactly what an in-process PersonaService answers.
+    """
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.socket_path = os.path.join(self.tmp.name, "persona.sock")
+        self.daemon = PersonaDaemon(self.socket_path, session_dir=os.path.join(self.tmp.name, "sessions"),
+                                    journal_path=os.path.join(self.tmp.name, "journal.jsonl")).start()
+        self.thread = threading.Thread(target=self.daemon.serve_forever, daemon=True)
+        self.thread.start()
+
+    def tearDown(self):
+        self.daemon.shutdown()
+        self.thread.join()
+        self.daemon.close()
+
+    def local_service(self):
+        service = PersonaService(session_dir=os.path.join(self.tmp.name, "local"),
+                                 journal_path=os.path.join(self.tmp.name, "local.jsonl"))
+        self.addCleanup(service.close)  # before the directory goes
+        return service
+
+    def test_payload_matches_in_process(self):
+        local = self.local_service()
+        for text in ["Tell me a story", "Calculate 2+2", "Tell me another one"]:
+            remote = request(self.socket_path, {"user_input": text, "session_id": "alice", "seed": 9})
+            expected = local.get_llm_payload(text, session_id="alice", manual_seed=9)
+            self.assertEqual(remote['messages'], expected['messages'])
+            self.assertEqual(remote['metadata']['reason_codes'], expected['metadata']['reason_codes'])
+        # The service stays warm between requests
+        self.assertEqual(request(self.socket_path, {"op": "ping"})["services"], 1)
+
+    def test_concurrent_clients(self):
+        # A client holding an idle connection does not block the others
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as idle:
+            idle.connect(self.socket_path)
+            results = {}
+
+            def ask(session_id):
+                results[session_id] = request(self.socket_path, {"user_input": "Tell me a story",
+                                                                 "session_id": session_id, "seed": 3}, timeout=10)
+
+            clients = [threading.Thread(target=ask, args=(session_id,)) for session_id in ("carol", "dave")]
+            for client in clients:
+                client.start()
+            for client in clients:
+                client.join(10)
+            self.assertEqual(sorted(results), ["carol", "dave"])
+            # Both first requests shared one service
+            self.assertEqual(request(self.socket_path, {"op": "ping"}, timeout=10)["services"], 1)
+
+        local = self.local_service()
+        for session_id in ("carol", "dave"):
+            expected = local.get_llm_payload("Tell me a story", session_id=session_id, manual_seed=3)
+            self.assertEqual(results[session_id]['messages'], expected['messages'])
+
+    def test_errors_are_reported(self):
+        with self.assertRaises(DaemonError):
+            request(self.socket_path, {"op": "explode"})
+        with self.assertRaises(DaemonError):
+            request(os.path.join(self.tmp.name, "missing.sock"), {"op": "ping"})
+
+    def test_genomes_must_live_under_the_project_root(self):
+        for genome in ("/etc/passwd", "../outside.json", os.path.join(self.tmp.name, "genome.json")):
+            with self.assertRaises(DaemonError):
+                request(self.socket_path, {"user_input": "Hello", "genome": genome})
+        inside = str(get_project_root() / "src/l2_genome/sample_genome.json")
+        for genome in ("src/l2_genome/sample_genome.json", inside):
+            self.assertIn("messages", request(self.socket_path, {"user_input": "Hello", "genome": genome}))
+        # Both spellings name one service
+        self.assertEqual(request(self.socket_path, {"op": "ping"})["services"], 1)
+        self.assertEqual(os.stat(self.socket_path).st_mode & 0o777, 0o600)
+
+    def test_close_lets_requests_finish_before_hibernating(self):
+        dispatch, entered = self.daemon.dispatch, threading.Event()
+
+        def slow_dispatch(message):
+            if message.get("op") != "ping":
+                entered.set()
+                time.sleep(0.2)
+            return dispatch(message)
+
+        self.daemon.dispatch = slow_dispatch
+        results = []
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as idle:
+            idle.connect(self.socket_path)
+            request(self.socket_path, {"op": "ping"})  # the idle connection is being served
+            client = threading.Thread(target=lambda: results.append(
+                request(self.socket_path, {"user_input": "Hello", "session_id": "late"}, timeout=10)))
+            client.start()
+            self.assertTrue(entered.wait(5))
+            self.daemon.shutdown()
+            self.thread.join()
+            self.daemon.close()
+            client.join(5)
+            # The in-flight request was answered, the idle connection closed, then the session hibernated
+            self.assertEqual(len(results), 1)
+            self.assertEqual(idle.recv(1), b"")
+        service = next(iter(self.daemon.services.values()))
+        self.assertNotIn("late", service.sessions)
+        self.assertTrue(os.path.exists(service.sessions._path_for("late")))
+
+    def test_second_daemon_refuses_live_socket(self):
+        with self.assertRaises(RuntimeError):
+            PersonaDaemon(self.socket_path).start()
+
+    def test_cli_client_mode(self):
+        root = str(get_project_root())
+        result = subprocess.run(
+            [sys.executable, "-m", "src.persona_cli", "Tell me a story", "--socket", self.socket_path,
+             "--session-id", "bob", "--seed", "4"],
+            cwd=root, capture_output=True, text=True, check=True
+        )
+        local = self.local_service()
+        expected = local.get_llm_payload("Tell me a story", session_id="bob", manual_seed=4)
+        self.assertEqual(result.stdout, expected['messages'][0]['content'] + "\n")
+
+        # Client mode never builds the engine
+        probe = subprocess.run(
+            [sys.executable, "-c", "import sys, src.persona_cli, src.persona_client; "
+                                   "print('src.app_integration' in sys.modules, 'numpy' in sys.modules)"],
+            cwd=root, capture_output=True, text=True, check=True
+        )
+        self.assertEqual(probe.stdout.strip(), "False False")
+
+if __name__ == '__main__':
+    unittest.main()
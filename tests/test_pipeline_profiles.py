@@ -0,0 +1,76 @@
+import unittest
+import os
+import tempfile
+from src.app_integration import PersonaService
+from src.l0_orchestrator.pipeline import CognitiveDirector
+
+METADATA_KEYS = {"trace_id", "session_id", "contract_version", "stance", "affect", "reason_codes", "mode", "profile",
+                 "layout", "prefix_hash", "prefix_length", "prompt_tokens", "token_budget", "trimmed_sections"}
+
+class TestPipelineProfiles(unittest.TestCase):
+    """
+    Profile selection and the STRICT_FACT fast path.
+    """
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.service = PersonaService(session_dir=os.path.join(self.tmp.name, "sessions"),
+                                      journal_path=os.path.join(self.tmp.name, "journal.jsonl"))
+        self.addCleanup(self.service.close)  # before the directory goes
+
+    def test_scene_selects_profile(self):
+        fact = self.service.get_llm_payload("Calculate 2+2", session_id="alice")
+        social = self.service.get_llm_payload("Tell me a story", session_id="alice")
+        self.assertEqual(fact['metadata']['profile'], "fact_fastpath")
+        self.assertEqual(social['metadata']['profile'], "full")
+        self.assertIn("[BEHAVIORAL HABITS", social['messages'][0]['content'])
+
+    def test_fact_fastpath_artifact_is_contract_compatible(self):
+        payload = self.service.get_llm_payload("Prove that 7 is prime", session_id="bob")
+        self.assertEqual(set(payload['metadata']), METADATA_KEYS)
+        self.assertEqual(payload['metadata']['mode'], "STYLE_ONLY")
+        reason_codes = payload['metadata']['reason_codes']
+        for code in ("SCENE_STRICT_FACT", "PROJECTION_PRECOMPUTED", "PROMPT_AUGMENTED"):
+            self.assertIn(code, reason_codes)
+        self.assertTrue("GOVERNANCE_PASS" in reason_codes or "DRIFT_DETECTED_CORRECTION_APPLIED" in reason_codes)
+        prompt = payload['messages'][0]['content']
+        self.assertIn("[ROLE]", prompt)
+        self.assertNotIn("[BEHAVIORAL HABITS", prompt)
+        # Journal/STM bookkeeping still happens on the fast path
+        self.assertEqual(len(self.service.sessions.get("bob").stm.entries), 1)
+
+    def test_fastpath_render_is_shared_across_sessions(self):
+        cache = self.service.projection_cache
+        first = self.service.get_llm_payload("Calculate 2+2", session_id="carol")
+        second = self.service.get_llm_payload("Calculate 3+3", session_id="dave")
+        self.assertEqual(first['messages'][0]['content'], second['messages'][0]['content'])
+        self.assertEqual((cache.misses, cache.hits), (1, 1))
+
+    def test_explicit_profile(self):
+        payload = self.service.get_llm_payload("Calculate 2+2", session_id="erin", profile="full")
+        self.assertEqual(payload['metadata']['profile'], "full")
+        self.assertIn("[BEHAVIORAL HABITS", payload['messages'][0]['content'])
+
+        self.service.get_llm_payload("Hello", session_id="erin", profile="lite")
+        self.assertEqual(len(self.service.sessions.get("erin").stm.entries), 1)
+        with self.assertRaises(ValueError):
+            self.service.get_llm_payload("Hello", profile="missing")
+
+    def test_batch_groups_profiles(self):
+        inputs = ["Calculate 2+2", "Tell me a story", "Prove it", "I feel sad"]
+        sessions = ["a", "b", "a", "b"]
+        batched = self.service.get_llm_payload_batch(inputs, session_id=sessions, manual_seed=5)
+        other = PersonaService(session_dir=os.path.join(self.tmp.name, "other"),
+                               journal_path=os.path.join(self.tmp.name, "other.jsonl"))
+        self.addCleanup(other.close)
+        sequential = [other.get_llm_payload(t, session_id=s, manual_seed=5) for t, s in zip(inputs, sessions)]
+        for got, want in zip(batched, sequential):
+            self.assertEqual(got['messages'], want['messages'])
+            self.assertEqual(got['metadata']['profile'], want['metadata']['profile'])
+
+    def test_profiles_must_start_with_analysis(self):
+        with self.assertRaises(ValueError):
+            CognitiveDirector(self.service, profiles={"full": ["projection"]})
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,70 @@
+import unittest
+import os
+import tempfile
+from src.app_integration import PersonaService
+from src.l2_genome.compiled import CompiledGenome
+from src.l3_expression.projection_cache import ProjectionCache, quantize_warp
+
+def system_prompt(artifact):
+    return artifact['messages'][0]['content']
+
+class TestProjectionCache(unittest.TestCase):
+    """
+    Cached projections must be indistinguishable from freshly rendered ones.
+    """
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.service = PersonaService(session_dir=os.path.join(self.tmp.name, "sessions"),
+                                      journal_path=os.path.join(self.tmp.name, "journal.jsonl"))
+        self.addCleanup(self.service.close)  # before the directory goes
+
+    def test_repeated_turns_hit(self):
+        cache = self.service.projection_cache
+        first = self.service.get_llm_payload("Calculate 2+2", session_id="alice")
+        second = self.service.get_llm_payload("Prove that 3 is prime", session_id="alice")
+        self.assertEqual(cache.misses, 1)
+        self.assertEqual(cache.hits, 1)
+        self.assertEqual(system_prompt(first), system_prompt(second))
+        self.assertIn("PROMPT_AUGMENTED", second['metadata']['reason_codes'])
+
+    def test_hit_equals_fresh_render(self):
+        cached = self.service.get_llm_payload("Calculate 2+2", session_id="bob", manual_seed=7, profile="full")
+        self.service.projection_cache.clear()
+        fresh = self.service.get_llm_payload("Calculate 2+2", session_id="bob", manual_seed=7, profile="full")
+        self.assertEqual(system_prompt(cached), system_prompt(fresh))
+
+    def test_inputs_are_part_of_the_key(self):
+        cache = self.service.projection_cache
+        self.service.get_llm_payload("Calculate 2+2", session_id="carol", manual_seed=1, profile="full")
+        self.service.get_llm_payload("Calculate 2+2", session_id="carol", manual_seed=2, profile="full")
+        self.service.get_llm_payload("Calculate 2+2", session_id="dave", manual_seed=1, profile="full")
+        self.service.sessions.get("dave").fsm.intimacy_level = 0.8
+        self.service.get_llm_payload("Calculate 2+2", session_id="dave", manual_seed=1, profile="full")
+        self.assertEqual(cache.hits, 0)
+        self.assertEqual(cache.misses, 4)
+
+    def test_lru_bound(self):
+        cache = ProjectionCache(max_entries=2)
+        for key in ("a", "b", "a", "c"):
+            if cache.get(key) is None:
+                cache.put(key, key.upper())
+        self.assertEqual(len(cache), 2)
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("a"), "A")
+        self.assertEqual(cache.stats()["entries"], 2)
+
+    def test_fingerprint_is_content_based(self):
+        genome = self.service.base_genome
+        self.assertEqual(CompiledGenome(genome).fingerprint, self.service.base_compiled_genome.fingerprint)
+        stance = self.service.archetype_mgr.calculate_genome_from_stance(0.9, 0.2, 0.1)
+        self.assertNotEqual(CompiledGenome(stance).fingerprint, self.service.base_compiled_genome.fingerprint)
+
+    def test_quantize_warp(self):
+        warp = quantize_warp({"variability_warp": 1.26, "bias_warp": -0.011}, 0.05)
+        self.assertAlmostEqual(warp["variability_warp"], 1.25)
+        self.assertAlmostEqual(warp["bias_warp"], 0.0)
+        self.assertEqual(quantize_warp({"bias_warp": 0.013}, 0), {"bias_warp": 0.013})
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,95 @@
+import unittest
+import json
+import os
+import random
+import tempfile
+from src.l3_expression.prompt_augmenter import PromptAugmenter
+
+def reference_augment(manifold, projection, influence=1.0, intimacy=0.0):
+    """The original linear-scan renderer, kept as the behavioral reference."""
+    sections = {"ROLE": ["You are an intelligent AI assistant governed by a dynamic persona engine."],
+                "MISSION": [], "POLICIES": [], "STYLE": [], "OUTPUT_FORMAT": [], "OPTIONAL_FLAVOR": []}
+    for trait_id, value in projection.items():
+        if trait_id not in manifold:
+            continue
+        config = manifold[trait_id]
+        category = config.get("category", "STYLE")
+        text = None
+        if "ranges" in config:
+            for low, high, mapping_text in config["ranges"]:
+                if low <= value <= high:
+                    text = mapping_text
+                    break
+        elif "values" in config and value in config["values"]:
+            text = config["values"][value]
+        if category == "OPTIONAL_FLAVOR" and influence < 0.3:
+            continue
+        if text:
+            if trait_id == "explanation_depth" and "Explain using simple" in text and intimacy < 0.4:
+                text = "Maintain a standard, polite, and helpful tone."
+            if trait_id == "topic_attractors" and intimacy < 0.5:
+                text = f"Occasionally mention interests related to {value.replace('_', ' ')}."
+            sections[category].append(f"- {text}")
+    order = ["ROLE", "MISSION", "POLICIES", "STYLE", "OUTPUT_FORMAT", "OPTIONAL_FLAVOR"]
+    return "\n\n".join(f"[{s}]\n" + "\n".join(sections[s]) for s in order if sections[s])
+
+class TestPromptAugmenter(unittest.TestCase):
+    """
+    Compiled rendering tables must reproduce the linear-scan renderer exactly.
+    """
+    def setUp(self):
+        self.augmenter = PromptAugmenter()
+        self.rng = random.Random(5)
+
+    def random_projection(self, augmenter):
+        projection = {}
+        for trait_id, config in augmenter.manifold.items():
+            if "ranges" in config:
+                bounds = [b for low, high, _ in config["ranges"] for b in (low, high)]
+                # Band edges, values between them and values outside every band
+                projection[trait_id] = self.rng.choice(bounds + [self.rng.uniform(-0.2, 1.2) for _ in range(4)])
+            else:
+                projection[trait_id] = self.rng.choice(list(config["values"]) + ["unknown"])
+        projection["not_in_manifold"] = 0.5
+        items = list(projection.items())
+        self.rng.shuffle(items)
+        return dict(items)
+
+    def assert_matches_reference(self, augmenter, trials=300):
+        for _ in range(trials):
+            projection = self.random_projection(augmenter)
+            influence = self.rng.choice([0.1, 0.3, 1.0])
+            intimacy = self.rng.choice([0.0, 0.4, 0.45, 0.5, 0.9])
+            self.assertEqual(augmenter.augment(projection, influence, intimacy),
+                             reference_augment(augmenter.manifold, projection, influence, intimacy))
+
+    def test_matches_reference(self):
+        self.assert_matches_reference(self.augmenter)
+
+    def test_overlapping_and_gapped_bands(self):
+        manifold = {
+            "explanation_depth": {"category": "MISSION", "ranges": [
+                [0.2, 0.6, "Explain using simple words."], [0.0, 0.4, "Shadowed on overlap."],
+                [0.8, 0.9, "Deep."], [0.6, 0.6, "Never wins."]
+            ]},
+            "topic_attractors": {"category": "OPTIONAL_FLAVOR", "values": {"cybernetics": "Systems."}},
+            **{f"trait_{i}": {"category": "STYLE", "ranges": [[j / 20, (j + 1) / 20, f"t{i} band {j}"] for j in range(20)]}
+               for i in range(30)}
+        }
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "manifold.json")
+            with open(path, "w") as f:
+                json.dump({"manifold": manifold}, f)
+            self.assert_matches_reference(PromptAugmenter(path), trials=200)
+
+    def test_batch_matches_single(self):
+        projections = [self.random_projection(self.augmenter) for _ in range(5)]
+        ordered = [{k: p[k] for k in sorted(p)} for p in projections]
+        influences = [1.0, 0.1, 0.5, 1.0, 0.2]
+        intimacies = [0.0, 0.9, 0.45, 0.5, 0.1]
+        for batch in (projections, ordered):
+            expected = [self.augmenter.augment(p, i, t) for p, i, t in zip(batch, influences, intimacies)]
+            self.assertEqual(self.augmenter.augment_batch(batch, influences, intimacies), expected)
+
+if __name__ == '__main__':
+    unittest.main()
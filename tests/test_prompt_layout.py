@@ -0,0 +1,96 @@
+import unittest
+import os
+import tempfile
+from src.app_integration import PersonaService
+from src.l3_expression import prompt_layout
+
+SECTIONS = [("ROLE", "[ROLE]\nrole"), ("MISSION", "[MISSION]\n- m"), ("POLICIES", "[POLICIES]\n- p"),
+            ("STYLE", "[STYLE]\n- s")]
+
+class TestPromptLayout(unittest.TestCase):
+    """
+    Layouts order the same sections; prefix_stable keeps the prefix byte-identical.
+    """
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.service = PersonaService(session_dir=os.path.join(self.tmp.name, "sessions"),
+                                      journal_path=os.path.join(self.tmp.name, "journal.jsonl"))
+        self.addCleanup(self.service.close)  # before the directory goes
+
+    def test_classic_is_the_original_layout(self):
+        prompt, prefix_length, _, _ = prompt_layout.assemble(SECTIONS, "- habit", "Stay on topic.", "classic")
+        self.assertEqual(prompt, (
+            "You are operating under personality constraints:\n"
+            "[ROLE]\nrole\n\n[MISSION]\n- m\n\n[POLICIES]\n- p\n\n[STYLE]\n- s"
+            "\n\n[BEHAVIORAL HABITS (PROVENANCE: GENERATED)]\n- habit"
+            "\n[GOVERNANCE OVERRIDE]\nStay on topic.\n"
+        ))
+        self.assertEqual(prompt[:prefix_length], "You are operating under personality constraints:\n[ROLE]\nrole")
+
+    def test_prefix_stable_order(self):
+        prompt, prefix_length, _, _ = prompt_layout.assemble(SECTIONS, "- habit", "Stay on topic.", "prefix_stable")
+        positions = [prompt.index(marker) for marker in ("[ROLE]", "[BEHAVIORAL HABITS", "[POLICIES]", "[MISSION]",
+                                                         "[STYLE]", "[GOVERNANCE OVERRIDE]")]
+        self.assertEqual(positions, sorted(positions))
+        self.assertTrue(prompt[:prefix_length].endswith("- habit"))
+        with self.assertRaises(ValueError):
+            prompt_layout.assemble(SECTIONS, layout="unknown")
+
+    def test_prefix_is_stable_across_turns(self):
+        self.service.prompt_layout = "prefix_stable"
+        turns = ["Tell me a story", "I feel lonely today", "What a weird dream", "Calculate 2+2"]
+        payloads = [self.service.get_llm_payload(text, session_id="alice", manual_seed=i, profile="full")
+                    for i, text in enumerate(turns)]
+        prefixes = {p['messages'][0]['content'][:p['metadata']['prefix_length']] for p in payloads}
+        self.assertEqual(len(prefixes), 1)
+        self.assertEqual(len({p['metadata']['prefix_hash'] for p in payloads}), 1)
+        self.assertIn("[BEHAVIORAL HABITS", prefixes.pop())
+
+        other = self.service.get_llm_payload("Tell me a story", session_id="bob", profile="full")
+        habits = [h['text'] for h in self.service.habit_gen.generate("bob")]
+        prefix = other['messages'][0]['content'][:other['metadata']['prefix_length']]
+        self.assertTrue(all(text in prefix for text in habits))
+        self.assertEqual(other['metadata']['layout'], "prefix_stable")
+
+    def test_token_estimate(self):
+        self.assertEqual(prompt_layout.estimate_tokens("Hello, world!"), 4)
+        self.assertEqual(prompt_layout.estimate_tokens("平方根 256"), 4)
+        a, b = "[ROLE]\n- Be concise.", "- Deconstruct conflicts using logic and evidence."
+        self.assertEqual(prompt_layout.estimate_tokens(a + "\n\n" + b),
+                         prompt_layout.estimate_tokens(a) + prompt_layout.estimate_tokens(b))
+
+    def test_budget_trims_lowest_priority_first(self):
+        sections = SECTIONS + [("OPTIONAL_FLAVOR", "[OPTIONAL_FLAVOR]\n- f1\n- f2")]
+        roomy = prompt_layout.assemble(sections, "- habit", "Stay on topic.", budget=1000)
+        self.assertEqual(roomy.trimmed, {})
+        self.assertIn("[HABITS]", roomy.prompt)
+        self.assertEqual(roomy.tokens, prompt_layout.estimate_tokens(roomy.prompt))
+
+        budget = roomy.tokens - 12
+        tight = prompt_layout.assemble(sections, "- habit", "Stay on topic.", budget=budget)
+        self.assertLessEqual(tight.tokens, budget)
+        self.assertEqual(tight.tokens, prompt_layout.estimate_tokens(tight.prompt))
+        self.assertEqual(list(tight.trimmed), ["HABITS", "OPTIONAL_FLAVOR"])
+        self.assertNotIn("[HABITS]", tight.prompt)
+        self.assertIn("[STYLE]", tight.prompt)
+        self.assertEqual(tight, prompt_layout.assemble(sections, "- habit", "Stay on topic.", budget=budget))
+
+        floor = prompt_layout.assemble(sections, "- habit", "Stay on topic.", budget=1)
+        self.assertIn("[ROLE]", floor.prompt)
+        self.assertIn("Stay on topic.", floor.prompt)
+        self.assertNotIn("[MISSION]", floor.prompt)
+
+    def test_service_reports_tokens(self):
+        full = self.service.get_llm_payload("Tell me a story", session_id="carol", manual_seed=1, profile="full")
+        self.assertIsNone(full['metadata']['token_budget'])
+        self.assertGreater(full['metadata']['prompt_tokens'], 0)
+
+        self.service.prompt_token_budget = 60
+        compact = self.service.get_llm_payload("Tell me a story", session_id="carol", manual_seed=1, profile="full")
+        self.assertLessEqual(compact['metadata']['prompt_tokens'], 60)
+        self.assertIn("PROMPT_COMPACTED", compact['metadata']['reason_codes'])
+        self.assertTrue(compact['metadata']['trimmed_sections'])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,395 @@
+import json
+import os
+import random
+import tempfile
+import threading
+import time
+import unittest
+from unittest import mock
+from concurrent.futures import ThreadPoolExecutor
+
+from src.l4_memory.journal import PersonaReflectionJournal
+from src.l4_memory.segments import CODECS, SegmentIndex, list_segments, segment_path
+
+def status(i):
+    return {"interaction_count": i, "state": "STABLE", "affect": {"p": 0.1, "a": 0.0, "d": 0.0}, "intimacy_level": 0}
+
+class TestReflectionJournal(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "journal.jsonl")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def read_ids(self):
+        # A separate reader sees only what the writer has flushed
+        return [entry["interaction_id"] for entry in PersonaReflectionJournal(self.path).read_range()]
+
+    def wait_for(self, journal, written):
+        deadline = time.time() + 5
+        while journal.stats()["written"] < written and time.time() < deadline:
+            time.sleep(0.005)
+
+    def test_entries_are_queued_until_a_flush(self):
+        journal = PersonaReflectionJournal(self.path, flush_every=0, flush_interval_ms=0)
+        for i in range(5):
+            journal.log_entry(status(i), user_input=f"turn {i}")
+        self.assertEqual(self.read_ids(), [])
+        self.assertEqual(journal.stats()["pending"], 5)
+
+        self.assertEqual(journal.flush(), 5)
+        self.assertEqual(self.read_ids(), [0, 1, 2, 3, 4])
+        stats = journal.stats()
+        self.assertEqual((stats["pending"], stats["written"], stats["synced"]), (0, 5, 0))
+        journal.close()
+
+    def test_flush_every_n_entries(self):
+        journal = PersonaReflectionJournal(self.path, flush_every=4, flush_interval_ms=0)
+        journal.log_entries([(status(i), None) for i in range(3)])
+        time.sleep(0.05)
+        self.assertEqual(self.read_ids(), [])
+        journal.log_entry(status(3))
+        self.wait_for(journal, 4)
+        self.assertEqual(self.read_ids(), [0, 1, 2, 3])
+        journal.close()
+
+    def test_flush_interval(self):
+        journal = PersonaReflectionJournal(self.path, flush_every=0, flush_interval_ms=10)
+        journal.log_entry(status(0))
+        self.wait_for(journal, 1)
+        self.assertEqual(self.read_ids(), [0])
+        journal.close()
+
+    def test_close_flushes_and_syncs(self):
+        journal = PersonaReflectionJournal(self.path, flush_every=0, flush_interval_ms=0, fsync="close")
+        journal.log_entries([(status(i), None) for i in range(3)])
+        journal.close()
+        self.assertEqual(self.read_ids(), [0, 1, 2])
+        self.assertEqual(journal.stats()["synced"], 3)
+
+        # Late entries are dropped, not written to a segment of their own
+        segments = list_segments(self.path)
+        journal.log_entry(status(3))
+        journal.log_entries([(status(4), None)])
+        self.assertEqual(self.read_ids(), [0, 1, 2])
+        self.assertEqual(list_segments(self.path), segments)
+        self.assertEqual((journal.stats()["queued"], journal.stats()["dropped"]), (3, 2))
+
+    def test_service_close_stops_the_flusher(self):
+        from src.app_integration import PersonaService
+        with mock.patch("src.l4_memory.journal.atexit") as hooks:
+            service = PersonaService(session_dir=os.path.join(self.tmp.name, "sessions"), journal_path=self.path)
+            service.watch_runtime(interval=60)
+            service.get_llm_payload("Hello there", session_id="u1")
+            flusher = service.journal._flusher
+            self.assertTrue(flusher.is_alive())
+            service.close()
+            self.assertFalse(flusher.is_alive())
+            self.assertIsNone(service.watcher)
+            hooks.unregister.assert_called_once_with(service.journal.close)
+            service.get_llm_payload("Still there?", session_id="u1")
+        self.assertEqual(service.journal.stats()["dropped"], 1)
+        self.assertEqual(len(self.read_ids()), 1)
+
+    def test_fsync_every_flush(self):
+        journal = PersonaReflectionJournal(self.path, flush_every=0, flush_interval_ms=0, fsync="flush")
+        journal.log_entry(status(0))
+        journal.flush()
+        self.assertEqual(journal.stats()["synced"], 1)
+        journal.close()
+        with self.assertRaises(ValueError):
+            PersonaReflectionJournal(self.path, fsync="sometimes")
+
+    def test_concurrent_writers_keep_every_line(self):
+        journal = PersonaReflectionJournal(self.path, flush_every=8, flush_interval_ms=5)
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            list(pool.map(lambda i: journal.log_entry(status(i), user_input="x" * 100), range(400)))
+        journal.close()
+        self.assertEqual(sorted(self.read_ids()), list(range(400)))
+
+    def test_recent_insights_include_queued_entries(self):
+        journal = PersonaReflectionJournal(self.path, flush_every=0, flush_interval_ms=0)
+        journal.log_entries([(status(i), None) for i in range(4)])
+        self.assertEqual([e["interaction_id"] for e in journal.get_recent_insights(limit=2)], [3, 2])
+        journal.close()
+
+    def test_segments_rotate_by_size_and_age(self):
+        journal = PersonaReflectionJournal(self.path, flush_every=0, flush_interval_ms=0,
+                                           segment_max_bytes=2000, index_stride=4)
+        journal.log_entries([(status(i), "x" * 40) for i in range(60)])
+        journal.close()
+        indexes = journal.segments()
+        self.assertGreater(len(indexes), 3)
+        # The newest segment stays open for the next writer
+        self.assertEqual([index.sealed for index in indexes], [True] * (len(indexes) - 1) + [False])
+        self.assertEqual(sum(index.count for index in indexes), 60)
+        self.assertEqual(self.read_ids(), list(range(60)))
+        for index in indexes[:-1]:
+            with open(index.sidecar_path) as f:
+                sidecar = json.load(f)
+            self.assertEqual(len(sidecar["offsets"]), (sidecar["count"] + 3) // 4)
+            self.assertEqual(len(sidecar["blocks"]), len(sidecar["offsets"]))
+            self.assertEqual(sum(length for _, length in sidecar["blocks"]), os.path.getsize(index.compressed_path))
+            self.assertFalse(os.path.exists(index.path))
+
+        aged = PersonaReflectionJournal(os.path.join(self.tmp.name, "aged.jsonl"), flush_every=0,
+                                        flush_interval_ms=0, segment_max_age_s=0.05)
+        aged.log_entry(status(0))
+        aged.flush()
+        time.sleep(0.06)
+        aged.log_entry(status(1))
+        aged.close()
+        self.assertEqual([index.count for index in aged.segments()], [1, 1])
+
+    def test_range_and_tail_reads(self):
+        for compression in ("none", "zlib", "lzma"):
+            with self.subTest(compression=compression):
+                self.check_range_and_tail_reads(os.path.join(self.tmp.name, f"{compression}.jsonl"), compression)
+
+    def check_range_and_tail_reads(self, path, compression):
+        journal = PersonaReflectionJournal(path, flush_every=7, flush_interval_ms=0,
+                                           segment_max_bytes=3000, index_stride=5, compression=compression)
+        for i in range(120):
+            journal.log_entry(status(i))
+        journal.close()
+        self.assertGreater(len(journal.segments()), 2)
+        self.assertEqual(all(index.codec for index in journal.segments()[:-1]), compression != "none")
+        entries = list(journal.read_range())
+        stamps = [entry["timestamp"] for entry in entries]
+        self.assertEqual(stamps, sorted(stamps))
+
+        for lo, hi in ((0, 119), (13, 14), (40, 95), (117, 119)):
+            start, end = stamps[lo], stamps[hi]
+            expected = [e["interaction_id"] for e in entries if start <= e["timestamp"] <= end]
+            self.assertEqual([e["interaction_id"] for e in journal.read_range(start, end)], expected)
+        self.assertEqual(list(journal.read_range(stamps[-1] + 1)), [])
+
+        for limit in (1, 5, 33, 500):
+            self.assertEqual([e["interaction_id"] for e in journal.get_recent_insights(limit)],
+                             list(range(119, max(119 - limit, -1), -1)))
+
+    def test_writers_share_a_directory(self):
+        first = PersonaReflectionJournal(self.path, flush_every=0, flush_interval_ms=0)
+        second = PersonaReflectionJournal(self.path, flush_every=0, flush_interval_ms=0)
+        for i in range(6):
+            (first if i % 2 else second).log_entry(status(i))
+            (first if i % 2 else second).flush()
+        # Writers append to the same segment, in lock order
+        self.assertEqual(len(list_segments(self.path)), 1)
+        self.assertEqual(self.read_ids(), list(range(6)))
+        self.assertEqual([e["interaction_id"] for e in first.get_recent_insights(3)], [5, 4, 3])
+        self.assertEqual([e["interaction_id"] for e in second.get_recent_insights(3)], [5, 4, 3])
+        first.close()
+        second.close()
+
+        # A new process reopens it; rotation only happens by size or age
+        third = PersonaReflectionJournal(self.path, flush_every=0, flush_interval_ms=0)
+        third.log_entry(status(6))
+        third.close()
+        self.assertEqual(len(list_segments(self.path)), 1)
+        small = PersonaReflectionJournal(self.path, flush_every=0, flush_interval_ms=0, segment_max_bytes=1)
+        small.log_entry(status(7))
+        small.close()
+        self.assertEqual([index.count for index in small.segments()], [7, 1])
+        self.assertEqual(self.read_ids(), list(range(8)))
+
+    def test_writers_keep_timestamps_ordered(self):
+        first = PersonaReflectionJournal(self.path, flush_every=0, flush_interval_ms=0, index_stride=1)
+        second = PersonaReflectionJournal(self.path, flush_every=0, flush_interval_ms=0, index_stride=1)
+        # Queued first, written last
+        first.log_entry(status(0))
+        time.sleep(0.01)
+        second.log_entry(status(1))
+        second.flush()
+        first.flush()
+        entries = list(second.read_range())
+        self.assertEqual([e["interaction_id"] for e in entries], [1, 0])
+        self.assertLessEqual(entries[0]["timestamp"], entries[1]["timestamp"])
+        for entry in entries:
+            found = second.read_range(entry["timestamp"], entry["timestamp"])
+            self.assertIn(entry["interaction_id"], [e["interaction_id"] for e in found])
+        self.assertEqual([e["interaction_id"] for e in second.get_recent_insights(2)], [0, 1])
+
+        # Also when the newest segment was sealed by another writer meanwhile
+        first.log_entry(status(2))
+        time.sleep(0.01)
+        small = PersonaReflectionJournal(self.path, flush_every=0, flush_interval_ms=10, segment_max_bytes=1)
+        small.log_entry(status(3))
+        deadline = time.time() + 5
+        while not all(index.sealed for index in small.segments()) and time.time() < deadline:
+            time.sleep(0.005)
+        small.close()
+        first.flush()
+        entries = list(second.read_range())
+        self.assertEqual([e["interaction_id"] for e in entries], [1, 0, 3, 2])
+        stamps = [e["timestamp"] for e in entries]
+        self.assertEqual(stamps, sorted(stamps))
+        self.assertEqual([e["interaction_id"] for e in second.read_range(stamps[-1], stamps[-1])][-1], 2)
+        self.assertEqual([e["interaction_id"] for e in first.get_recent_insights(4)], [2, 3, 0, 1])
+        first.close()
+        second.close()
+
+    def test_only_the_flusher_seals_and_compresses(self):
+        journal = PersonaReflectionJournal(self.path, flush_every=0, flush_interval_ms=0, segment_max_bytes=600)
+        threads = []
+        save, compress = SegmentIndex.save, SegmentIndex.compress
+
+        def recording(method):
+            def wrapper(index, *args):
+                threads.append(threading.current_thread().name)
+                return method(index, *args)
+            return wrapper
+
+        with mock.patch.object(SegmentIndex, "save", recording(save)), \
+                mock.patch.object(SegmentIndex, "compress", recording(compress)):
+            for i in range(12):
+                journal.log_entry(status(i))
+                # Reader and max_pending flushes only append
+                journal.flush()
+                self.assertEqual(journal.get_recent_insights(1)[0]["interaction_id"], i)
+                time.sleep(0.01)  # the flusher, woken once the segment is full, rotates it
+            journal.close()
+        self.assertGreater(len(journal.segments()), 2)
+        self.assertTrue(threads)
+        self.assertEqual(set(threads), {"journal-flush"})
+        self.assertEqual(self.read_ids(), list(range(12)))
+
+    def test_legacy_journal_and_torn_tail(self):
+        with open(self.path, "w") as f:
+            f.write(json.dumps({"timestamp": 1.0, "interaction_id": -1}) + "\n")
+        journal = PersonaReflectionJournal(self.path, flush_every=0, flush_interval_ms=0)
+        self.assertFalse(os.path.exists(self.path))
+        journal.log_entry(status(0))
+        journal.close()
+        self.assertEqual(self.read_ids(), [-1, 0])
+        # The adopted file is sealed (and compressed) rather than appended to
+        self.assertEqual([(index.count, index.codec) for index in journal.segments()], [(1, "zlib"), (1, None)])
+
+        # An interrupted write leaves half a line behind: it is not an entry,
+        # and the next writer cuts it off before appending
+        with open(journal.segments()[-1].path, "a") as f:
+            f.write('{"timestamp": 2.0, "interac')
+        self.assertEqual(self.read_ids(), [-1, 0])
+        journal = PersonaReflectionJournal(self.path, flush_every=0, flush_interval_ms=0)
+        journal.log_entry(status(1))
+        journal.close()
+        self.assertEqual(self.read_ids(), [-1, 0, 1])
+
+    def test_unsealed_segments_are_recovered(self):
+        # Segments a crashed writer left without a sidecar (the newest one is
+        # still appended to; older ones are sealed by the next journal)
+        for seq in (1, 2):
+            with open(segment_path(self.path, seq), "w") as f:
+                for i in range(3):
+                    f.write(json.dumps({"timestamp": seq + i / 10, "interaction_id": seq * 10 + i}) + "\n")
+                f.write('{"timestamp": 9.0, "inter')
+        journal = PersonaReflectionJournal(self.path, flush_every=0, flush_interval_ms=0, compression="none")
+        self.assertTrue(os.path.exists(segment_path(self.path, 1) + ".idx"))
+        self.assertFalse(os.path.exists(segment_path(self.path, 2) + ".idx"))
+        with mock.patch("src.l4_memory.segments.SegmentIndex.scan") as scan:
+            self.assertEqual(PersonaReflectionJournal(self.path).segments()[0].count, 3)
+            scan.assert_called_once()  # the newest segment only
+        self.assertEqual(PersonaReflectionJournal(self.path).compact(), 1)
+        journal.log_entry(status(30))
+        journal.close()
+        self.assertEqual(self.read_ids(), [10, 11, 12, 20, 21, 22, 30])
+
+    def test_compression_ratio_and_block_reads(self):
+        journal = PersonaReflectionJournal(self.path, flush_every=0, flush_interval_ms=0)
+        rng = random.Random(0)
+        inputs = ["Tell me a story about robots", "Calculate the square root of 256", "I feel lonely today"]
+        for i in range(5000):
+            entry = status(i)
+            entry["affect"] = {k: round(rng.uniform(-1, 1), 3) for k in "pad"}
+            journal.log_entry(entry, user_input=rng.choice(inputs))
+        journal.close()
+        # The next write past the size limit seals (and compresses) the segment
+        rotating = PersonaReflectionJournal(self.path, flush_every=0, flush_interval_ms=0, segment_max_bytes=1)
+        rotating.log_entry(status(5000))
+        rotating.close()
+        index, _ = journal.segments()
+        self.assertEqual(index.count, 5000)
+        self.assertGreaterEqual(index.size / index.stored_bytes, 5)
+
+        calls = []
+        compress, decompress = CODECS["zlib"]
+
+        def counting(data):
+            calls.append(len(data))
+            return decompress(data)
+
+        with mock.patch.dict(CODECS, {"zlib": (compress, counting)}):
+            self.assertEqual([e["interaction_id"] for e in journal.get_recent_insights(4)], [5000, 4999, 4998, 4997])
+            # The tail is decoded a cache's worth at a time, then served from memory
+            self.assertLessEqual(len(calls), 2)
+            calls.clear()
+            self.assertEqual(len(journal.get_recent_insights(50)), 50)
+            self.assertEqual(calls, [])
+            stamp = index.offsets[7][1]
+            self.assertEqual(next(journal.read_range(stamp))["interaction_id"], 7 * index.stride)
+            # The block before may still hold entries with the same timestamp
+            self.assertLessEqual(len(calls), 2)
+
+    def test_compact_compresses_older_segments(self):
+        plain = PersonaReflectionJournal(self.path, flush_every=0, flush_interval_ms=0, compression="none",
+                                         segment_max_bytes=600)
+        plain.log_entries([(status(i), None) for i in range(10)])
+        plain.close()
+        sealed = [index for index in plain.segments() if index.sealed]
+        self.assertGreater(len(sealed), 1)
+        journal = PersonaReflectionJournal(self.path, flush_every=0, flush_interval_ms=0)
+        self.assertEqual(journal.compact(), len(sealed))
+        self.assertEqual(journal.compact(), 0)
+        self.assertEqual(self.read_ids(), list(range(10)))
+        with self.assertRaises(ValueError):
+            PersonaReflectionJournal(self.path, compression="zip")
+
+    def test_recent_insights_follow_other_writers(self):
+        reader = PersonaReflectionJournal(self.path, flush_every=0, flush_interval_ms=0, recent_cache=8)
+        writer = PersonaReflectionJournal(self.path, flush_every=0, flush_interval_ms=0, compression="none")
+        writer.log_entries([(status(i), None) for i in range(20)])
+        writer.flush()
+        (index,) = reader.segments()
+        self.assertEqual([json.loads(line)["interaction_id"] for line in index.tail_lines(3)], [17, 18, 19])
+
+        self.assertEqual([e["interaction_id"] for e in reader.get_recent_insights(3)], [19, 18, 17])
+        # A grown segment invalidates its cached tail; more than cached is read again
+        writer.log_entry(status(20))
+        writer.flush()
+        self.assertEqual([e["interaction_id"] for e in reader.get_recent_insights(12)], list(range(20, 8, -1)))
+
+        # The reader's own entries (a newer segment) come from memory
+        reader.log_entry(status(21))
+        recent = reader.get_recent_insights(3)
+        self.assertEqual([e["interaction_id"] for e in recent], [21, 20, 19])
+        recent[0]["affect"]["p"] = 99
+        self.assertEqual(reader.get_recent_insights(1)[0]["affect"]["p"], 0.1)
+        writer.close()
+        reader.close()
+        self.assertEqual([e["interaction_id"] for e in reader.get_recent_insights(3)], [21, 20, 19])
+
+    def test_reads_race_with_compression(self):
+        writer = PersonaReflectionJournal(self.path, flush_every=0, flush_interval_ms=0, compression="none",
+                                          segment_max_bytes=600)
+        writer.log_entries([(status(i), None) for i in range(10)])
+        writer.close()
+        reader = PersonaReflectionJournal(self.path, flush_every=0, flush_interval_ms=0, recent_cache=2)
+        self.assertGreater(len(reader.segments()), 2)
+        self.assertEqual([e["interaction_id"] for e in reader.get_recent_insights(1)], [9])
+
+        # Another process compresses the sealed segments between the reader's
+        # staleness check and its read
+        PersonaReflectionJournal(self.path).compact()
+        with mock.patch("src.l4_memory.segments.SegmentIndex.stale", return_value=False):
+            self.assertEqual([e["interaction_id"] for e in reader.read_range()], list(range(10)))
+            self.assertEqual([e["interaction_id"] for e in reader.get_recent_insights(10)], list(range(9, -1, -1)))
+
+    def test_recent_insights_beyond_the_memory_window(self):
+        journal = PersonaReflectionJournal(self.path, flush_every=0, flush_interval_ms=0, recent_cache=4)
+        journal.log_entries([(status(i), None) for i in range(10)])
+        self.assertEqual([e["interaction_id"] for e in journal.get_recent_insights(7)], list(range(9, 2, -1)))
+        journal.close()
+
+if __name__ == '__main__':
+    unittest.main()
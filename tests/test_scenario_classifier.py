@@ -0,0 +1,54 @@
+import unittest
+import re
+import random
+from src import config
+from src.l0_orchestrator.scene_classifier import ScenarioClassifier
+
+def legacy_analyze(user_input, fact_keywords, support_keywords):
+    user_input = user_input.lower()
+    for kw in fact_keywords:
+        if re.search(kw, user_input):
+            return "STRICT_FACT"
+    for kw in support_keywords:
+        if re.search(kw, user_input):
+            return "SOCIAL_SUPPORT"
+    return "SOCIAL_CREATIVE"
+
+class TestScenarioClassifier(unittest.TestCase):
+    """
+    The compiled classifier must agree with the per-keyword regex loop it replaces.
+    """
+    def setUp(self):
+        self.classifier = ScenarioClassifier(config.FACT_KEYWORDS, config.SUPPORT_KEYWORDS)
+
+    def test_precedence(self):
+        self.assertEqual(self.classifier.classify("Calculate 2+2"), "STRICT_FACT")
+        self.assertEqual(self.classifier.classify("I feel sad, please calculate this"), "STRICT_FACT")
+        self.assertEqual(self.classifier.classify("I need some help feeling better."), "SOCIAL_SUPPORT")
+        self.assertEqual(self.classifier.classify("Tell me a story"), "SOCIAL_CREATIVE")
+        self.assertEqual(self.classifier.classify("计算 123456 的平方根"), "STRICT_FACT")
+
+    def test_overlapping_keywords_keep_fact_precedence(self):
+        # The support keyword starts first and overlaps the fact keyword.
+        classifier = ScenarioClassifier([r"factory"], [r"manufact"])
+        self.assertEqual(classifier.classify("manufactory"), "STRICT_FACT")
+
+    def test_empty_keyword_sets(self):
+        self.assertEqual(ScenarioClassifier([], []).classify("calculate"), "SOCIAL_CREATIVE")
+        self.assertEqual(ScenarioClassifier([], [r"help"]).classify("help"), "SOCIAL_SUPPORT")
+
+    def test_equivalence_with_legacy_loop(self):
+        rng = random.Random(7)
+        vocabulary = config.FACT_KEYWORDS + config.SUPPORT_KEYWORDS + [
+            "hello", "story", "robot", "今天", "weather", "SQRT", "Thanks!", "mathematics"
+        ]
+        for _ in range(500):
+            text = " ".join(rng.choice(vocabulary) for _ in range(rng.randint(0, 6)))
+            self.assertEqual(
+                self.classifier.classify(text),
+                legacy_analyze(text, config.FACT_KEYWORDS, config.SUPPORT_KEYWORDS),
+                text
+            )
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,148 @@
+import unittest
+import os
+import threading
+import tempfile
+from src.app_integration import PersonaService
+
+class TestSessionPool(unittest.TestCase):
+    """
+    Per-session state isolation, LRU eviction and hibernate/rehydrate round-trips.
+    """
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.session_dir = os.path.join(self.tmp.name, "sessions")
+
+    def make_service(self, **kwargs):
+        service = PersonaService(session_dir=self.session_dir,
+                                 journal_path=os.path.join(self.tmp.name, "journal.jsonl"), **kwargs)
+        self.addCleanup(service.close)  # before the directory goes
+        return service
+
+    def test_sessions_do_not_share_mutable_state(self):
+        service = self.make_service()
+        service.get_llm_payload("I feel sad, I need support", session_id="alice")
+        alice_affect = service.sessions.get("alice").fsm.affect.get_affect()
+        service.get_llm_payload("Tell me a story", session_id="bob")
+
+        self.assertIsNot(service.sessions.get("alice").fsm, service.sessions.get("bob").fsm)
+        self.assertEqual(service.sessions.get("alice").fsm.affect.get_affect(), alice_affect)
+        self.assertEqual(len(service.sessions.get("alice").stm.entries), 1)
+        self.assertEqual(len(service.sessions.get("bob").stm.entries), 1)
+        # The shared base genome is never replaced by a session's stance
+        self.assertIs(service.sessions.get("bob").genome, service.base_genome)
+        self.assertEqual(service.sessions.get("alice").stance, (0.3, 0.9, 0.4))
+
+    def test_stance_genomes_are_shared_overlays(self):
+        service = self.make_service()
+        service.get_llm_payload("I feel sad, I need support", session_id="alice")
+        service.get_llm_payload("I feel lonely, please support me", session_id="bob")
+        alice, bob = service.sessions.get("alice"), service.sessions.get("bob")
+        # Recommended stances are precomputed views on the base genome
+        self.assertIs(alice.compiled_genome, bob.compiled_genome)
+        self.assertIs(alice.compiled_genome, service.stance_genome(0.3, 0.9, 0.4))
+        self.assertIs(alice.compiled_genome.range_min, service.base_compiled_genome.range_min)
+
+    def test_lru_eviction_hibernates_and_rehydrates(self):
+        service = self.make_service(max_sessions=2)
+        service.get_llm_payload("I need some help feeling better.", session_id="s1")
+        s1 = service.sessions.get("s1")
+        s1.fsm.intimacy_level = 0.7
+        s1.engine.log_interaction("Therefore the logic holds.")
+        observed_before = s1.engine.stance_window.observed()
+        affect_before = s1.fsm.affect.get_affect()
+
+        service.get_llm_payload("Hello", session_id="s2")
+        service.get_llm_payload("Hello", session_id="s3")
+
+        self.assertNotIn("s1", service.sessions)
+        self.assertEqual(service.sessions.stats["hibernated"], 2)  # default session + s1
+        self.assertEqual(len(os.listdir(self.session_dir)), 2)
+
+        restored = service.sessions.get("s1")
+        self.assertEqual(service.sessions.stats["rehydrated"], 1)
+        self.assertEqual(restored.fsm.intimacy_level, 0.7)
+        self.assertEqual(restored.fsm.affect.get_affect(), affect_before)
+        self.assertEqual(len(restored.engine.stance_window), 1)
+        self.assertEqual(restored.engine.stance_window.observed(), observed_before)
+        self.assertEqual(len(restored.stm.entries), 1)
+        self.assertEqual(restored.stance, (0.3, 0.9, 0.4))
+        self.assertEqual(restored.compiled_genome.genome, restored.genome)
+
+    def test_memory_budget_bounds_resident_sessions(self):
+        service = self.make_service(max_session_bytes=12 * 1024)
+        for i in range(10):
+            service.get_llm_payload("Hello", session_id=f"user_{i}")
+            self.assertLessEqual(service.sessions.total_bytes, 12 * 1024)
+        self.assertLess(len(service.sessions), 10)
+        self.assertIn("user_9", service.sessions)
+
+    def test_rehydration_does_not_block_other_sessions(self):
+        service = self.make_service()
+        pool = service.sessions
+        pool.get("warm")
+        pool.get("cold").fsm.intimacy_level = 0.4
+        self.assertTrue(pool.hibernate("cold"))
+        entered, proceed = threading.Event(), threading.Event()
+        restore = pool.restore
+
+        def slow_restore(session, data):
+            entered.set()
+            proceed.wait(5)
+            restore(session, data)
+
+        pool.restore = slow_restore
+        results = []
+        loaders = [threading.Thread(target=lambda: results.append(pool.get("cold"))) for _ in range(2)]
+        for loader in loaders:
+            loader.start()
+        self.assertTrue(entered.wait(5))
+        # Other sessions are served while "cold" is read back
+        other = threading.Thread(target=lambda: (pool.pin("warm"), pool.unpin("warm"), pool.get("new")))
+        other.start()
+        other.join(2)
+        self.assertFalse(other.is_alive())
+        self.assertEqual(results, [])
+        proceed.set()
+        for loader in loaders:
+            loader.join(5)
+        # Both requests got the one rehydrated state
+        self.assertIs(results[0], results[1])
+        self.assertEqual(results[0].fsm.intimacy_level, 0.4)
+        self.assertEqual(pool.stats["rehydrated"], 1)
+
+    def test_hibernate_all_waits_for_pinned_sessions(self):
+        service = self.make_service()
+        pool = service.sessions
+        pool.get("idle")
+        pool.pin("busy")
+        self.assertFalse(pool.hibernate("busy"))
+        stopper = threading.Thread(target=pool.hibernate_all)
+        stopper.start()
+        stopper.join(0.2)
+        self.assertTrue(stopper.is_alive())
+        self.assertNotIn("idle", pool)
+        self.assertIn("busy", pool)
+        pool.unpin("busy")
+        stopper.join(5)
+        self.assertFalse(stopper.is_alive())
+        self.assertEqual(len(pool), 0)
+
+    def test_each_cycle_looks_its_session_up_once(self):
+        service = self.make_service()
+        stats = service.sessions.stats
+        service.get_llm_payload("Hello", session_id="dave")
+        service.get_llm_payload("Hello again", session_id="dave")
+        self.assertEqual((stats["created"], stats["hits"]), (2, 1))  # default session + dave
+        service.get_llm_payload_batch(["Hi", "Hi", "Hi"], session_id=["dave", "erin", "dave"])
+        self.assertEqual((stats["created"], stats["hits"]), (3, 3))
+        self.assertIs(service.session, service.sessions.get("dave"))
+
+    def test_active_session_accessors(self):
+        service = self.make_service()
+        service.get_llm_payload("Hello", session_id="carol")
+        self.assertIs(service.fsm, service.sessions.get("carol").fsm)
+        self.assertIs(service.stm, service.sessions.get("carol").stm)
+
+if __name__ == '__main__':
+    unittest.main()
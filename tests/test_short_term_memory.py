@@ -0,0 +1,55 @@
+import random
+import unittest
+
+from src.l4_memory.short_term import ShortTermMemory
+
+def reference_prune(entries):
+    # The original O(n) rescoring of every candidate
+    stm = ShortTermMemory()
+    total = len(entries)
+    scores = [stm._score_entry(e, i, total) for i, e in enumerate(entries[:total - 2])]
+    return scores.index(min(scores))
+
+def random_entry(rng, i):
+    # Coarse values so equal scores (tie-breaking) come up often
+    affect = {k: rng.choice([0.0, 0.1, 0.2, -0.3, 0.5]) for k in "pad"}
+    state = rng.choice(["STABLE", "STABLE", "LOCKED", "DRIFTING", "FORMING"])
+    return {"user_input": f"turn {i}", "affect": affect, "state": state}
+
+class TestShortTermMemory(unittest.TestCase):
+    def test_pruning_matches_full_rescoring(self):
+        rng = random.Random(7)
+        for max_entries in (3, 10, 200):
+            stm = ShortTermMemory(max_entries=max_entries)
+            mirror = []
+            for i in range(max_entries * 4):
+                entry = random_entry(rng, i)
+                mirror.append(entry)
+                codes = stm.add(entry)
+                if len(mirror) > max_entries:
+                    expected = reference_prune(mirror)
+                    mirror.pop(expected)
+                    self.assertEqual(codes, [f"MEMORY_PRUNED_LOW_SALIENCE_AT_{expected}"])
+                self.assertEqual(stm.entries, mirror)
+
+    def test_restored_entries_are_indexed(self):
+        rng = random.Random(3)
+        entries = [random_entry(rng, i) for i in range(10)]
+        stm = ShortTermMemory(max_entries=10)
+        stm.entries = list(entries)
+        entry = random_entry(rng, 10)
+        expected = reference_prune(entries + [entry])
+        self.assertEqual(stm.add(entry), [f"MEMORY_PRUNED_LOW_SALIENCE_AT_{expected}"])
+        self.assertEqual(len(stm.entries), 10)
+
+    def test_latest_entries_are_protected(self):
+        stm = ShortTermMemory(max_entries=3)
+        loud = {"affect": {"p": 1.0, "a": 1.0, "d": 1.0}, "state": "LOCKED"}
+        quiet = {"affect": {"p": 0, "a": 0, "d": 0}}
+        for entry in (loud, loud, quiet, quiet):
+            stm.add(dict(entry))
+        self.assertEqual(len(stm.entries), 3)
+        self.assertEqual(stm.entries[-2:], [quiet, quiet])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,135 @@
+import unittest
+import json
+import os
+import tempfile
+import threading
+import numpy as np
+from src.utils.paths import resolve_resource
+from src.app_integration import PersonaService
+from src.l2_genome.archetypes import ArchetypeManager
+from src.l2_genome.compiled import CompiledGenome
+from src.l2_genome.lattice import StanceLattice
+
+class TestStanceLattice(unittest.TestCase):
+    """
+    Interpolated stances must stay within the reported error of the exact mapping.
+    """
+    @classmethod
+    def setUpClass(cls):
+        with open(resolve_resource("src/l2_genome/sample_genome.json"), "r") as f:
+            cls.genome = json.load(f)
+        cls.mgr = ArchetypeManager(cls.genome)
+        cls.base = CompiledGenome(cls.genome)
+        cls.lattice = StanceLattice.build(cls.mgr, cls.base, resolution=5, probes=64)
+
+    def make_service(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        service = PersonaService(session_dir=os.path.join(tmp.name, "sessions"),
+                                 journal_path=os.path.join(tmp.name, "journal.jsonl"))
+        self.addCleanup(service.close)  # before the directory goes
+        return service
+
+    def exact(self, *stance):
+        return self.lattice.encode(self.mgr.stance_overlay(*stance))
+
+    def test_nodes_are_exact(self):
+        np.testing.assert_allclose(self.lattice.interpolate(0.25, 0.75, 1.0), self.exact(0.25, 0.75, 1.0), atol=1e-12)
+
+    def test_error_is_bounded_and_reported(self):
+        error = self.lattice.error
+        self.assertGreater(error["points"], 64)
+        # Range defaults and variability are linear in the stance
+        self.assertLess(error["max_default"], 1e-9)
+        self.assertLess(error["max_variability"], 1e-9)
+        self.assertLess(error["max"], 0.1)
+        rng = np.random.default_rng(11)
+        for r, w, c in rng.random((50, 3)).tolist():
+            diff = np.abs(self.lattice.interpolate(r, w, c) - self.exact(r, w, c)).max()
+            self.assertLessEqual(diff, error["max"] + 0.02)
+
+    def test_interpolate_writes_into_buffer(self):
+        out = np.empty_like(self.lattice.grid[0, 0, 0])
+        self.assertIs(self.lattice.interpolate(0.3, 0.6, 0.2, out=out), out)
+        clipped = self.lattice.interpolate(2.0, -1.0, 0.5).copy()
+        np.testing.assert_array_equal(clipped, self.lattice.interpolate(1.0, 0.0, 0.5))
+
+    def test_concurrent_interpolation(self):
+        stances = np.random.default_rng(5).random((40, 3)).tolist()
+        expected = [self.lattice.interpolate(*stance).copy() for stance in stances]
+        failures = []
+
+        def sweep(offset):
+            out = np.empty_like(expected[0])
+            for step in range(200):
+                i = (offset + step) % len(stances)
+                got = self.lattice.interpolate(*stances[i]) if step % 2 else self.lattice.interpolate(*stances[i], out=out)
+                if not np.array_equal(got, expected[i]):
+                    failures.append(i)
+
+        threads = [threading.Thread(target=sweep, args=(n,)) for n in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(failures, [])
+
+    def test_compiled_updates_view_in_place(self):
+        view = self.lattice.compiled(0.1, 0.2, 0.3)
+        default, cdf = view.range_default, view.cat_cdf
+        self.assertIs(self.lattice.compiled(0.42, 0.61, 0.37, into=view), view)
+        self.assertIs(view.range_default, default)
+        self.assertIs(view.cat_cdf, cdf)
+
+        rebuilt = self.base.with_overlay(self.lattice.overlay(0.42, 0.61, 0.37))
+        np.testing.assert_array_equal(view.range_default, rebuilt.range_default)
+        np.testing.assert_array_equal(view.range_variability, rebuilt.range_variability)
+        np.testing.assert_array_equal(view.cat_cdf, rebuilt.cat_cdf)
+        np.testing.assert_array_equal(view.cat_total, rebuilt.cat_total)
+        self.assertEqual(view.cat_mode, rebuilt.cat_mode)
+        self.assertEqual(view.cat_weights, rebuilt.cat_weights)
+        self.assertEqual(view.genome, rebuilt.genome)
+        self.assertEqual(view.fingerprint, self.lattice.compiled(0.42, 0.61, 0.37).fingerprint)
+        self.assertNotEqual(view.fingerprint, self.lattice.compiled(0.1, 0.2, 0.3).fingerprint)
+
+    def test_save_and_load(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "lattice.npz")
+            self.lattice.save(path)
+            loaded = StanceLattice.load(path, self.base)
+            np.testing.assert_array_equal(loaded.grid, self.lattice.grid)
+            self.assertEqual(loaded.error, self.lattice.error)
+            other = CompiledGenome(self.mgr.calculate_genome_from_stance(0.9, 0.2, 0.1))
+            with self.assertRaises(ValueError):
+                StanceLattice.load(path, other)
+
+    def test_service_uses_attached_lattice(self):
+        service = self.make_service()
+        service.archetype_mgr.build_lattice(service.base_compiled_genome, resolution=5)
+        service.set_stance(0.42, 0.61, 0.37)
+        modal = service.compiled_genome.modal()
+        self.assertAlmostEqual(modal["humor_density"], service.stance_genome(0.42, 0.61, 0.37).modal()["humor_density"])
+        self.assertAlmostEqual(modal["explanation_depth"], 0.2 + 0.3 * 0.42)
+        # Recommended stances stay exact
+        exact = service.base_compiled_genome.with_overlay(service.archetype_mgr.stance_overlay(0.9, 0.2, 0.1))
+        self.assertEqual(service.stance_genome(0.9, 0.2, 0.1).modal(), exact.modal())
+
+    def test_slider_sweep_reuses_the_session_view(self):
+        service = self.make_service()
+        service.archetype_mgr.build_lattice(service.base_compiled_genome, resolution=5)
+        shared = service.stance_genome(0.5, 0.5, 0.5)
+        shared_modal = shared.modal()
+        service.set_stance(0.5, 0.51, 0.5)
+        view = service.compiled_genome
+        for step in range(1, 20):
+            service.set_stance(0.5, 0.5 + step / 50, 0.5)
+            self.assertIs(service.compiled_genome, view)
+        self.assertEqual(view.modal(), service.stance_genome(0.5, 0.88, 0.5).modal())
+        self.assertEqual(service.engine.genome, view.genome)
+        # Presets (0.5, 0.5, 0.5) keep the shared views, which are never written to
+        service.set_stance(0.5, 0.5, 0.5)
+        self.assertIs(service.compiled_genome, shared)
+        self.assertEqual(shared.modal(), shared_modal)
+
+if __name__ == '__main__':
+    unittest.main()
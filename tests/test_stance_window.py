@@ -0,0 +1,44 @@
+import unittest
+import random
+from src.l4_memory.metrics import StanceAnalyzer, RollingStanceWindow
+
+WORDS = [
+    "therefore", "because", "Logic", "proof", "sorry", "THANKS", "friend", "maybe", "weird",
+    "dream", "cyber", "the", "a", "moon", "1+1=3", "step-by-step", "😊", "entropy", "", "  "
+]
+
+class TestRollingStanceWindow(unittest.TestCase):
+    """
+    The incremental window must report exactly what analyze_history reports
+    for the same last-N outputs.
+    """
+    def test_matches_full_rescan(self):
+        analyzer = StanceAnalyzer()
+        window = RollingStanceWindow(analyzer, window=20)
+        rng = random.Random(3)
+        history = []
+        self.assertEqual(window.observed(), analyzer.analyze_history(history))
+        for _ in range(200):
+            text = " ".join(rng.choice(WORDS) for _ in range(rng.randint(0, 12)))
+            history = (history + [text])[-20:]
+            window.append(text)
+            self.assertEqual(window.observed(), analyzer.analyze_history(history))
+        self.assertEqual(len(window), 20)
+
+    def test_round_trip_keeps_no_raw_text(self):
+        window = RollingStanceWindow(window=3)
+        for text in ["Therefore the proof holds", "Maybe a weird dream", "Thanks friend"]:
+            window.append(text)
+        data = window.to_dict()
+        self.assertNotIn("Therefore the proof holds", str(data))
+
+        restored = RollingStanceWindow(window=99)
+        restored.load(data)
+        self.assertEqual(restored.window, 3)
+        self.assertEqual(restored.observed(), window.observed())
+        restored.append("calculate 1 2 3")
+        window.append("calculate 1 2 3")
+        self.assertEqual(restored.observed(), window.observed())
+
+if __name__ == '__main__':
+    unittest.main()
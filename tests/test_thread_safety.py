@@ -0,0 +1,61 @@
+import unittest
+import os
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from src.app_integration import PersonaService
+
+SCRIPT = [
+    "Tell me a story about robots",
+    "Calculate the square root of 256",
+    "I feel lonely today",
+    "What a weird dream I had",
+    "Please be more formal",
+]
+
+def comparable(artifact):
+    metadata = {k: v for k, v in artifact['metadata'].items() if k != 'trace_id'}
+    return artifact['messages'], metadata
+
+class TestThreadSafety(unittest.TestCase):
+    """
+    One PersonaService driven from a thread pool must behave like the same
+    service driven sequentially: sessions stay isolated, shared state stays intact.
+    """
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def make_service(self, name):
+        service = PersonaService(session_dir=os.path.join(self.tmp.name, name),
+                                 journal_path=os.path.join(self.tmp.name, f"{name}.jsonl"))
+        self.addCleanup(service.close)  # before the directory goes
+        return service
+
+    def run_script(self, service, session_id):
+        return [comparable(service.get_llm_payload(text, session_id=session_id, manual_seed=i, profile="full"))
+                for i, text in enumerate(SCRIPT)]
+
+    def test_parallel_sessions_match_sequential(self):
+        session_ids = [f"user_{i}" for i in range(8)]
+        sequential = self.make_service("sequential")
+        expected = {sid: self.run_script(sequential, sid) for sid in session_ids}
+
+        parallel = self.make_service("parallel")
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            results = dict(zip(session_ids, pool.map(lambda sid: self.run_script(parallel, sid), session_ids)))
+        self.assertEqual(results, expected)
+
+    def test_same_session_hammered(self):
+        service = self.make_service("hammer")
+        calls = 64
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            futures = [pool.submit(service.get_llm_payload, SCRIPT[i % len(SCRIPT)], "shared", None, i, "full")
+                       for i in range(calls)]
+            for future in futures:
+                future.result()
+
+        self.assertEqual(len(service.sessions.get("shared").stm.entries), 10)
+        self.assertEqual(len(list(service.journal.read_range())), calls)
+
+if __name__ == '__main__':
+    unittest.main()